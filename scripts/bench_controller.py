@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+End-to-end GameController benchmark against the stand-in Ollama server.
+
+Runs scripted sessions concurrently through the full turn pipeline
+(interpret, resolve, enemy turns, narration) and reports throughput and
+turn-latency percentiles. No model is needed.
+
+    python scripts/bench_controller.py --sessions 8 --turns 20 --latency 0.1 --jitter 0.05
+    python scripts/bench_controller.py --trace turns.json --trace-format chrome
+    python scripts/bench_controller.py --metrics-out metrics.prom
+    python scripts/bench_controller.py --latency 2 --turn-deadline 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_ollama import MockConfig, start_in_background  # noqa: E402
+from src.game.core import GameController, ResolutionEngine, RulesEngine, StateManager  # noqa: E402
+from src.game.llm import GMOracle, ModelRouter, NarratorOracle, OllamaClient  # noqa: E402
+from src.game.config.settings import settings  # noqa: E402
+from src.game.utils.metrics import metrics  # noqa: E402
+from src.game.utils.tracing import tracer  # noqa: E402
+from src.game.scenarios import create_test_encounter  # noqa: E402
+
+SCRIPT = [
+    "I swing my greataxe at the goblin sniper",
+    "I charge the goblin warrior and bring my axe down on him",
+    "I hurl my jar of oil at the nearest brazier",
+    "I attack the goblin rogue",
+]
+
+
+def new_session(base_url: str, enemy_planning: str, seed: int, turn_deadline: float | None) -> GameController:
+    client = ModelRouter({
+        "router": OllamaClient(model_name=settings.router_model, base_url=base_url),
+        "answerer": OllamaClient(model_name=settings.answerer_model, base_url=base_url),
+    })
+    state = StateManager(initial_state=create_test_encounter())
+    return GameController(
+        gm_oracle=GMOracle(client),
+        narrator_oracle=NarratorOracle(client),
+        resolution_engine=ResolutionEngine(rules_engine=RulesEngine(seed=seed), state_manager=state),
+        state_manager=state,
+        enemy_planning=enemy_planning,
+        turn_deadline=turn_deadline,
+    )
+
+
+def run_session(
+    base_url: str, turns: int, enemy_planning: str, seed: int, turn_deadline: float | None
+) -> List[float]:
+    """Play `turns` turns, starting a fresh encounter whenever one ends."""
+    controller = new_session(base_url, enemy_planning, seed, turn_deadline)
+    latencies = []
+    try:
+        for turn in range(turns):
+            started = time.perf_counter()
+            controller.process_player_input(SCRIPT[turn % len(SCRIPT)])
+            latencies.append(time.perf_counter() - started)
+            if controller.combat_over():
+                seed += 1
+                controller.close()
+                controller = new_session(base_url, enemy_planning, seed, turn_deadline)
+    finally:
+        controller.close()
+    return latencies
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark GameController end to end against a mock Ollama.")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument("--turns", type=int, default=10, help="Turns per session")
+    parser.add_argument("--enemy-planning", default="concurrent",
+                        choices=["concurrent", "batch_intents", "batch_plans"])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--turn-deadline", type=float, help="Seconds per turn before it degrades")
+    parser.add_argument("--trace", type=Path, help="Write every turn's span tree here")
+    parser.add_argument("--trace-format", default="jsonl", choices=["jsonl", "chrome"])
+    parser.add_argument("--metrics-out", type=Path, help="Write all metrics here as OpenMetrics text")
+    args = parser.parse_args()
+    
+    if args.trace:
+        args.trace.unlink(missing_ok=True)
+        tracer.configure(path=args.trace, format=args.trace_format)
+
+    config = MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    with start_in_background(config) as base_url:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            futures = [
+                pool.submit(
+                    run_session, base_url, args.turns, args.enemy_planning, args.seed + 1000 * i, args.turn_deadline
+                )
+                for i in range(args.sessions)
+            ]
+            latencies = [latency for future in futures for latency in future.result()]
+        elapsed = time.perf_counter() - started
+
+    print(f"Sessions: {args.sessions}, turns: {len(latencies)}, enemy planning: {args.enemy_planning}")
+    print(f"Throughput: {len(latencies) / elapsed:.2f} turns/s over {elapsed:.2f}s")
+    print(
+        f"Turn latency: mean {statistics.mean(latencies) * 1000:.0f}ms, "
+        f"p50 {percentile(latencies, 0.50) * 1000:.0f}ms, "
+        f"p95 {percentile(latencies, 0.95) * 1000:.0f}ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.0f}ms, "
+        f"max {max(latencies) * 1000:.0f}ms"
+    )
+    print("LLM latency by route:")
+    for labels, histogram in sorted(metrics.histograms("llm_route_latency_seconds"), key=lambda h: h[0]["route"]):
+        stats = histogram.snapshot()
+        print(
+            f"  - {labels['route']} ({labels['model']}): {stats['count']} calls, "
+            f"mean {stats['mean'] * 1000:.0f}ms, p95 <= {stats['p95'] * 1000:.0f}ms"
+        )
+    print("LLM token usage by route:")
+    for labels, histogram in sorted(metrics.histograms("llm_generation_tokens_per_second"), key=lambda h: h[0]["route"]):
+        prompt_tokens = metrics.counter("llm_prompt_tokens", **labels).value
+        completion_tokens = metrics.counter("llm_completion_tokens", **labels).value
+        queue = metrics.histogram("llm_queue_seconds", **labels)
+        print(
+            f"  - {labels['route']} ({labels['model']}): {prompt_tokens:.0f} prompt + "
+            f"{completion_tokens:.0f} completion tokens, {histogram.mean:.0f} tokens/s, "
+            f"queue p95 <= {queue.quantile(0.95) * 1000:.0f}ms"
+        )
+    if args.metrics_out:
+        metrics.write_openmetrics(args.metrics_out)
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for extracting JSON from LLM responses.
+
+Compares the single-pass extractor in src/game/llm/json_extract.py with the
+previous three-stage one (full parse, code-block regex, brace scan with a
+json.loads per candidate) on adversarial responses of growing size. Time
+per call should grow linearly with size for the new extractor. "(no JSON)"
+and "(wrong JSON)" mark responses the previous extractor got wrong.
+
+    python scripts/bench_json_extract.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.game.llm.exceptions import JSONExtractionError  # noqa: E402
+from src.game.llm.json_extract import extract_json  # noqa: E402
+
+PLAN = json.dumps({
+    "action_type": "attack",
+    "actor_id": "player",
+    "target_ids": ["entity_goblin_001"],
+    "required_rolls": [{
+        "made_by": "player", "type": "attack_roll", "dice": "1d20+5", "threshold": 13,
+        "advantage": False, "disadvantage": False,
+        "outcomes": {"SUCCESS": [], "FAILURE": []},
+        "explanation": "Axe swing {with} braces in a string",
+    }],
+    "narrative_context": "You swing at the goblin.",
+})
+
+
+def legacy_extract(response: str) -> Any:
+    """The extractor GMOracle used before json_extract, kept for comparison."""
+    response = response.strip()
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        pass
+    for match in re.findall(r'```(?:json)?\s*\n?(.*?)\n?```', response, re.DOTALL):
+        try:
+            return json.loads(match.strip())
+        except json.JSONDecodeError:
+            continue
+    brace_depth = 0
+    start_idx = None
+    for i, char in enumerate(response):
+        if char == '{':
+            if brace_depth == 0:
+                start_idx = i
+            brace_depth += 1
+        elif char == '}':
+            brace_depth -= 1
+            if brace_depth == 0 and start_idx is not None:
+                try:
+                    return json.loads(response[start_idx:i + 1])
+                except json.JSONDecodeError:
+                    start_idx = None
+                    continue
+    raise JSONExtractionError("no JSON")
+
+
+def cases(size: int) -> Dict[str, str]:
+    """Responses of roughly `size` characters that end in the real plan."""
+    return {
+        # Every unclosed fence makes the lazy code-block regex scan to the end
+        "unclosed fences": "```" * (size // 3) + "\n" + PLAN,
+        # Many small balanced-but-invalid objects before the real one
+        "invalid objects": "{oops} " * (size // 7) + PLAN,
+        # One long object after prose; counting braces inside its strings splits it up
+        "braces in strings": 'Plan: {"note": "' + "}{" * (size // 2) + '", "plan": ' + PLAN + "}",
+        # Chatty preamble with apostrophes, quotes and a stray closing brace
+        "chatty preamble": ("Sure! Here's the \"plan\" you asked for :} " * (size // 43)) + PLAN,
+        # The happy path: the schema-constrained response itself
+        "bare json": PLAN,
+    }
+
+
+def bench(fn: Callable[[str], Any], text: str, budget: float) -> float:
+    """Mean seconds per call, running for about `budget` seconds."""
+    runs = max(1, int(budget / max(timeit.timeit(lambda: fn(text), number=1), 1e-6)))
+    return timeit.timeit(lambda: fn(text), number=runs) / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON extraction from LLM responses.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--budget", type=float, default=0.2, help="Seconds per measurement")
+    args = parser.parse_args()
+
+    print(f"{'case':<20}{'size':>9}{'legacy':>14}{'single-pass':>14}{'speedup':>10}")
+    for name in cases(0):
+        for size in args.sizes:
+            text = cases(size)[name]
+            new = bench(extract_json, text, args.budget)
+            try:
+                legacy_result = legacy_extract(text)
+                legacy = bench(legacy_extract, text, args.budget)
+                legacy_cell = f"{legacy * 1e3:>12.3f}ms"
+                speedup = f"{legacy / new:>9.1f}x"
+            except JSONExtractionError:
+                legacy_result, legacy_cell, speedup = None, f"{'(no JSON)':>14}", f"{'-':>10}"
+            if legacy_result is not None and legacy_result != extract_json(text):
+                legacy_cell, speedup = f"{'(wrong JSON)':>14}", f"{'-':>10}"
+            print(f"{name:<20}{len(text):>9}{legacy_cell}{new * 1e3:>12.3f}ms{speedup}")
+            if name == "bare json":
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Stand-in Ollama server for benchmarking without a model.
+
+Implements the part of the Ollama HTTP API that OllamaClient uses:
+/api/tags, and /api/chat with or without streaming and `format`.
+Structured requests get templated JSON built from the requested schema
+(ActionPlan, EntityIntentBatch, ActionPlanBatch); plain requests get
+canned prose. Latency, jitter, token rate and error rate are configurable.
+
+    python scripts/mock_ollama.py --port 11435 --latency 0.2 --tokens-per-second 40
+    DUNGEON_OLLAMA_HOST=http://localhost:11435 python -m src.game
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+
+# Entity lines in batch prompts look like "- entity_goblin_001: Goblin Sniper (...)"
+ENTITY_LINE = re.compile(r"^\s*- ([\w-]+): ", re.MULTILINE)
+
+PROSE = (
+    "Steel rings against stone as shadows lurch between the pillars. "
+    "The braziers gutter, and for a heartbeat the chamber holds its breath "
+    "before the goblins surge forward, shrieking, blades catching the firelight."
+)
+
+
+@dataclass
+class MockConfig:
+    models: List[str] = field(default_factory=lambda: ["mistral:7b", "gemma2:2b"])
+    latency: float = 0.05                   # Seconds before the first token
+    jitter: float = 0.0                     # +/- seconds added to latency, uniform
+    tokens_per_second: float = 0.0          # 0 = emit everything at once
+    error_rate: float = 0.0                 # Fraction of chat requests answered with HTTP 500
+    actor_id: str = "player-character"      # Who single ActionPlans are for
+    target_id: str = "entity_goblin_001"    # Who single ActionPlans attack
+    seed: int | None = None
+
+
+# ============================================================
+# RESPONSE TEMPLATES
+# ============================================================
+
+def attack_plan(actor_id: str, target_id: str) -> Dict[str, Any]:
+    return {
+        "action_type": "attack",
+        "actor_id": actor_id,
+        "target_ids": [target_id],
+        "required_rolls": [{
+            "made_by": actor_id,
+            "type": "attack_roll",
+            "dice": "1d20+4",
+            "threshold": 14,
+            "advantage": False,
+            "disadvantage": False,
+            "outcomes": {"SUCCESS": [], "FAILURE": []},
+            "explanation": f"{actor_id} attacks {target_id}",
+        }],
+        "conditional_rolls": {"0": [{
+            "made_by": actor_id,
+            "type": "damage_roll",
+            "dice": "1d8+2",
+            "threshold": 0,
+            "advantage": False,
+            "disadvantage": False,
+            "outcomes": {
+                "SUCCESS": [{"target_id": target_id, "attribute": "hp", "operation": "remove", "value": None}],
+                "FAILURE": [],
+            },
+            "explanation": "Weapon damage",
+        }]},
+        "potential_reactions": [],
+        "narrative_context": f"{actor_id} attacks {target_id}",
+    }
+
+
+def structured_response(schema: Dict[str, Any], prompt: str, config: MockConfig) -> Dict[str, Any]:
+    """JSON shaped like the schema's model, using entity IDs found in the prompt."""
+    entity_ids = ENTITY_LINE.findall(prompt)
+    title = schema.get("title")
+    if title == "EntityIntentBatch":
+        return {"intents": [
+            {"entity_id": entity_id, "intent": f"{entity_id} attacks the player"}
+            for entity_id in entity_ids
+        ]}
+    if title == "ActionPlanBatch":
+        return {"plans": [attack_plan(entity_id, config.actor_id) for entity_id in entity_ids]}
+    if title == "ActionPlan":
+        return attack_plan(config.actor_id, config.target_id)
+    return {}
+
+
+def chat_content(request: Dict[str, Any], config: MockConfig) -> str:
+    prompt = "\n".join(message.get("content", "") for message in request.get("messages", []))
+    response_format = request.get("format")
+    if isinstance(response_format, dict):
+        return json.dumps(structured_response(response_format, prompt, config))
+    if response_format == "json":
+        return json.dumps({"ok": True})
+    return PROSE
+
+
+def tokenize(text: str) -> List[str]:
+    """Split into word-ish pieces that join back into the original text."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+# ============================================================
+# SERVER
+# ============================================================
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: MockConfig
+    rng: random.Random
+    rng_lock = threading.Lock()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path == "/api/tags":
+            self._send_json({"models": [
+                {"name": name, "model": name, "modified_at": _timestamp(), "size": 0, "digest": "mock"}
+                for name in self.config.models
+            ]})
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-mock"})
+        else:
+            self._send_json({"error": f"unknown path {self.path}"}, status=404)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path != "/api/chat":
+            self._send_json({"error": f"unknown path {self.path}"}, status=404)
+            return
+
+        with self.rng_lock:
+            fail = self.rng.random() < self.config.error_rate
+            delay = max(0.0, self.config.latency + self.rng.uniform(-self.config.jitter, self.config.jitter))
+
+        started = time.perf_counter()
+        time.sleep(delay)
+        if fail:
+            self._send_json({"error": "injected failure"}, status=500)
+            return
+
+        content = chat_content(request, self.config)
+        tokens = tokenize(content)
+        stats = {
+            "prompt_eval_count": sum(len(m.get("content", "").split()) for m in request.get("messages", [])),
+            "prompt_eval_duration": int(delay * 1e9),
+            "eval_count": len(tokens),
+        }
+
+        if request.get("stream", True):
+            self._stream(request["model"], tokens, started, stats)
+        else:
+            self._pace(len(tokens))
+            self._send_json(self._message(request["model"], content, done=True, started=started, stats=stats))
+
+    def _stream(self, model: str, tokens: List[str], started: float, stats: Dict[str, int]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens:
+            self._pace(1)
+            self._write_chunk(self._message(model, token, done=False))
+        self._write_chunk(self._message(model, "", done=True, started=started, stats=stats))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _pace(self, tokens: int) -> None:
+        if self.config.tokens_per_second > 0:
+            time.sleep(tokens / self.config.tokens_per_second)
+
+    def _message(
+        self,
+        model: str,
+        content: str,
+        done: bool,
+        started: float | None = None,
+        stats: Dict[str, int] | None = None,
+    ) -> Dict[str, Any]:
+        message = {
+            "model": model,
+            "created_at": _timestamp(),
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+        }
+        if done:
+            total = int((time.perf_counter() - started) * 1e9)
+            message.update(stats or {})
+            message.update({
+                "done_reason": "stop",
+                "total_duration": total,
+                "load_duration": 0,
+                "eval_duration": max(total - message.get("prompt_eval_duration", 0), 0),
+            })
+        return message
+
+    def _write_chunk(self, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode() + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def make_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Build (but don't start) a server. Port 0 picks a free port; see server.server_address."""
+    handler = type("ConfiguredHandler", (MockOllamaHandler,), {
+        "config": config,
+        "rng": random.Random(config.seed),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+@contextmanager
+def start_in_background(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Run a server on a daemon thread for the duration of a with block; yields its base URL."""
+    server = make_server(config, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a stand-in Ollama server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--models", nargs="+", default=MockConfig().models)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of uniform jitter")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="0 = no pacing")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--actor-id", default=MockConfig.actor_id)
+    parser.add_argument("--target-id", default=MockConfig.target_id)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        models=args.models,
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        actor_id=args.actor_id,
+        target_id=args.target_id,
+        seed=args.seed,
+    )
+    server = make_server(config, args.host, args.port)
+    print(f"Mock Ollama listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
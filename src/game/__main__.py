@@ -1,10 +1,37 @@
 # Update src/auto-dungeon/__main__.py
 """Entry point for the dungeon crawler application."""
 
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, TypeVar
+
 from src.game.config.settings import settings
 from src.game.utils.logging import setup_logging
 from src.game.core import initialize_game_controller, GameController
+from src.game.llm import llm_router
 from src.game.scenarios import create_test_encounter
+from src.game.utils.metrics import metrics
+from src.game.utils.tracing import tracer
+
+T = TypeVar("T")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Startup
+# ─────────────────────────────────────────────────────────────────────────────
+def run_in_background(fn: Callable[[], T], name: str) -> "Future[T]":
+    """Run fn in a daemon thread, so a hung server can't block quitting."""
+    future: Future[T] = Future()
+    
+    def run() -> None:
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return future
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -38,12 +65,26 @@ def game_loop(controller: GameController) -> None:
         
         # Process game action
         try:
-            response = controller.process_player_input(player_input)
-            print(f"\n{response}")
+            if settings.enable_streaming:
+                # Print narration as it arrives rather than after generation ends
+                print()
+                for chunk in controller.stream_player_input(player_input):
+                    print(chunk, end="", flush=True)
+                print()
+            else:
+                response = controller.process_player_input(player_input)
+                print(f"\n{response}")
                 
         except Exception as e:
             print(f"\n[ERROR] Something went wrong: {e}")
             print("[The game attempts to recover...]")
+        
+        if settings.metrics_path is not None:
+            try:
+                metrics.write_openmetrics(settings.metrics_path)
+            except OSError as e:
+                # Losing a metrics snapshot shouldn't end the game
+                logging.getLogger("dungeon").warning("Couldn't write metrics to %s: %s", settings.metrics_path, e)
 
 
 def main() -> None:
@@ -58,11 +99,43 @@ def main() -> None:
     logger.info("Starting Dungeon Crawler")
     logger.debug(f"Configuration: {settings}")
     
+    if settings.trace_path is not None:
+        tracer.configure(path=settings.trace_path, format=settings.trace_format)
+        logger.info("Tracing turns to %s (%s)", settings.trace_path, settings.trace_format)
+    if settings.metrics_port is not None:
+        metrics.serve_openmetrics(settings.metrics_port)
+    
+    # Check the server and load the models while the encounter is built,
+    # so the first turn doesn't pay for the model load
+    healthy = run_in_background(llm_router.health_check, "llm-health")
+    warmed = run_in_background(llm_router.warmup, "llm-warmup") if settings.llm_warmup else None
+    
     # Initialize test encounter
-    game_controller = initialize_game_controller(create_test_encounter())
+    game_controller = initialize_game_controller(
+        create_test_encounter(),
+        seed=settings.dice_seed,
+        enemy_concurrency=settings.enemy_intent_concurrency,
+        enemy_planning=settings.enemy_planning,
+        stream_plans=settings.stream_action_plans,
+        turn_deadline=settings.turn_deadline,
+        record_rolls=settings.record_rolls,
+    )
+    # Evaluate the static prompt prefixes. prime() loads the model itself, so
+    # this has its own setting; with warmup on it waits for the loads to finish.
+    def prime_prompts() -> bool:
+        if warmed is not None:
+            warmed.result()
+        return game_controller.prime_prompt_cache()
+    if settings.llm_prime:
+        run_in_background(prime_prompts, "prime-prompts")
+    
+    if not healthy.result():
+        logger.warning("Ollama at %s is unavailable or missing a model", settings.ollama_host)
+        print(f"[WARNING] Couldn't reach the models at {settings.ollama_host}; the GM may be slow or terse.")
     print("Welcome to Auto-Dungeon! This is a test encounter.")
-    game_loop(game_controller)
+    with game_controller:
+        game_loop(game_controller)
     
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
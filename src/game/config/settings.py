@@ -5,6 +5,9 @@ from typing import Literal
 import sys
 from functools import lru_cache
 
+# How long Ollama keeps a model loaded between requests, unless configured
+DEFAULT_KEEP_ALIVE = "30m"
+
 
 def get_app_dir() -> Path:
     """Get application directory (handles both dev and packaged app)."""
@@ -33,7 +36,40 @@ class Settings(BaseSettings):
     answerer_model: str = "mistral:7b"
     llm_timeout: int = 60
     llm_temperature: float = 0.7
+    llm_keep_alive: str = DEFAULT_KEEP_ALIVE  # How long Ollama keeps a model loaded between requests
+    # Startup loading: warmup loads every model; priming also evaluates each route's static
+    # prompt prefix, which loads the routed models too. Turn both off to load nothing up front.
+    llm_warmup: bool = True  # Load the models in the background at startup
+    llm_prime: bool = True  # Prime the prompt prefixes in the background at startup
     max_retries: int = 3
+    llm_backoff_base: float = 0.5  # Seconds; retry n waits up to base * 2**(n-1), jittered
+    llm_backoff_max: float = 8.0
+    llm_breaker_threshold: int = 5  # Consecutive failures before calls fail fast
+    llm_breaker_cooldown: float = 30.0  # Seconds to fail fast before probing again
+    llm_fallback_model: str | None = None  # e.g. router_model, used when the main model gives up
+    llm_max_in_flight: int = 4  # Concurrent requests allowed through the async client
+    coalesce_llm_requests: bool = True  # Identical concurrent requests share one call
+    enemy_intent_concurrency: int = 4  # Enemy intents generated in parallel per turn
+    # "concurrent" (one call per enemy), "batch_intents" or "batch_plans" (one call for all)
+    enemy_planning: Literal["concurrent", "batch_intents", "batch_plans"] = "concurrent"
+    stream_action_plans: bool = True  # Roll a plan's first roll while the rest is generated
+    # Seconds a turn may take; near it, enemies and narration fall back to rules and templates. None = unbounded
+    turn_deadline: float | None = 20.0
+    
+    # ActionPlan cache (skips the GM LLM for repeated commands)
+    plan_cache_size: int = 1024
+    persist_plan_cache: bool = False
+    plan_cache_path: Path = cache_dir / "plan_cache.db"
+    
+    # LLM response cache ("replay" serves recorded responses only and fails on a miss)
+    llm_cache_mode: Literal["off", "on", "replay"] = "off"
+    llm_cache_path: Path = cache_dir / "llm_responses.db"
+    llm_cache_max_entries: int = 10_000
+    llm_cache_ttl: float | None = 7 * 24 * 3600  # Seconds; None keeps entries until evicted
+    
+    # Dice Settings
+    dice_seed: int | None = None  # Fixed seed for reproducible sessions; None = random
+    record_rolls: bool = False  # Keep every roll for replay; the log grows for the whole session
     
     # Embedding Settings
     embedding_model: str = "all-MiniLM-L6-v2"
@@ -51,6 +87,14 @@ class Settings(BaseSettings):
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "DEBUG"
     log_file: Path = data_dir / "dungeon.log"
     
+    # Tracing (a span tree per turn: interpret, execute, apply state, enemy turns, narration, LLM calls)
+    trace_path: Path | None = None  # Append each turn's trace here; None disables tracing
+    trace_format: Literal["jsonl", "chrome"] = "jsonl"  # "chrome" loads in chrome://tracing or Perfetto
+    
+    # Metrics (token counts, throughput and queue time per LLM route, as OpenMetrics text)
+    metrics_port: int | None = None  # Serve http://127.0.0.1:<port>/metrics; None disables the endpoint
+    metrics_path: Path | None = None  # Rewrite this file after every turn; None disables it
+    
     # CLI Settings
     enable_color: bool = True
     enable_streaming: bool = True
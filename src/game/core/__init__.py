@@ -1,36 +1,69 @@
 from src.game.llm import gm_oracle, narrator_oracle
 from src.game.core.action_queue import ActionQueue
+from src.game.core.dice import CompiledFormula, compile_formula
+from src.game.core.dice_distribution import DiceDistribution, Distribution
 from src.game.core.resolution_engine import ResolutionEngine
 from src.game.core.rules_engine import RulesEngine
+from src.game.core.rng import DiceStream, ReplayStream
+from src.game.core.roll_log import RollLog
 from src.game.core.state_manager import StateManager
+from src.game.core.rule_interpreter import RuleBasedInterpreter, FastPathMatch
 from src.game.core.game_controller import GameController
 from src.game.models import GameState
 
 rules_engine = RulesEngine()
 
+# Let the GM answer simple intents without an LLM round trip
+gm_oracle.fast_path = RuleBasedInterpreter()
+
 def initialize_game_controller(
-    initial_state: GameState
+    initial_state: GameState,
+    seed: int | None = None,
+    enemy_concurrency: int | None = None,
+    enemy_planning: str = "concurrent",
+    stream_plans: bool = False,
+    turn_deadline: float | None = None,
+    record_rolls: bool = False
 ) -> GameController:
-    """Instantiate all game components and return the GameController."""
+    """
+    Instantiate all game components and return the GameController.
+    Each session gets its own RulesEngine so its dice can be seeded, and
+    with record_rolls, replayed from its roll_log.
+    """
     
     # Initialize core systems
     state_manager = StateManager(initial_state=initial_state)
-    resolution_engine = ResolutionEngine(rules_engine=rules_engine, state_manager=state_manager)
+    session_rules = RulesEngine(seed=seed, record=record_rolls)
+    resolution_engine = ResolutionEngine(rules_engine=session_rules, state_manager=state_manager)
     # Create and return the game controller
     controller = GameController(
         gm_oracle=gm_oracle,
         resolution_engine=resolution_engine,
         state_manager=state_manager,
-        narrator_oracle=narrator_oracle
+        narrator_oracle=narrator_oracle,
+        enemy_concurrency=enemy_concurrency,
+        enemy_planning=enemy_planning,
+        stream_plans=stream_plans,
+        turn_deadline=turn_deadline
     )
     
     return controller
 
 __all__ = [
     'ActionQueue',
+    'CompiledFormula',
+    'compile_formula',
+    'DiceDistribution',
+    'Distribution',
     'ResolutionEngine',
     'StateManager',
     'GameController',
+    'RulesEngine',
+    'DiceStream',
+    'ReplayStream',
+    'RollLog',
+    'RuleBasedInterpreter',
+    'FastPathMatch',
     'rules_engine',
     'initialize_game_controller'
 ]
\ No newline at end of file
@@ -31,6 +31,13 @@ class ActionQueue:
                 return queue.popleft()
         return None
     
+    def clear(self) -> list[Action]:
+        """Remove every queued action; returns them in the order they would have run"""
+        dropped = []
+        while (action := self.dequeue()) is not None:
+            dropped.append(action)
+        return dropped
+    
     def is_empty(self) -> bool:
         return all(len(q) == 0 for q in self._queues.values())
     
@@ -0,0 +1,177 @@
+import re
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+# ============================================================
+# DICE FORMULA COMPILATION
+# ============================================================
+
+# Size of the compiled-formula LRU. Sessions and simulations roll a few
+# dozen distinct formulas, so this comfortably holds the working set.
+FORMULA_CACHE_SIZE = 512
+
+# Largest die a formula may roll; every face must fit the RollLog's uint32 array
+MAX_DIE_SIDES = 2**32 - 1
+
+# A single signed term: XdY, dY, a flat number, or an attribute name (STR, DEX...)
+_TERM_PATTERN = re.compile(r"([+-]?)(?:(\d*)d(\d+)|(\d+)|([A-Za-z_]+))")
+# Whitespace is only tolerated around operators ('1d20 + STR')
+_OPERATOR_SPACING = re.compile(r"\s*([+-])\s*")
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledFormula:
+    """
+    A dice formula parsed once into its terms, ready to be rolled repeatedly.
+
+    e.g. '2d6+1d4+STR-1' ->
+        dice      = ((2, 6, 1), (1, 4, 1))   # (count, sides, sign)
+        flat      = -1
+        attributes = (('STR', 1),)           # (attribute key, sign)
+    """
+    formula: str
+    dice: Tuple[Tuple[int, int, int], ...]
+    flat: int
+    attributes: Tuple[Tuple[str, int], ...]
+
+    @property
+    def min_roll(self) -> int:
+        """Lowest possible total of the dice terms plus the flat modifier."""
+        return self.flat + sum(
+            sign * (count if sign > 0 else count * sides)
+            for count, sides, sign in self.dice
+        )
+
+    @property
+    def max_roll(self) -> int:
+        """Highest possible total of the dice terms plus the flat modifier."""
+        return self.flat + sum(
+            sign * (count * sides if sign > 0 else count)
+            for count, sides, sign in self.dice
+        )
+
+    def modifier(self, context: Dict[str, int] | None = None) -> int:
+        """
+        Sum of the flat and attribute terms.
+
+        Args:
+            context: A dictionary mapping attribute names (STR, DEX) to their *modifiers*.
+        """
+        total = self.flat
+        if not self.attributes:
+            return total
+
+        if context is None:
+            raise ValueError(
+                f"Formula requires context for attribute '{self.attributes[0][0]}' but none provided."
+            )
+
+        for key, sign in self.attributes:
+            # Missing attributes count as 0 to prevent a crash mid-combat
+            total += sign * context.get(key, 0)
+        return total
+
+    def roll(self, context: Dict[str, int] | None = None, rng=random) -> int:
+        """Rolls every dice term and adds the modifiers."""
+        return self.draw(rng) + self.modifier(context)
+
+    def draw(self, rng=random) -> int:
+        """
+        Rolls only the dice terms once.
+        rng is anything with randint(a, b): the random module, a Random, or a dice stream.
+        """
+        total = 0
+        randint = rng.randint
+        for count, sides, sign in self.dice:
+            subtotal = 0
+            for _ in range(count):
+                subtotal += randint(1, sides)
+            total += sign * subtotal
+        return total
+
+    def roll_many(
+        self,
+        n: int,
+        context: Dict[str, int] | None = None,
+        rng=None,
+    ) -> np.ndarray:
+        """Rolls the formula n times. Returns an int64 array of totals."""
+        return self.draw_dice(n, rng) + self.modifier(context)
+
+    def draw_dice(self, n: int, rng=None) -> np.ndarray:
+        """
+        Rolls only the dice terms n times, drawing every die of the batch in a
+        single call to rng.integers (a NumPy Generator or a dice stream).
+        Returns an int64 array of dice totals.
+        """
+        if not self.dice or n == 0:
+            return np.zeros(n, dtype=np.int64)
+
+        rng = rng or np.random.default_rng()
+        highs, signs = _face_layout(self.dice)
+
+        # One row per roll, one column per die; each column has its own die size
+        faces = rng.integers(1, highs, size=(n, len(highs)), endpoint=True)
+        return faces @ signs
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _face_layout(dice: Tuple[Tuple[int, int, int], ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-die sizes and signs of a formula's dice terms, one entry per die."""
+    counts = [count for count, _, _ in dice]
+    highs = np.repeat([sides for _, sides, _ in dice], counts)
+    signs = np.repeat([sign for _, _, sign in dice], counts)
+    return highs, signs
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def compile_formula(formula: str) -> CompiledFormula:
+    """
+    Parses a dice string (e.g., '1d20+5', '2d6', '1d20+STR', '2d6+1d4+STR-1')
+    into a CompiledFormula. Results are cached per formula string.
+
+    Raises:
+        ValueError: If the formula is empty or contains an unrecognized term.
+    """
+    text = _OPERATOR_SPACING.sub(r"\1", formula.strip())
+    if not text:
+        raise ValueError(f"Invalid dice formula format: {formula}")
+
+    dice = []
+    flat = 0
+    attributes = []
+    pos = 0
+
+    while pos < len(text):
+        match = _TERM_PATTERN.match(text, pos)
+        # Every term after the first must carry an explicit sign
+        if not match or match.end() == pos or (pos > 0 and not match.group(1)):
+            raise ValueError(f"Invalid dice formula format: {formula}")
+
+        sign = -1 if match.group(1) == "-" else 1
+        num_dice, die_sides, number, attribute = match.group(2, 3, 4, 5)
+
+        if die_sides is not None:
+            count = int(num_dice) if num_dice else 1
+            sides = int(die_sides)
+            if not 1 <= sides <= MAX_DIE_SIDES:
+                raise ValueError(f"Invalid die size in formula: {formula}")
+            if count:
+                dice.append((count, sides, sign))
+        elif number is not None:
+            flat += sign * int(number)
+        else:
+            attributes.append((attribute.upper(), sign))
+
+        pos = match.end()
+
+    return CompiledFormula(
+        formula=formula,
+        dice=tuple(dice),
+        flat=flat,
+        attributes=tuple(attributes),
+    )
@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+from src.game.models import RollSpec
+from src.game.core.dice import FORMULA_CACHE_SIZE, compile_formula
+
+# ============================================================
+# DICE DISTRIBUTIONS
+# ============================================================
+
+@dataclass(frozen=True, eq=False)
+class Distribution:
+    """
+    Exact probability distribution of a dice total.
+    pmf[i] is the probability of rolling exactly offset + i.
+    """
+    offset: int
+    pmf: np.ndarray
+    survival: np.ndarray        # survival[i] = P(total >= offset + i)
+
+    @property
+    def values(self) -> np.ndarray:
+        """Every total the roll can produce, aligned with pmf."""
+        return np.arange(self.offset, self.offset + len(self.pmf))
+
+    @property
+    def cdf(self) -> np.ndarray:
+        """cdf[i] = P(total <= offset + i)"""
+        return np.cumsum(self.pmf)
+
+    @property
+    def mean(self) -> float:
+        return float(self.values @ self.pmf)
+
+    def shifted(self, amount: int) -> "Distribution":
+        """The same distribution with a flat modifier added."""
+        if amount == 0:
+            return self
+        return Distribution(self.offset + amount, self.pmf, self.survival)
+
+    def probability_at_least(self, threshold: int) -> float:
+        """P(total >= threshold)"""
+        index = threshold - self.offset
+        if index <= 0:
+            return 1.0
+        if index >= len(self.survival):
+            return 0.0
+        return float(self.survival[index])
+
+
+class DiceDistribution:
+    """
+    Computes exact PMFs/CDFs for any formula roll_dice accepts by convolving
+    per-die arrays, so odds never need Monte Carlo. Dice distributions are
+    cached per formula; attribute and flat modifiers are applied as a shift.
+    """
+
+    def distribution(
+        self,
+        formula: str,
+        context: Dict[str, int] = None,
+        advantage: bool = False,
+        disadvantage: bool = False,
+    ) -> Distribution:
+        """
+        Exact distribution of a formula's total.
+        Advantage and disadvantage cancel out, as in RulesEngine.execute_roll.
+        """
+        compiled = compile_formula(formula)
+        mode = int(advantage) - int(disadvantage)
+        return _dice_distribution(compiled.dice, mode).shifted(compiled.modifier(context))
+
+    def probability_at_least(
+        self,
+        formula: str,
+        threshold: int,
+        context: Dict[str, int] = None,
+        advantage: bool = False,
+        disadvantage: bool = False,
+    ) -> float:
+        """P(roll >= threshold) for the given formula."""
+        compiled = compile_formula(formula)
+        mode = int(advantage) - int(disadvantage)
+        # Move the modifier onto the threshold instead of shifting the distribution
+        dist = _dice_distribution(compiled.dice, mode)
+        return dist.probability_at_least(threshold - compiled.modifier(context))
+
+    def success_probability(self, spec: RollSpec) -> float:
+        """Chance that executing the RollSpec meets or beats its threshold."""
+        return self.probability_at_least(
+            spec.dice,
+            spec.threshold,
+            spec.context,
+            spec.advantage,
+            spec.disadvantage,
+        )
+
+
+def _die_pmf(sides: int, sign: int) -> Tuple[int, np.ndarray]:
+    """(offset, pmf) of a single signed die."""
+    pmf = np.full(sides, 1.0 / sides)
+    return (1, pmf) if sign > 0 else (-sides, pmf)
+
+
+def _convolve(a: Tuple[int, np.ndarray], b: Tuple[int, np.ndarray]) -> Tuple[int, np.ndarray]:
+    """Distribution of the sum of two independent (offset, pmf) totals."""
+    return a[0] + b[0], np.convolve(a[1], b[1])
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _dice_distribution(dice: Tuple[Tuple[int, int, int], ...], mode: int) -> Distribution:
+    """
+    Distribution of the dice terms alone (no modifiers).
+    mode: 1 for advantage, -1 for disadvantage, 0 for a straight roll.
+    """
+    total = (0, np.ones(1))
+    for count, sides, sign in dice:
+        die = _die_pmf(sides, sign)
+        for _ in range(count):
+            total = _convolve(total, die)
+
+    offset, pmf = total
+    if mode > 0:
+        # max of two rolls: P(max <= x) = F(x)^2
+        cdf = np.cumsum(pmf) ** 2
+        pmf = np.diff(cdf, prepend=0.0)
+    elif mode < 0:
+        # min of two rolls: P(min >= x) = S(x)^2
+        survival = np.cumsum(pmf[::-1])[::-1] ** 2
+        pmf = survival - np.append(survival[1:], 0.0)
+
+    survival = np.cumsum(pmf[::-1])[::-1]
+    # Cached arrays are shared between callers
+    pmf.setflags(write=False)
+    survival.setflags(write=False)
+    return Distribution(offset, pmf, survival)
@@ -1,11 +1,28 @@
+import copy
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from uuid import uuid4
-from typing import List
+from typing import Any, Callable, Dict, Iterator, List, Literal, Tuple, TypeVar
 
 from src.game.core.resolution_engine import ResolutionEngine
 from src.game.core.action_queue import ActionQueue
+from src.game.core.plan_builder import build_attack_plan
 from src.game.core.state_manager import StateManager
-from src.game.models import Action, Resolution
-from src.game.llm import NarratorOracle, GMOracle
+from src.game.models import Action, ActionPlan, Entity, GameState, Resolution, RollResult, RollSpec
+from src.game.llm import NarratorOracle, GMOracle, ModelRouter
+from src.game.utils.deadline import DeadlineExceededError, current_deadline, deadline
+from src.game.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# How enemy turns are planned:
+#   concurrent    - one intent call per enemy, run in parallel
+#   batch_intents - one call returning every enemy's intent
+#   batch_plans   - one call returning every enemy's ActionPlan
+EnemyPlanningMode = Literal["concurrent", "batch_intents", "batch_plans"]
+
+T = TypeVar("T")
 
 
 class GameController:
@@ -14,12 +31,23 @@ class GameController:
     Orchestrates player actions, enemy turns, and combat flow.
     """
     
+    # How many enemy intents may be generated by the LLM at once
+    DEFAULT_ENEMY_CONCURRENCY = 4
+    # Seconds of the turn deadline kept for narration; earlier phases degrade rather than eat into it
+    NARRATION_RESERVE = 3.0
+    # With less than this left, narration comes from a template instead of the LLM
+    MIN_NARRATION_TIME = 1.0
+    
     def __init__(
         self,
         gm_oracle: GMOracle,
         narrator_oracle: NarratorOracle,
         resolution_engine: ResolutionEngine,
-        state_manager: StateManager
+        state_manager: StateManager,
+        enemy_concurrency: int | None = None,
+        enemy_planning: EnemyPlanningMode = "concurrent",
+        stream_plans: bool = False,
+        turn_deadline: float | None = None
     ):
         self.gm = gm_oracle
         self.engine = resolution_engine
@@ -28,9 +56,89 @@ class GameController:
         self.action_queue = ActionQueue()
         self.narration_buffer: List[str] = []
         self.turn_based = False
+        self.enemy_concurrency = max(1, enemy_concurrency or self.DEFAULT_ENEMY_CONCURRENCY)
+        self.enemy_planning = enemy_planning
+        # Stream LLM plans and roll the first required roll as soon as it arrives
+        self.stream_plans = stream_plans
+        # Seconds a turn may take; near the end it falls back to rule-based enemies
+        # and templated narration. None leaves turns unbounded.
+        self.turn_deadline = turn_deadline
+        self._intent_pool = ThreadPoolExecutor(
+            max_workers=self.enemy_concurrency,
+            thread_name_prefix="enemy-intent"
+        )
+    
+    def prime_prompt_cache(self) -> bool:
+        """
+        Prime the static prompt prefixes this session's turns will use, so the
+        first turn doesn't pay for loading models and evaluating instructions.
+        Safe to run in a background thread; False if any prompt failed.
+        
+        Ollama keeps one cached prefix per loaded model, and each prime would
+        replace the one before it, so only the first route each model serves
+        in a turn is primed: interpretation, then the enemy phase, then
+        narration. The other routes still benefit from the model being loaded.
+        """
+        enemy_route = {
+            "concurrent": "generate_entity_intent",
+            "batch_intents": "generate_enemy_intents",
+            "batch_plans": "plan_enemy_actions",
+        }[self.enemy_planning]
+        primed = True
+        primed_models = set()
+        for route in ["interpret_action", "interpret_simple_action", enemy_route, "narration"]:
+            oracle = self.narrator if route == "narration" else self.gm
+            model = oracle.llm.client_for(route).model_name if isinstance(oracle.llm, ModelRouter) else oracle.llm.model_name
+            if model in primed_models:
+                continue
+            primed_models.add(model)
+            if route == "narration":
+                primed = self.narrator.prime_prompt_cache() and primed
+            else:
+                primed = self.gm.prime_prompt_cache([route]) and primed
+        return primed
+    
+    def close(self) -> None:
+        """
+        Shut down the enemy intent pool. Calls still running are abandoned
+        rather than waited on; queued ones are cancelled.
+        """
+        self._intent_pool.shutdown(wait=False, cancel_futures=True)
+    
+    def __enter__(self) -> "GameController":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
     
     def process_player_input(self, text: str) -> str:
         """Main entry point for player commands."""
+        with tracer.span("turn", input=text), deadline(self.turn_deadline):
+            self._play_turn(text)
+            
+            # 3. Finalize Output
+            with tracer.span("narrate"):
+                narration = self._compose_narration()
+            # Check for end of combat.
+            combat_result = self._check_combat_result()
+        return f"{narration}{combat_result or ''}"
+    
+    def stream_player_input(self, text: str) -> Iterator[str]:
+        """
+        Streaming variant of process_player_input: resolves the turn, then
+        yields the narration as it is generated so the CLI can print the
+        first words without waiting for the whole response.
+        """
+        with tracer.span("turn", input=text, streamed=True), deadline(self.turn_deadline):
+            self._play_turn(text)
+            
+            with tracer.span("narrate"):
+                yield from self._stream_narration()
+            if combat_result := self._check_combat_result():
+                yield combat_result
+    
+    def _play_turn(self, text: str) -> None:
+        """Resolve the player's action and any enemy turns into narration_buffer."""
         self.narration_buffer.clear()
         
         # 1. Process Player
@@ -46,36 +154,162 @@ class GameController:
             if result := self._check_combat_result():
                 self.narration_buffer.append(result)
                 self.turn_based = False
-        # 3. Finalize Output
-        narration = self.narrator.compose_narration(
-            self.narration_buffer,
-            self.state.get_current_state().summary()
-        )
-        # Check for end of combat.
-        combat_result = self._check_combat_result()
-        return f"{narration}{combat_result}"
     
-    def _enqueue_action(self, owner_id: str, text: str, priority: int = 0) -> None:
-        """Helper to create and queue an Action object."""
+    def _compose_narration(self) -> str:
+        """The LLM's narration of the turn, or the templated one if the deadline doesn't allow it."""
+        if self._out_of_time(self.MIN_NARRATION_TIME):
+            self._note_degraded("templated narration")
+            return self._templated_narration()
+        try:
+            return self.narrator.compose_narration(
+                self.narration_buffer,
+                self.state.get_current_state().summary()
+            )
+        except DeadlineExceededError:
+            self._note_degraded("templated narration")
+            return self._templated_narration()
+    
+    def _stream_narration(self) -> Iterator[str]:
+        """Streaming _compose_narration; a stream the deadline cuts off just ends there."""
+        if self._out_of_time(self.MIN_NARRATION_TIME):
+            self._note_degraded("templated narration")
+            yield self._templated_narration()
+            return
+        started = False
+        try:
+            for chunk in self.narrator.stream_narration(
+                self.narration_buffer,
+                self.state.get_current_state().summary()
+            ):
+                started = True
+                yield chunk
+        except DeadlineExceededError:
+            self._note_degraded("narration cut short" if started else "templated narration")
+            yield "..." if started else self._templated_narration()
+    
+    def _templated_narration(self) -> str:
+        """The turn's mechanical narration fragments, unembellished."""
+        return "\n".join(self.narration_buffer) or "Nothing happens."
+    
+    def _enqueue_action(
+        self,
+        owner_id: str,
+        text: str,
+        priority: int = 0,
+        plan: ActionPlan | None = None
+    ) -> None:
+        """Helper to create and queue an Action object (optionally pre-planned)."""
         action = Action(
             id=f"action_{uuid4().hex[:8]}",
             owner_id=owner_id,
             intent_text=text,
-            priority=priority
+            priority=priority,
+            plan=plan
         )
         self.action_queue.enqueue(action)
 
     def _process_enemy_turns(self) -> None:
-        """Process actions for all alive enemies."""
-        for enemy in self.state.get_alive_enemies_in_room():
+        """
+        Process actions for all alive enemies.
+        
+        Intents are generated concurrently (up to enemy_concurrency LLM calls
+        in flight), so the phase waits on the slowest enemy rather than the sum
+        of all of them. They are built from a deep copy of the state at the
+        start of the phase: the live state changes as actions resolve, and a
+        call abandoned at the deadline may still be reading it.
+        The resulting actions are still resolved one at a time, in room order.
+        """
+        with tracer.span("enemy_turns", planning=self.enemy_planning):
+            enemies = self.state.get_alive_enemies_in_room()
+            snapshot = copy.deepcopy(self.state.get_current_state())
+            snapshot_enemies = {e.id: e for e in snapshot.location.occupants}
+            plans, intents = self._plan_enemies([snapshot_enemies[e.id] for e in enemies], snapshot)
             
-            intent = self.gm.generate_entity_intent(enemy, self.state.get_current_state())
-            if intent:
-                self._enqueue_action(owner_id=enemy.id, text=intent)
+            for enemy in enemies:
+                # An earlier action this phase may have taken this enemy out
+                if enemy.hp <= 0:
+                    continue
+                if enemy.id not in plans and intents.get(enemy.id) and self._out_of_time():
+                    # Interpreting the intent would be one more LLM call than the turn has time for
+                    self._note_degraded("rule-based enemy plans")
+                    plans[enemy.id] = self._rule_based_plan(enemy, self.state.get_current_state())
+                if enemy.id in plans:
+                    plan = plans[enemy.id]
+                    self._enqueue_action(owner_id=enemy.id, text=plan.narrative_context, plan=plan)
+                elif intents.get(enemy.id):
+                    self._enqueue_action(owner_id=enemy.id, text=intents[enemy.id])
+                else:
+                    continue
                 self._process_queue()
+    
+    def _plan_enemies(
+        self,
+        enemies: List[Entity],
+        context: GameState
+    ) -> Tuple[Dict[str, ActionPlan], Dict[str, str | None]]:
+        """
+        Plans and intents for the enemy phase, keyed by enemy ID. Under a turn
+        deadline the LLM gets only the time that leaves room for narration;
+        enemies it hasn't answered for by then get rule-based plans.
+        """
+        plans: Dict[str, ActionPlan] = {}
+        intents: Dict[str, str | None] = {}
+        budget = self._llm_budget()
+        stop_at = None if budget is None else time.monotonic() + budget
+        
+        out_of_budget = budget is not None and budget <= 0
+        if not out_of_budget:
+            try:
+                with tracer.span("plan_enemies"):
+                    if self.enemy_planning == "batch_plans":
+                        plans = self._call_until(stop_at, self.gm.plan_enemy_actions, enemies, context)
+                    elif self.enemy_planning == "batch_intents":
+                        intents = self._call_until(stop_at, self.gm.generate_enemy_intents, enemies, context)
+            except TimeoutError:
+                # The budget is spent: more LLM calls would only compete with narration
+                out_of_budget = True
+            except Exception as e:
+                logger.warning("Batched enemy planning failed, falling back to per-enemy calls: %s", e)
+        
+        if not out_of_budget and (stop_at is None or time.monotonic() < stop_at):
+            # Anyone the batch missed gets an individual (concurrent) intent call
+            missing = [enemy for enemy in enemies if enemy.id not in plans and enemy.id not in intents]
+            futures = {
+                enemy.id: self._intent_pool.submit(tracer.wrap(self._generate_intent), enemy, context)
+                for enemy in missing
+            }
+            done, _ = wait(futures.values(), timeout=None if stop_at is None else max(0.0, stop_at - time.monotonic()))
+            # A failed call leaves None, which skips that enemy's turn
+            intents.update((enemy_id, future.result()) for enemy_id, future in futures.items() if future in done)
+        
+        late = [enemy for enemy in enemies if enemy.id not in plans and enemy.id not in intents]
+        if late:
+            self._note_degraded("rule-based enemy plans")
+            plans.update((enemy.id, self._rule_based_plan(enemy, context)) for enemy in late)
+        return plans, intents
+    
+    def _call_until(self, stop_at: float | None, fn: Callable[..., T], *args: Any) -> T:
+        """fn(*args), given up on (TimeoutError) at stop_at; runs inline if there's no limit."""
+        if stop_at is None:
+            return fn(*args)
+        future = self._intent_pool.submit(tracer.wrap(fn), *args)
+        return future.result(timeout=max(0.0, stop_at - time.monotonic()))
+    
+    def _rule_based_plan(self, enemy: Entity, context: GameState) -> ActionPlan:
+        """No time to ask the GM: the enemy attacks the player with its equipped weapon."""
+        return build_attack_plan(enemy, context.player)
+
+    def _generate_intent(self, enemy: Entity, context: GameState) -> str | None:
+        """Ask the GM what an enemy does; a failed call just skips its turn."""
+        try:
+            with tracer.span("enemy_intent", entity_id=enemy.id):
+                return self.gm.generate_entity_intent(enemy, context)
+        except Exception as e:
+            logger.warning("Intent generation failed for %s: %s", enemy.id, e)
+            return None
 
     def _process_queue(self) -> None:
-        """Process actions until queue is empty or safety limit reached."""
+        """Process actions until queue is empty, safety limit reached, or the turn is out of time."""
         iterations = 0
         max_iterations = 50 
         
@@ -83,52 +317,108 @@ class GameController:
             if iterations >= max_iterations:
                 self.narration_buffer.append("[The chaos becomes too complex to follow...]")
                 break
+            
+            # The action that started this round always resolves; what it set off can be skipped
+            if iterations and self._out_of_time():
+                skipped = self.action_queue.clear()
+                self._note_degraded(f"skipped {len(skipped)} follow-up actions")
+                break
 
             self._resolve_action(self.action_queue.dequeue())
             iterations += 1
 
     def _resolve_action(self, action: Action) -> None:
         """Execute the Intent -> Plan -> Execute -> State pipeline for a single action."""
-        try:
-            # Phase 1: INTERPRET (LLM)
-            context = self.state.get_current_state()
-            action.plan = self.gm.interpret_action(action.intent_text, context)
+        with tracer.span("action", owner_id=action.owner_id) as span:
+            try:
+                self._run_phases(action)
+            except DeadlineExceededError as e:
+                if span is not None:
+                    span.set(error=repr(e))
+                self.narration_buffer.append(f"[Time runs out before '{action.intent_text}' can be resolved.]")
+            except Exception as e:
+                if span is not None:
+                    span.set(error=repr(e))
+                self.narration_buffer.append(f"[An error occurred processing action: {str(e)}]")
+
+    def _run_phases(self, action: Action) -> None:
+        # Phase 1: INTERPRET (LLM), unless the action arrived pre-planned
+        context = self.state.get_current_state()
+        early_rolls: Dict[int, RollResult] = {}
+        with tracer.span("interpret", preplanned=action.plan is not None):
+            if action.plan is None:
+                on_roll = (lambda index, spec: self._roll_early(index, spec, early_rolls)) if self.stream_plans else None
+                action.plan = self.gm.interpret_action(action.intent_text, context, action.owner_id, on_roll=on_roll)
             
             if action.plan is None:
                 self.narration_buffer.append(self.gm.explain_invalid_action(action.intent_text, context))
                 return
 
-            # Phase 2: EXECUTE (Engine)
+        # Phase 2: EXECUTE (Engine)
+        discarded = sum(
+            index >= len(action.plan.required_rolls) or result.spec != action.plan.required_rolls[index]
+            for index, result in early_rolls.items()
+        )
+        with tracer.span("execute", rolls=len(action.plan.required_rolls), early_rolls=len(early_rolls),
+                         discarded_early_rolls=discarded):
             action.resolution = Resolution(action_plan=action.plan)
-            action.resolution = self.engine.execute_plan(action.resolution)
-            
-            if action.resolution.narration_fragments:
-                self.narration_buffer.extend(action.resolution.narration_fragments)
-            
-            # Phase 3: APPLY STATE
+            action.resolution = self.engine.execute_plan(action.resolution, rolled=early_rolls)
+        
+        if action.resolution.narration_fragments:
+            self.narration_buffer.extend(action.resolution.narration_fragments)
+        
+        # Phase 3: APPLY STATE
+        with tracer.span("apply_state", changes=len(action.resolution.pending_state_changes)):
             for change in action.resolution.pending_state_changes:
                 self.state.apply_change(change)
-            
-            # # Phase 4: REACT
-            # for reaction in action.resolution.triggered_reactions:
-            #     desc = self.gm.describe_reaction(
-            #         reaction.owner_id, action, self.state.get_entity(reaction.owner_id)
-            #     )
-            #     # Queue reactions as new actions
-            #     # Note: Reaction objects usually have their own method to convert to Action, 
-            #     # but following your logic we treat them as intents here.
-            #     reaction.intent_text = desc 
-            #     self.action_queue.enqueue_reaction(reaction)
+        
+        # # Phase 4: REACT
+        # for reaction in action.resolution.triggered_reactions:
+        #     desc = self.gm.describe_reaction(
+        #         reaction.owner_id, action, self.state.get_entity(reaction.owner_id)
+        #     )
+        #     # Queue reactions as new actions
+        #     # Note: Reaction objects usually have their own method to convert to Action, 
+        #     # but following your logic we treat them as intents here.
+        #     reaction.intent_text = desc 
+        #     self.action_queue.enqueue_reaction(reaction)
 
-        except Exception as e:
-            self.narration_buffer.append(f"[An error occurred processing action: {str(e)}]")
+    def _roll_early(self, index: int, spec: RollSpec, rolled: Dict[int, RollResult]) -> None:
+        """
+        Roll the plan's first required roll while the rest of the plan is generated.
+        If the final plan changes that roll, the result is discarded, but its dice
+        stay drawn (and in the roll log), which keeps replays in step.
+        """
+        if index == 0:
+            with tracer.span("early_roll", index=index):
+                rolled[index] = self.engine.rules.execute_roll(spec)
 
+    def _llm_budget(self) -> float | None:
+        """Seconds left for LLM calls before narration's reserve; None without a deadline."""
+        current = current_deadline()
+        return None if current is None else current.remaining() - self.NARRATION_RESERVE
+    
+    def _out_of_time(self, reserve: float | None = None) -> bool:
+        """True if the turn's deadline leaves no more than reserve seconds (default NARRATION_RESERVE)."""
+        current = current_deadline()
+        reserve = self.NARRATION_RESERVE if reserve is None else reserve
+        return current is not None and current.remaining() <= reserve
+    
+    def _note_degraded(self, how: str) -> None:
+        logger.info("Turn deadline near: %s", how)
+        if (span := tracer.current_span()) is not None:
+            span.set(degraded=how)
+    
+    def combat_over(self) -> bool:
+        """True once the player has fallen or every enemy in the room is defeated."""
+        return self._check_combat_result() is not None
+    
     def _check_combat_result(self) -> str | None:
         """Return narration if combat resolved, otherwise None."""
         if not self._is_player_alive():
             return "\n[DEFEAT: You have fallen unconscious. Game Over.]"
         
-        if not len(self.state.get_alive_enemies_in_room()) == 0:
+        if len(self.state.get_alive_enemies_in_room()) == 0:
             return "\n[VICTORY: All enemies have been defeated!]"
         
         return None
@@ -0,0 +1,129 @@
+from typing import Dict, List
+
+from src.game.models import (
+    ActionPlan, ActionType, AttackStats, Attribute, Entity, Item,
+    PlayerCharacter, RollSpec, RollType, Room, StateChange,
+)
+
+# ============================================================
+# PLAN BUILDER
+# ============================================================
+# Builds ActionPlans straight from game state, without asking the GM.
+# Used wherever a plan can be derived mechanically (simulations, fast paths).
+
+Combatant = Entity | PlayerCharacter
+
+# Fallback when a combatant has no weapon equipped: 1 + STR bludgeoning
+UNARMED_STRIKE = Item(
+    id="unarmed_strike",
+    name="Unarmed Strike",
+    description="Fists, feet and elbows",
+    hp=(0, 0),
+    cost=0,
+    weight=0,
+    effects=[],
+    attack_stats=AttackStats(range=5, base_attribute=Attribute.STR, damage="1"),
+)
+
+
+def attribute_modifiers(combatant: Combatant) -> Dict[str, int]:
+    """Maps each attribute (STR, DEX...) to its D&D modifier: (val - 10) // 2"""
+    return {key: (value - 10) // 2 for key, value in combatant.attributes.items()}
+
+
+def equipped_weapon(combatant: Combatant) -> Item:
+    """The first equipped item with attack stats, or an unarmed strike."""
+    for item in combatant.equipped:
+        if item.attack_stats is not None:
+            return item
+    return UNARMED_STRIKE
+
+
+def build_attack_plan(
+    attacker: Combatant,
+    target: Combatant,
+    weapon: Item | None = None,
+) -> ActionPlan:
+    """
+    A weapon attack: 1d20 + attribute vs the target's AC, and on a hit a
+    damage roll whose total is removed from the target's HP.
+    """
+    weapon = weapon or equipped_weapon(attacker)
+    stats = weapon.attack_stats or UNARMED_STRIKE.attack_stats
+    attribute = Attribute(stats.base_attribute).value
+    context = attribute_modifiers(attacker)
+
+    attack_roll = RollSpec(
+        made_by=attacker.id,
+        type=RollType.ATTACK,
+        dice=f"1d20+{attribute}",
+        threshold=target.ac,
+        advantage=False,
+        disadvantage=False,
+        outcomes={"SUCCESS": [], "FAILURE": []},
+        explanation=f"{attacker.name} attacks {target.name} with {weapon.name}",
+        context=context,
+    )
+    damage_roll = RollSpec(
+        made_by=attacker.id,
+        type=RollType.DAMAGE,
+        dice=f"{stats.damage}+{attribute}",
+        threshold=0,
+        advantage=False,
+        disadvantage=False,
+        outcomes={
+            # value=None: the damage rolled is filled in by the RulesEngine
+            "SUCCESS": [StateChange(target_id=target.id, attribute="hp", operation="remove", value=None)],
+            "FAILURE": [],
+        },
+        explanation=f"{weapon.name} damage",
+        context=context,
+    )
+
+    return ActionPlan(
+        action_type=ActionType.ATTACK,
+        actor_id=attacker.id,
+        target_ids=[target.id],
+        required_rolls=[attack_roll],
+        conditional_rolls={0: [damage_roll]},
+        narrative_context=f"{attacker.name} attacks {target.name} with {weapon.name}",
+    )
+
+
+def build_move_plan(actor: Combatant, destination: str, target_ids: List[str] | None = None) -> ActionPlan:
+    """Movement within the room. Positions aren't tracked, so no rolls or state changes."""
+    return ActionPlan(
+        action_type=ActionType.MOVE,
+        actor_id=actor.id,
+        target_ids=target_ids or [],
+        narrative_context=f"{actor.name} moves {destination}".strip(),
+    )
+
+
+def build_pick_up_plan(actor: Combatant, item: Item, room: Room) -> ActionPlan:
+    """Move an item from the room into the actor's inventory."""
+    return ActionPlan(
+        action_type=ActionType.INTERACT,
+        actor_id=actor.id,
+        target_ids=[item.id],
+        on_success=[
+            StateChange(target_id=room.id, attribute="items", operation="remove", value=item),
+            StateChange(target_id=actor.id, attribute="inventory", operation="append", value=item),
+        ],
+        narrative_context=f"{actor.name} picks up the {item.name}",
+    )
+
+
+def build_drop_plan(actor: Combatant, item: Item, room: Room) -> ActionPlan:
+    """Move an item from the actor's inventory (or hands) onto the floor."""
+    source = "equipped" if item in actor.equipped else "inventory"
+    return ActionPlan(
+        action_type=ActionType.OTHER,
+        actor_id=actor.id,
+        target_ids=[item.id],
+        on_success=[
+            StateChange(target_id=actor.id, attribute=source, operation="remove", value=item),
+            StateChange(target_id=room.id, attribute="items", operation="append", value=item),
+        ],
+        narrative_context=f"{actor.name} drops the {item.name}",
+    )
@@ -1,7 +1,7 @@
 from src.game.models import ResolutionStatus, Resolution, RollType, RollResult, Action, ActionPlan
 from src.game.core.rules_engine import RulesEngine
 from src.game.core.state_manager import StateManager
-from typing import List
+from typing import Dict, List
 
 class ResolutionEngine:
     """
@@ -13,46 +13,49 @@ class ResolutionEngine:
         self.rules = rules_engine
         self.state = state_manager
     
-    def execute_plan(self, resolution: Resolution) -> Resolution:
+    def execute_plan(self, resolution: Resolution, rolled: Dict[int, RollResult] | None = None) -> Resolution:
         """
         Execute an ActionPlan step by step.
+        `rolled` holds required rolls already made while the plan was still
+        being generated, by index; a result is only used if its spec matches
+        the plan's roll at that index. A discarded early roll has still drawn
+        its dice, and a recording RollLog keeps them: replaying the session
+        makes the same early roll again, so the log must include it.
         Returns the Resolution with all results populated.
         """
         plan = resolution.action_plan
         resolution.status = ResolutionStatus.AWAITING_ROLL
         
-        # Process required rolls in order
-        all_rolls = list(plan.required_rolls)
-        roll_index = 0
+        # Required rolls are independent, so roll the rest as one batch
+        results = {
+            index: result for index, result in (rolled or {}).items()
+            if index < len(plan.required_rolls) and result.spec == plan.required_rolls[index]
+        }
+        pending = [index for index in range(len(plan.required_rolls)) if index not in results]
+        results.update(zip(pending, self.rules.execute_rolls([plan.required_rolls[i] for i in pending])))
+        required_results = [results[index] for index in range(len(plan.required_rolls))]
         
-        while roll_index < len(all_rolls):
-            roll_spec = all_rolls[roll_index]
-            
-            # Execute the roll
-            result = self.rules.execute_roll(roll_spec)
-            resolution.roll_results.append(result)
+        for roll_index, result in enumerate(required_results):
+            self._record_roll(resolution, result)
             
             # Check for conditional follow-up rolls
             if result.success and roll_index in plan.conditional_rolls:
-                # Insert conditional rolls right after this one
-                conditional = plan.conditional_rolls[roll_index]
-                for i, cond_roll in enumerate(conditional):
-                    all_rolls.insert(roll_index + 1 + i, cond_roll)
-            
-            # Build narration fragment for this roll
-            fragment = self._narrate_roll(result)
-            resolution.narration_fragments.append(fragment)
-            
-            roll_index += 1
+                # Resolve conditional rolls right after the roll that triggered them
+                for cond_result in self.rules.execute_rolls(plan.conditional_rolls[roll_index]):
+                    self._record_roll(resolution, cond_result)
         
         # Determine overall success
         overall_success = self._evaluate_success(resolution)
         
-        # Queue up appropriate state changes
+        # Queue up the state changes produced by each roll's outcome,
+        # then the plan's own changes for overall success or failure
+        resolution.pending_state_changes = [
+            change for result in resolution.roll_results for change in result.state_changes
+        ]
         if overall_success:
-            resolution.pending_state_changes = plan.on_success
+            resolution.pending_state_changes += plan.on_success
         else:
-            resolution.pending_state_changes = plan.on_failure
+            resolution.pending_state_changes += plan.on_failure
         
         # # Check for triggered reactions
         # resolution.triggered_reactions = self._check_reactions(
@@ -62,6 +65,11 @@ class ResolutionEngine:
         resolution.status = ResolutionStatus.RESOLVED
         return resolution
     
+    def _record_roll(self, resolution: Resolution, result: RollResult) -> None:
+        """Store a roll result and its narration fragment on the resolution"""
+        resolution.roll_results.append(result)
+        resolution.narration_fragments.append(self._narrate_roll(result))
+    
     def _evaluate_success(self, resolution: Resolution) -> bool:
         """Determine if the action succeeded overall"""
         # Simple version: all required rolls must succeed
@@ -72,7 +80,7 @@ class ResolutionEngine:
         # For attacks: first roll (attack) must succeed
         # Damage rolls don't affect "success"
         primary_rolls = [r for r in resolution.roll_results 
-                        if r.spec.roll_type in (RollType.ATTACK, RollType.CHECK, 
+                        if r.spec.type in (RollType.ATTACK, RollType.CHECK, 
                                                  RollType.SAVE)]
         return all(r.success for r in primary_rolls)
     
@@ -102,6 +110,6 @@ class ResolutionEngine:
         # elif result.critical_failure:
         #     return f"[CRITICAL FAILURE] {result.spec.reason}: {result.natural_roll}"
         if result.success:
-            return f"[SUCCESS] {result.spec.reason}: rolled {result.total} vs {result.spec.dc or result.spec.target_ac}"
+            return f"[SUCCESS] {result.spec.explanation}: rolled {result.roll} vs {result.spec.threshold}"
         else:
-            return f"[FAILURE] {result.spec.reason}: rolled {result.total} vs {result.spec.dc or result.spec.target_ac}"
\ No newline at end of file
+            return f"[FAILURE] {result.spec.explanation}: rolled {result.roll} vs {result.spec.threshold}"
\ No newline at end of file
@@ -0,0 +1,112 @@
+import random
+from typing import List
+
+import numpy as np
+
+from src.game.core.roll_log import RollLog
+
+# ============================================================
+# DICE STREAMS
+# ============================================================
+# A dice stream is where a RulesEngine gets its die faces from. It exposes
+# randint() for scalar rolls and integers() for vectorized batches, which is
+# all CompiledFormula needs.
+
+SeedLike = int | np.random.SeedSequence | None
+
+
+class DiceStream:
+    """
+    Seeded, per-session source of die faces.
+
+    Scalar rolls use a random.Random and batches use a NumPy Generator, both
+    derived from one SeedSequence so the whole session is reproducible from a
+    single seed. Independent child streams for worker processes come from
+    spawn(). When recording, every face drawn is appended to self.log.
+    """
+
+    def __init__(self, seed: SeedLike = None, record: bool = False):
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        self.log = RollLog(seed=self.seed) if record else None
+
+        # PCG64 consumes the first four 64-bit words of the seed state;
+        # the Mersenne Twister gets the next four so the streams don't overlap.
+        state = self.seed_sequence.generate_state(8, np.uint64)
+        self._random = random.Random(int.from_bytes(state[4:].tobytes(), "little"))
+        self._generator = np.random.Generator(np.random.PCG64(self.seed_sequence))
+
+        if self.log is None:
+            # Nothing to record: hand out the underlying methods directly
+            self.randint = self._random.randint
+            self.integers = self._generator.integers
+
+    @property
+    def seed(self) -> dict:
+        """JSON-friendly description of the seed, for storing alongside a RollLog."""
+        return {
+            "entropy": self.seed_sequence.entropy,
+            "spawn_key": list(self.seed_sequence.spawn_key),
+        }
+
+    @classmethod
+    def from_seed(cls, seed: dict, record: bool = False) -> "DiceStream":
+        """Rebuild a stream from the description returned by .seed (e.g. RollLog.seed)"""
+        sequence = np.random.SeedSequence(seed["entropy"], spawn_key=tuple(seed["spawn_key"]))
+        return cls(sequence, record)
+
+    def spawn(self, n: int) -> List[np.random.SeedSequence]:
+        """Independent child seeds, e.g. one per worker process."""
+        return self.seed_sequence.spawn(n)
+
+    def randint(self, a: int, b: int) -> int:
+        face = self._random.randint(a, b)
+        self.log.faces.append(face)
+        return face
+
+    def integers(self, low, high, size=None, endpoint: bool = False) -> np.ndarray:
+        faces = self._generator.integers(low, high, size=size, endpoint=endpoint)
+        self.log.faces.extend(np.ravel(faces).tolist())
+        return faces
+
+
+class ReplayStream:
+    """
+    Dice stream that serves the faces recorded in a RollLog, in order.
+    A RulesEngine driven by it reproduces the logged session exactly.
+    """
+
+    def __init__(self, log: RollLog):
+        self._faces = log.faces
+        self._position = 0
+
+    @property
+    def remaining(self) -> int:
+        return len(self._faces) - self._position
+
+    def randint(self, a: int, b: int) -> int:
+        if self._position >= len(self._faces):
+            raise ValueError("Replay log exhausted: more dice were rolled than were recorded.")
+        face = self._faces[self._position]
+        if not a <= face <= b:
+            raise ValueError(
+                f"Replay diverged at face {self._position}: recorded {face}, expected a d{b}."
+            )
+        self._position += 1
+        return face
+
+    def integers(self, low, high, size=None, endpoint: bool = False) -> np.ndarray:
+        shape = size if size is not None else np.broadcast(low, high).shape
+        count = int(np.prod(shape))
+        end = self._position + count
+        if end > len(self._faces):
+            raise ValueError("Replay log exhausted: more dice were rolled than were recorded.")
+
+        faces = np.array(self._faces[self._position:end], dtype=np.int64).reshape(shape)
+        upper = high if endpoint else np.asarray(high) - 1
+        if np.any(faces < low) or np.any(faces > upper):
+            raise ValueError(f"Replay diverged within faces {self._position}-{end}.")
+        self._position = end
+        return faces
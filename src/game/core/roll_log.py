@@ -0,0 +1,89 @@
+import json
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence
+
+# ============================================================
+# ROLL LOG
+# ============================================================
+
+class LoggedRoll(NamedTuple):
+    formula: str
+    total: int                  # Dice total, before attribute/flat modifiers
+
+
+class RollLog:
+    """
+    Compact, append-only record of every roll a RulesEngine makes.
+
+    Formulas are interned into a table, and every die face drawn is kept
+    in draw order so a ReplayStream can feed the exact same dice back to a
+    fresh engine. Two logs can be compared with first_divergence() to
+    bisect where a replay (or a code change) started rolling differently.
+    Early rolls that the final ActionPlan discarded are included, since a
+    replay draws them too.
+    """
+
+    def __init__(self, seed: Dict[str, Any] | None = None):
+        self.seed = seed                        # Seed that produced these rolls, if known
+        self.formulas: List[str] = []
+        self._formula_ids: Dict[str, int] = {}
+        self.formula_ids = array('I')           # One entry per roll
+        self.totals = array('q')                # One entry per roll
+        self.faces = array('I')                 # Every die face, in draw order (up to MAX_DIE_SIDES)
+
+    def __len__(self) -> int:
+        return len(self.formula_ids)
+
+    def __iter__(self) -> Iterator[LoggedRoll]:
+        for formula_id, total in zip(self.formula_ids, self.totals):
+            yield LoggedRoll(self.formulas[formula_id], total)
+
+    def record(self, formula: str, total: int) -> None:
+        """Append a single roll of a formula."""
+        self.formula_ids.append(self._intern(formula))
+        self.totals.append(total)
+
+    def record_many(self, formula: str, totals: Sequence[int]) -> None:
+        """Append a batch of rolls of the same formula."""
+        self.formula_ids.extend([self._intern(formula)] * len(totals))
+        self.totals.extend(totals)
+
+    def first_divergence(self, other: "RollLog") -> int | None:
+        """Index of the first roll that differs between two logs, or None if they match."""
+        for index, (mine, theirs) in enumerate(zip(self, other)):
+            if mine != theirs:
+                return index
+        if len(self) != len(other):
+            return min(len(self), len(other))
+        return None
+
+    def save(self, path: Path) -> None:
+        """Write the log as a single JSON document."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "seed": self.seed,
+            "formulas": self.formulas,
+            "formula_ids": self.formula_ids.tolist(),
+            "totals": self.totals.tolist(),
+            "faces": self.faces.tolist(),
+        }))
+
+    @classmethod
+    def load(cls, path: Path) -> "RollLog":
+        """Read a log written by save()."""
+        data = json.loads(path.read_text())
+        log = cls(seed=data.get("seed"))
+        log.formulas = list(data["formulas"])
+        log._formula_ids = {formula: i for i, formula in enumerate(log.formulas)}
+        log.formula_ids.extend(data["formula_ids"])
+        log.totals.extend(data["totals"])
+        log.faces.extend(data["faces"])
+        return log
+
+    def _intern(self, formula: str) -> int:
+        formula_id = self._formula_ids.get(formula)
+        if formula_id is None:
+            formula_id = self._formula_ids[formula] = len(self.formulas)
+            self.formulas.append(formula)
+        return formula_id
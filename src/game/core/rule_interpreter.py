@@ -0,0 +1,272 @@
+"""Deterministic fast-path interpreter for common intents, so they can skip the GM LLM."""
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from src.game.core.plan_builder import (
+    Combatant, build_attack_plan, build_drop_plan, build_move_plan,
+    build_pick_up_plan, equipped_weapon,
+)
+from src.game.models import ActionPlan, Entity, GameState, Item
+
+logger = logging.getLogger(__name__)
+
+
+# Intent vocabularies, matched as whole words against the normalized intent
+MELEE_VERBS = {"attack", "attacks", "hit", "hits", "strike", "strikes", "swing", "swings",
+               "slash", "slashes", "stab", "stabs", "chop", "chops", "cleave", "cleaves",
+               "smash", "smashes", "bash", "bashes", "punch", "punches", "lunge", "lunges"}
+RANGED_VERBS = {"shoot", "shoots", "fire", "fires", "throw", "throws", "hurl", "hurls"}
+MOVE_VERBS = {"move", "moves", "walk", "walks", "run", "runs", "go", "goes", "step", "steps",
+              "approach", "approaches", "advance", "advances", "retreat", "retreats"}
+RETREAT_WORDS = {"retreat", "retreats", "flee", "flees", "away"}
+PICK_UP_PHRASES = ("pick up", "picks up", "grab", "grabs", "take", "takes", "collect", "collects")
+DROP_PHRASES = ("drop", "drops", "put down", "puts down", "discard", "discards")
+
+# Anything that hints at a compound or unusual action is left to the LLM
+COMPLEX_WORDS = {"and", "then", "while", "if", "unless", "before", "after", "try", "tries",
+                 "pretend", "feint", "disarm", "grapple", "trip", "shove", "cast", "spell",
+                 "sneak", "hide", "persuade", "intimidate"}
+PLAYER_WORDS = {"player", "you", "barbarian", "adventurer", "hero", "intruder"}
+
+# Words that can sit around a name without being one ("the goblin over there")
+FILLER_WORDS = {"the", "a", "an", "my", "his", "her", "its", "their", "your", "this", "that",
+                "at", "with", "using", "to", "toward", "towards", "from", "of", "on", "in", "into",
+                "over", "again", "now", "here", "there", "away", "back", "him", "them", "it",
+                "nearest", "closest", "other", "first", "last", "next", "same", "hard", "quickly"}
+NAME_QUALIFIERS = {"nearest", "closest", "other", "first", "last", "next", "same"}
+
+# Confidence of guesses the GMOracle should not trust on their own (its threshold is 0.8)
+SHARED_NAME_CONFIDENCE = 0.7        # "goblin" with several goblins around
+UNKNOWN_NAME_CONFIDENCE = 0.5       # "goblin archer" when there is no archer
+NO_DESTINATION_CONFIDENCE = 0.7     # "I go to the door" with no door in the scene
+
+# Attack stats range above this counts as a ranged (or thrown) weapon
+MELEE_RANGE = 5
+
+
+@dataclass
+class FastPathMatch:
+    """A rule-based interpretation and how sure the rules are about it."""
+    plan: ActionPlan | None
+    confidence: float
+    reason: str = ""
+    compound: bool = False              # The intent hints at more than one simple action
+
+    @classmethod
+    def no_match(cls, reason: str) -> "FastPathMatch":
+        return cls(plan=None, confidence=0.0, reason=reason)
+
+
+class RuleBasedInterpreter:
+    """
+    Turns simple intents (melee or ranged attacks, moving, picking up and
+    dropping items) into ActionPlans built straight from the GameState:
+    equipped weapon AttackStats, target AC and attribute modifiers.
+
+    It never guesses silently: every match carries a confidence, and the
+    GMOracle only trusts it above its fast_path_threshold, otherwise asking
+    the LLM.
+    """
+
+    def interpret(
+        self,
+        intent_text: str,
+        state: GameState,
+        actor_id: str | None = None,
+    ) -> FastPathMatch:
+        text = _normalize(intent_text)
+        words = set(text.split())
+        actor = self._resolve_actor(state, actor_id)
+        if actor is None:
+            return FastPathMatch.no_match(f"unknown actor {actor_id}")
+
+        # Compound or exotic requests need the GM's judgement
+        compound = bool(words & COMPLEX_WORDS)
+        penalty = 0.5 if compound else 0.0
+
+        categories = []
+        if words & (MELEE_VERBS | RANGED_VERBS):
+            categories.append("attack")
+        if words & MOVE_VERBS:
+            categories.append("move")
+        if _has_phrase(text, PICK_UP_PHRASES):
+            categories.append("pick_up")
+        if _has_phrase(text, DROP_PHRASES):
+            categories.append("drop")
+
+        if len(categories) != 1:
+            return FastPathMatch.no_match(
+                "no recognized intent" if not categories else f"ambiguous intent: {categories}"
+            )
+
+        match categories[0]:
+            case "attack":
+                result = self._interpret_attack(text, words, actor, state)
+            case "move":
+                result = self._interpret_move(text, actor, state)
+            case "pick_up":
+                result = self._interpret_item(text, actor, state, state.location.items, build_pick_up_plan)
+            case _:
+                result = self._interpret_item(
+                    text, actor, state, list(actor.inventory) + list(actor.equipped), build_drop_plan
+                )
+
+        result.confidence = max(0.0, result.confidence - penalty)
+        result.compound = compound
+        return result
+
+    # ------------------------------------------------------------------
+    # Intents
+    # ------------------------------------------------------------------
+
+    def _interpret_attack(self, text: str, words: set, actor: Combatant, state: GameState) -> FastPathMatch:
+        confidence = 1.0
+        is_player = actor is state.player
+
+        # Target: the player attacks enemies, enemies attack the player
+        if is_player:
+            candidates = [e for e in state.location.occupants if e.hp > 0]
+            target, target_confidence = _match_by_name(text, candidates)
+            if target is None and len(candidates) == 1:
+                # "attack the orc" with only a goblin left is not a confident match
+                known = [c.name or "" for c in candidates] + [i.name or "" for i in actor.equipped + actor.inventory]
+                unknown = _unmatched_names(text, known)
+                target, target_confidence = candidates[0], UNKNOWN_NAME_CONFIDENCE if unknown else 0.9
+        else:
+            target = state.player
+            target_confidence = 1.0 if words & PLAYER_WORDS or state.player.name.lower() in text else 0.9
+
+        if target is None:
+            return FastPathMatch.no_match("no target found")
+        confidence = min(confidence, target_confidence)
+
+        # Weapon: one named in the intent, otherwise whatever is equipped
+        weapons = [item for item in list(actor.equipped) + list(actor.inventory) if item.attack_stats]
+        weapon, weapon_confidence = _match_by_name(text, weapons)
+        if weapon is None:
+            weapon = equipped_weapon(actor)
+            # "with my sword" when there is no sword
+            if is_player and re.search(r"\bwith (my|the|a)\b", text):
+                confidence = min(confidence, 0.6)
+        else:
+            confidence = min(confidence, weapon_confidence)
+
+        is_ranged = weapon.attack_stats is not None and weapon.attack_stats.range > MELEE_RANGE
+        if words & RANGED_VERBS and not is_ranged:
+            return FastPathMatch.no_match(f"can't shoot or throw {weapon.name}")
+
+        plan = build_attack_plan(actor, target, weapon)
+        return FastPathMatch(plan, confidence, f"attack {target.id} with {weapon.name}")
+
+    def _interpret_move(self, text: str, actor: Combatant, state: GameState) -> FastPathMatch:
+        things = [e for e in state.location.occupants if e is not actor] + list(state.location.items)
+        target, confidence = _match_by_name(text, things)
+        if confidence < 1.0:
+            # "toward the goblin" with several goblins around, or "to the door"
+            # with no door: no specific target, so leave the destination to the LLM
+            target = None
+        retreating = bool(set(text.split()) & RETREAT_WORDS)
+        if target:
+            destination = f"{'away from' if retreating else 'toward'} the {target.name}"
+        else:
+            destination = "away" if retreating else ""
+        plan = build_move_plan(actor, destination, [target.id] if target else [])
+        return FastPathMatch(plan, 1.0 if target else NO_DESTINATION_CONFIDENCE, f"move {destination}".strip())
+
+    def _interpret_item(self, text, actor, state, items: Sequence[Item], build) -> FastPathMatch:
+        item, confidence = _match_by_name(text, list(items))
+        if item is None:
+            return FastPathMatch.no_match("item not found")
+        plan = build(actor, item, state.location)
+        return FastPathMatch(plan, confidence, f"{plan.action_type.value} {item.id}")
+
+    def _resolve_actor(self, state: GameState, actor_id: str | None) -> Combatant | None:
+        if actor_id in (None, "player", state.player.id):
+            return state.player
+        for entity in state.location.occupants:
+            if entity.id == actor_id:
+                return entity
+        return None
+
+
+# ----------------------------------------------------------------------
+# Matching helpers
+# ----------------------------------------------------------------------
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split())
+
+
+def _has_phrase(text: str, phrases: Sequence[str]) -> bool:
+    padded = f" {text} "
+    return any(f" {phrase} " in padded for phrase in phrases)
+
+
+def _name_words(name: str) -> List[str]:
+    return [w for w in _normalize(name).split() if len(w) > 2]
+
+
+def _match_by_name(text: str, candidates: List[Entity | Item]):
+    """
+    Find the candidate the text refers to.
+
+    Returns (candidate, confidence): 1.0 for a full name or a word only one
+    candidate has ("sniper"). A word shared by several ("goblin") takes the
+    first match at SHARED_NAME_CONFIDENCE, or UNKNOWN_NAME_CONFIDENCE when a
+    name-like word next to it matches no candidate ("goblin archer"); both
+    are below the GMOracle's threshold. (None, 0.0) if nothing matches.
+    """
+    words = set(text.split())
+    shared: List[Entity | Item] = []
+    shared_word = ""
+
+    for candidate in candidates:
+        name = _normalize(candidate.name or "")
+        if name and f" {name} " in f" {text} ":
+            return candidate, 1.0
+
+    for candidate in candidates:
+        for word in _name_words(candidate.name or ""):
+            if word in words or word.rstrip("s") in words or f"{word}s" in words:
+                owners = [c for c in candidates if word in _name_words(c.name or "")]
+                if len(owners) == 1:
+                    return candidate, 1.0
+                shared.append(candidate)
+                shared_word = shared_word or word
+                break
+
+    if shared:
+        tokens = text.split()
+        following = [tokens[i + 1] for i, token in enumerate(tokens[:-1])
+                     if token.rstrip("s") == shared_word.rstrip("s")]
+        known = [c.name or "" for c in candidates]
+        if _unmatched_names(" ".join(following), known, anywhere=True):
+            return shared[0], UNKNOWN_NAME_CONFIDENCE
+        return shared[0], SHARED_NAME_CONFIDENCE
+    return None, 0.0
+
+
+def _unmatched_names(text: str, known_names: Sequence[str], anywhere: bool = False) -> List[str]:
+    """
+    Name-like words in text that belong to none of known_names: words after
+    "the"/"a"/"an" (skipping "nearest" and the like), or any word if anywhere.
+    """
+    known = {w.rstrip("s") for name in known_names for w in _name_words(name)}
+    vocabulary = FILLER_WORDS | PLAYER_WORDS | MELEE_VERBS | RANGED_VERBS | MOVE_VERBS | COMPLEX_WORDS
+    tokens = text.split()
+    if anywhere:
+        positions = range(len(tokens))
+    else:
+        positions = []
+        for i, token in enumerate(tokens):
+            if token in ("the", "a", "an"):
+                j = i + 1
+                while j < len(tokens) and tokens[j] in NAME_QUALIFIERS:
+                    j += 1
+                positions.append(j)
+    return [tokens[j] for j in positions
+            if j < len(tokens) and len(tokens[j]) > 2
+            and tokens[j] not in vocabulary and tokens[j].rstrip("s") not in known]
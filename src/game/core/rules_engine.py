@@ -1,18 +1,53 @@
-import re
-import random
-from typing import Dict
-from src.game.models import RollResult, RollOutcome, RollSpec
+from typing import Dict, List
+import numpy as np
+from src.game.models import RollResult, RollOutcome, RollSpec, RollType
+from src.game.core.dice import CompiledFormula, compile_formula
+from src.game.core.dice_distribution import DiceDistribution
+from src.game.core.rng import DiceStream, ReplayStream, SeedLike
+from src.game.core.roll_log import RollLog
 
 # ============================================================
 # RULES ENGINE
 # ============================================================
 
+# Below this many draws per formula, NumPy call overhead outweighs
+# vectorization and execute_rolls falls back to scalar rolls.
+BATCH_THRESHOLD = 16
+
 class RulesEngine:
     """
     Central logic for resolving game mechanics, dice rolls, 
     and calculating outcomes.
     """
 
+    def __init__(self, seed: SeedLike = None, record: bool = False):
+        """
+        Args:
+            seed: Seed (or SeedSequence) for this engine's dice. None draws fresh
+                  OS entropy; the seed actually used is kept on dice.seed.
+            record: Keep an append-only RollLog of every roll, for replaying a
+                    session. It grows for as long as the engine lives, so only
+                    sessions that will be replayed should turn it on.
+        """
+        self.dice = DiceStream(seed, record)
+        self.roll_log = self.dice.log
+        self.distributions = DiceDistribution()
+
+    @classmethod
+    def replay(cls, log: RollLog) -> "RulesEngine":
+        """
+        An engine that rolls exactly the dice recorded in a log.
+        Its own roll_log can be compared to the original with first_divergence().
+        """
+        engine = cls(record=False)
+        engine.dice = ReplayStream(log)
+        engine.roll_log = RollLog(seed=log.seed)
+        return engine
+
+    def spawn(self, n: int, record: bool = False) -> List["RulesEngine"]:
+        """Independent child engines (e.g. one per worker) derived from this engine's seed."""
+        return [RulesEngine(seed, record) for seed in self.dice.spawn(n)]
+
     def calculate_modifier(self, attribute_value: int) -> int:
         """
         Calculates standard D&D style modifier: (val - 10) // 2
@@ -20,68 +55,55 @@ class RulesEngine:
         """
         return (attribute_value - 10) // 2
 
+    def compile(self, formula: str) -> CompiledFormula:
+        """Returns the cached, pre-parsed form of a dice formula."""
+        return compile_formula(formula)
+
     def roll_dice(self, formula: str, context: Dict[str, int] = None) -> int:
         """
-        Parses a dice string (e.g., '1d20+5', '2d6', '1d20+STR') and rolls it.
+        Parses a dice string (e.g., '1d20+5', '2d6', '1d20+STR', '2d6+1d4+STR-1') and rolls it.
         
         Args:
             formula: The dice string.
             context: A dictionary mapping attribute names (STR, DEX) to their *modifiers*.
                      Used if the formula contains non-numeric modifiers.
         """
-        # Regex to match XdY followed optionally by +Z or -Z (where Z is number or string)
-        # Group 1: Num Dice, Group 2: Die Sides, Group 3: Modifier (optional)
-        pattern = r"(\d+)d(\d+)([+-]\w+)?"
-        match = re.fullmatch(pattern, formula.strip())
-
-        if not match:
-            raise ValueError(f"Invalid dice formula format: {formula}")
-
-        num_dice = int(match.group(1))
-        die_sides = int(match.group(2))
-        modifier_str = match.group(3)
-
-        # 1. Roll the dice
-        total = 0
-        for _ in range(num_dice):
-            total += random.randint(1, die_sides)
-
-        # 2. Add modifier if it exists
-        if modifier_str:
-            sign = 1 if modifier_str[0] == '+' else -1
-            value_part = modifier_str[1:]
-
-            if value_part.isdigit():
-                # Static number (e.g., +5)
-                mod_value = int(value_part)
-            else:
-                # Attribute reference (e.g., +STR)
-                if context is None:
-                    raise ValueError(f"Formula requires context for attribute '{value_part}' but none provided.")
-                
-                # Check if key exists (case-insensitive handling recommended elsewhere, assuming strict here)
-                key = value_part.upper() 
-                if key not in context:
-                    # Fallback or error? For now, 0 if missing to prevent crash, but logging would be good.
-                    mod_value = 0 
-                else:
-                    mod_value = context[key]
-            
-            total += (sign * mod_value)
-
-        return total
+        compiled = compile_formula(formula)
+        return self._draw(compiled) + compiled.modifier(context)
 
     def roll_with_advantage(self, formula: str, context: Dict[str, int] = None) -> int:
         """Rolls twice and takes the higher result."""
-        r1 = self.roll_dice(formula, context)
-        r2 = self.roll_dice(formula, context)
-        return max(r1, r2)
+        compiled = compile_formula(formula)
+        return max(self._draw(compiled), self._draw(compiled)) + compiled.modifier(context)
 
     def roll_with_disadvantage(self, formula: str, context: Dict[str, int] = None) -> int:
         """Rolls twice and takes the lower result."""
-        r1 = self.roll_dice(formula, context)
-        r2 = self.roll_dice(formula, context)
-        return min(r1, r2)
+        compiled = compile_formula(formula)
+        return min(self._draw(compiled), self._draw(compiled)) + compiled.modifier(context)
+
+    def roll_many(
+        self,
+        formula: str,
+        n: int,
+        context: Dict[str, int] = None,
+        advantage: bool = False,
+        disadvantage: bool = False,
+    ) -> np.ndarray:
+        """
+        Rolls a formula n independent times in one vectorized batch.
+        Advantage and disadvantage cancel out, as in execute_roll.
+        """
+        compiled = compile_formula(formula)
+        modifier = compiled.modifier(context)
+        if advantage == disadvantage:
+            return self._draw_many(compiled, n) + modifier
+
+        pairs = self._draw_many(compiled, 2 * n).reshape(n, 2)
+        return (pairs.max(axis=1) if advantage else pairs.min(axis=1)) + modifier
+
+    def success_probability(self, spec: RollSpec) -> float:
+        """Exact chance that executing the spec succeeds (no simulation)."""
+        return self.distributions.success_probability(spec)
 
     def execute_roll(self, spec: RollSpec) -> RollResult:
         """
@@ -104,6 +126,73 @@ class RulesEngine:
             # Standard roll (or if both adv and dis exist, they cancel out)
             total = self.roll_dice(spec.dice, spec.context)
 
+        return self._build_result(spec, total)
+
+    def execute_rolls(self, specs: List[RollSpec]) -> List[RollResult]:
+        """
+        Executes many independent roll specifications at once.
+        
+        Specs sharing a dice formula are rolled together in a single NumPy draw
+        (two draws per spec with advantage/disadvantage), so an AOE save against
+        a crowd costs one call instead of one per die.
+        Results are returned in the same order as the specs.
+        """
+        results: List[RollResult | None] = [None] * len(specs)
+
+        # Group spec indices by formula so each formula is drawn once
+        groups: Dict[str, List[int]] = {}
+        for i, spec in enumerate(specs):
+            groups.setdefault(spec.dice, []).append(i)
+
+        for formula, indices in groups.items():
+            compiled = compile_formula(formula)
+            modes = [self._roll_mode(specs[i]) for i in indices]
+            extra = sum(1 for mode in modes if mode)
+
+            if len(indices) + extra < BATCH_THRESHOLD:
+                for i in indices:
+                    results[i] = self.execute_roll(specs[i])
+                continue
+
+            # Dice-only totals: first len(indices) are every spec's main roll,
+            # the rest are second rolls for advantage/disadvantage
+            draws = self._draw_many(compiled, len(indices) + extra)
+            seconds = iter(draws[len(indices):].tolist())
+
+            for i, mode, first in zip(indices, modes, draws[:len(indices)].tolist()):
+                if mode > 0:
+                    first = max(first, next(seconds))
+                elif mode < 0:
+                    first = min(first, next(seconds))
+                total = first + compiled.modifier(specs[i].context)
+                results[i] = self._build_result(specs[i], total)
+
+        return results
+
+    def _draw(self, compiled: CompiledFormula) -> int:
+        """Roll a formula's dice once from this engine's stream, logging the total."""
+        total = compiled.draw(self.dice)
+        if self.roll_log is not None:
+            self.roll_log.record(compiled.formula, total)
+        return total
+
+    def _draw_many(self, compiled: CompiledFormula, n: int) -> np.ndarray:
+        """Roll a formula's dice n times in one batch, logging every total."""
+        totals = compiled.draw_dice(n, self.dice)
+        if self.roll_log is not None:
+            self.roll_log.record_many(compiled.formula, totals.tolist())
+        return totals
+
+    def _roll_mode(self, spec: RollSpec) -> int:
+        """1 for advantage, -1 for disadvantage, 0 for a straight roll."""
+        if spec.advantage and not spec.disadvantage:
+            return 1
+        if spec.disadvantage and not spec.advantage:
+            return -1
+        return 0
+
+    def _build_result(self, spec: RollSpec, total: int) -> RollResult:
+        """Compares a rolled total to the spec's threshold."""
         # Determine Outcome
         # Note: In standard 5e, meeting the DC is a success.
         if total >= spec.threshold:
@@ -113,9 +202,16 @@ class RulesEngine:
             outcome = RollOutcome.FAILURE
             changes = spec.outcomes.get("FAILURE", [])
 
+        # Damage outcomes with no value apply whatever was rolled
+        if spec.type == RollType.DAMAGE:
+            changes = [
+                change.model_copy(update={"value": max(total, 0)}) if change.value is None else change
+                for change in changes
+            ]
+
         return RollResult(
             spec=spec,
             roll=total,
             outcome=outcome,
             state_changes=changes
-        )
\ No newline at end of file
+        )
@@ -15,10 +15,10 @@ class StateManager:
         self._state = initial_state
 
     def get_current_state(self) -> GameState:
-        """Return the current snapshot of the game state."""
+        """Return the live game state; deep-copy it for a snapshot."""
         return self._state
 
-    def get_player_chracter(self) -> PlayerCharacter:
+    def get_player_character(self) -> PlayerCharacter:
         """Return the PlayerCharacter."""
         return self._state.player
 
@@ -1,16 +1,84 @@
+from src.game.config.settings import settings
 from src.game.llm.client import OllamaClient
+from src.game.llm.async_client import AsyncOllamaClient, bypassed_layers
 from src.game.llm.gm_oracle import GMOracle
 from src.game.llm.narrator_oracle import NarratorOracle
+from src.game.llm.plan_cache import ActionPlanCache
+from src.game.llm.response_cache import ResponseCache
+from src.game.llm.resilience import CircuitBreaker, RetryPolicy
+from src.game.llm.router import ModelRouter
 
-llm_client = OllamaClient()
-gm_oracle = GMOracle(llm_client)
-narrator_oracle = NarratorOracle(llm_client)
+response_cache = None
+if settings.llm_cache_mode != "off":
+    response_cache = ResponseCache(
+        db_path=settings.llm_cache_path,
+        mode=settings.llm_cache_mode,
+        max_entries=settings.llm_cache_max_entries,
+        ttl_seconds=settings.llm_cache_ttl,
+    )
+
+retry_policy = RetryPolicy(
+    max_retries=settings.max_retries,
+    base_delay=settings.llm_backoff_base,
+    max_delay=settings.llm_backoff_max,
+)
+
+
+def _make_client(model_name: str, fallback: OllamaClient | None = None) -> OllamaClient:
+    """A client for one model; each gets its own circuit breaker."""
+    return OllamaClient(
+        model_name=model_name,
+        base_url=settings.ollama_host,
+        timeout=settings.llm_timeout,
+        response_cache=response_cache,
+        coalesce_requests=settings.coalesce_llm_requests,
+        retry_policy=retry_policy,
+        circuit_breaker=CircuitBreaker(settings.llm_breaker_threshold, settings.llm_breaker_cooldown),
+        fallback=fallback,
+        temperature=settings.llm_temperature,
+        keep_alive=settings.llm_keep_alive,
+    )
+
+
+fallback_client = _make_client(settings.llm_fallback_model) if settings.llm_fallback_model else None
+llm_client = _make_client(settings.answerer_model, fallback=fallback_client)
+router_client = _make_client(settings.router_model)
+llm_router = ModelRouter({"router": router_client, "answerer": llm_client})
+async_llm_client = AsyncOllamaClient(
+    model_name=settings.answerer_model,
+    base_url=settings.ollama_host,
+    timeout=settings.llm_timeout,
+    max_in_flight=settings.llm_max_in_flight,
+    temperature=settings.llm_temperature,
+    keep_alive=settings.llm_keep_alive,
+    circuit_breaker=llm_client.circuit_breaker,
+)
+plan_cache = ActionPlanCache(
+    max_entries=settings.plan_cache_size,
+    db_path=settings.plan_cache_path if settings.persist_plan_cache else None,
+)
+# The oracles' async calls only use the async client when it skips none of
+# the router's layers; otherwise they run the sync calls in worker threads
+oracle_async_client = async_llm_client if not bypassed_layers(llm_router, async_llm_client) else None
+gm_oracle = GMOracle(llm_router, plan_cache=plan_cache, async_llm_client=oracle_async_client)
+narrator_oracle = NarratorOracle(llm_router, async_llm_client=oracle_async_client)
 
 __all__ = [
     'llm_client',
+    'async_llm_client',
+    'router_client',
+    'llm_router',
+    'plan_cache',
+    'response_cache',
     'gm_oracle',
     'narrator_oracle',
     'OllamaClient',
+    'AsyncOllamaClient',
     'GMOracle',
-    'NarratorOracle'
+    'NarratorOracle',
+    'ActionPlanCache',
+    'ResponseCache',
+    'RetryPolicy',
+    'CircuitBreaker',
+    'ModelRouter'
 ]
\ No newline at end of file
@@ -0,0 +1,352 @@
+"""Asynchronous Ollama client with a shared connection pool and an in-flight limit."""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, List, Type, TypeVar
+
+import httpx
+import ollama
+from pydantic import BaseModel
+
+from src.game.config.settings import DEFAULT_KEEP_ALIVE
+from src.game.llm.client import OllamaClient, llm_usage, record_llm_usage
+from src.game.llm.profiles import DEFAULT_PROFILE, GenerationProfile
+from src.game.llm.resilience import CircuitBreaker
+from src.game.llm.router import ModelRouter
+from src.game.llm.structured import json_schema, parse_structured_response
+from src.game.utils.deadline import check_deadline, time_left
+from src.game.utils.metrics import MetricsRegistry, metrics as default_metrics
+from src.game.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class AsyncOllamaClient:
+    """Awaitable counterpart to OllamaClient.
+
+    Every call goes through one ollama.AsyncClient, so all callers share a
+    single keep-alive connection pool, and through a semaphore that caps how
+    many requests are in flight at once. Callers beyond the cap wait their
+    turn instead of stacking up on the Ollama server. Each call can override
+    the client-wide timeout.
+
+    The underlying httpx pool binds to the event loop that first uses it, so
+    use one instance per loop.
+
+    It has none of OllamaClient's response cache (or replay mode), request
+    coalescing, fallback model or per-route model tiers, and only shares a
+    circuit breaker when given one. The oracles therefore refuse one next to
+    a sync client that uses any of those (see bypassed_layers()), and run the
+    sync call in a worker thread instead.
+
+    Example:
+        >>> client = AsyncOllamaClient(max_in_flight=2)
+        >>> intents = await asyncio.gather(
+        ...     client.generate("What does the goblin do?"),
+        ...     client.generate("What does the orc do?"),
+        ... )
+    """
+
+    DEFAULT_MODEL = "mistral:7b"
+    DEFAULT_BASE_URL = "http://localhost:11434"
+    DEFAULT_TIMEOUT = 30.0
+    DEFAULT_MAX_IN_FLIGHT = 4
+    MAX_RETRIES = 3
+
+    def __init__(
+        self,
+        model_name: str | None = None,
+        base_url: str | None = None,
+        timeout: float | None = None,
+        max_in_flight: int | None = None,
+        temperature: float | None = None,
+        keep_alive: str | None = None,
+        registry: MetricsRegistry | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
+        """Initialize the async Ollama client.
+
+        Args:
+            model_name: The model to use. Defaults to mistral:7b.
+            base_url: Ollama server URL. Defaults to http://localhost:11434.
+            timeout: Default per-call timeout in seconds. Defaults to 30.
+            max_in_flight: Maximum concurrent requests. Defaults to 4.
+            temperature: Sampling temperature for profiles that don't set one.
+            keep_alive: How long Ollama keeps the model loaded. Defaults to 30m.
+            registry: Where token counts and throughput are recorded.
+                Defaults to the process-wide registry.
+            circuit_breaker: Breaker to fail fast on and report outcomes to,
+                normally the one of the sync client for the same model.
+                None leaves calls unguarded.
+        """
+        self.model_name = model_name or self.DEFAULT_MODEL
+        self.base_url = base_url or self.DEFAULT_BASE_URL
+        self.timeout = timeout or self.DEFAULT_TIMEOUT
+        self.max_in_flight = max_in_flight or self.DEFAULT_MAX_IN_FLIGHT
+        self.temperature = temperature
+        self.keep_alive = keep_alive or DEFAULT_KEEP_ALIVE
+        self.metrics = registry or default_metrics
+        self.circuit_breaker = circuit_breaker
+
+        # One pool sized to the in-flight limit, so every admitted request has a connection
+        self._client = ollama.AsyncClient(
+            host=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_in_flight,
+                max_keepalive_connections=self.max_in_flight,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        logger.debug(
+            "Initialized AsyncOllamaClient with model=%s, base_url=%s, timeout=%s, max_in_flight=%d",
+            self.model_name,
+            self.base_url,
+            self.timeout,
+            self.max_in_flight,
+        )
+
+    async def close(self) -> None:
+        """Close the shared connection pool."""
+        await self._client.close()
+
+    async def health_check(self) -> bool:
+        """Check if Ollama server is available and the model is loaded."""
+        try:
+            async with self._semaphore:
+                models = await asyncio.wait_for(self._client.list(), self.timeout)
+            model_names = [m.model for m in models["models"]]
+
+            model_base = self.model_name.split(":")[0]
+            is_available = any(
+                self.model_name == name or name.startswith(model_base)
+                for name in model_names
+            )
+            if not is_available:
+                logger.warning(
+                    "Model %s not found. Available models: %s",
+                    self.model_name,
+                    model_names,
+                )
+            return is_available
+
+        except Exception as e:
+            logger.error("Health check failed: %s", e)
+            return False
+
+    async def generate(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        response_format: Type[T] | None = None,
+        timeout: float | None = None,
+        profile: GenerationProfile | None = None,
+        route: str | None = None,
+    ) -> str | T:
+        """Generate a response from the LLM.
+
+        Args:
+            prompt: The user prompt to send.
+            system_prompt: Optional system prompt for context.
+            response_format: Optional Pydantic model for structured output.
+            timeout: Seconds allowed for this call, including time spent
+                waiting for a free slot. Defaults to the client timeout.
+                Never more than what is left of the turn's deadline.
+            profile: Length cap, sampling and stop settings for this request.
+            route: Name of the calling site, for metrics.
+
+        Returns:
+            The generated text, or an instance of response_format.
+
+        Raises:
+            TimeoutError: If the call does not complete within the timeout.
+            ollama.ResponseError: If the LLM request fails after all retries.
+            ValueError: If response_format is provided but parsing fails.
+        """
+        format_spec = json_schema(response_format) if response_format is not None else None
+        content = await self._chat(
+            _build_messages(prompt, system_prompt), format_spec, timeout, profile, route
+        )
+
+        if response_format is not None:
+            return parse_structured_response(content, response_format)
+        return content
+
+    async def generate_json(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        timeout: float | None = None,
+        profile: GenerationProfile | None = None,
+        route: str | None = None,
+    ) -> dict[str, Any]:
+        """Generate a JSON response from the LLM.
+
+        Raises:
+            TimeoutError: If the call does not complete within the timeout.
+            ValueError: If the response cannot be parsed as valid JSON.
+        """
+        if "json" not in prompt.lower():
+            prompt = f"{prompt}\n\nRespond with valid JSON only."
+
+        content = await self._chat(_build_messages(prompt, system_prompt), "json", timeout, profile, route)
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in response: {e}") from e
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        timeout: float | None = None,
+        profile: GenerationProfile | None = None,
+        route: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Generate a text response, yielding fragments as they arrive.
+
+        The in-flight slot is held until the stream is exhausted or closed.
+        The timeout bounds the wait for each fragment, not the whole stream;
+        the turn's deadline, if any, bounds the whole stream.
+        """
+        check_deadline(f"{self.model_name} stream for route={route}")
+        timeout = timeout or self.timeout
+        messages = _build_messages(prompt, system_prompt)
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_call()
+
+        queued = time.perf_counter()
+        outcome_recorded = False
+        try:
+            async with self._semaphore:
+                started = time.perf_counter()
+                stream = await asyncio.wait_for(
+                    self._client.chat(
+                        model=self.model_name,
+                        messages=messages,
+                        stream=True,
+                        **self._generation_kwargs(profile),
+                    ),
+                    time_left(timeout),
+                )
+                iterator = aiter(stream)
+                chunk = None
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(anext(iterator), time_left(timeout))
+                    except StopAsyncIteration:
+                        break
+                    if content := chunk['message']['content']:
+                        yield content
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+                outcome_recorded = True
+            raise
+        else:
+            if breaker is not None:
+                breaker.record_success()
+                outcome_recorded = True
+        finally:
+            # Closed early: no verdict on the server, so don't hold the half-open probe
+            if breaker is not None and not outcome_recorded:
+                breaker.release_probe()
+        # The final chunk carries the token counts and timings
+        usage = llm_usage(chunk, time.perf_counter() - started) if chunk is not None else {}
+        usage["slot_wait_ms"] = round((started - queued) * 1000, 3)
+        record_llm_usage(self.metrics, usage, route, self.model_name)
+        tracer.record("llm", queued, model=self.model_name, stream=True, **usage)
+
+    async def _chat(
+        self,
+        messages: list[dict[str, str]],
+        format_spec: Any,
+        timeout: float | None,
+        profile: GenerationProfile | None,
+        route: str | None,
+    ) -> str:
+        """One chat request under the semaphore and a deadline-capped timeout, with retries."""
+        check_deadline(f"{self.model_name} call for route={route}")
+        timeout = time_left(timeout or self.timeout)
+
+        async def attempt_all() -> str:
+            for attempt in range(1, self.MAX_RETRIES + 1):
+                try:
+                    queued = time.perf_counter()
+                    async with self._semaphore:
+                        started = time.perf_counter()
+                        response = await self._client.chat(
+                            model=self.model_name,
+                            messages=messages,
+                            format=format_spec,
+                            **self._generation_kwargs(profile),
+                        )
+                    usage = {
+                        "slot_wait_ms": round((started - queued) * 1000, 3),
+                        **llm_usage(response, time.perf_counter() - started),
+                    }
+                    record_llm_usage(self.metrics, usage, route, self.model_name)
+                    tracer.record("llm", queued, model=self.model_name, **usage)
+                    return response['message']['content']
+                except Exception as e:
+                    logger.warning("Async attempt %d failed: %s", attempt, e)
+                    if attempt == self.MAX_RETRIES:
+                        raise
+            raise RuntimeError("Generation failed after all retries")
+
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return await asyncio.wait_for(attempt_all(), timeout)
+        breaker.before_call()
+        try:
+            content = await asyncio.wait_for(attempt_all(), timeout)
+        except Exception:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled: no verdict on the server
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        return content
+
+    def _generation_kwargs(self, profile: GenerationProfile | None) -> dict[str, Any]:
+        profile = profile or DEFAULT_PROFILE
+        return {
+            "options": profile.options(self.temperature),
+            "keep_alive": profile.keep_alive or self.keep_alive,
+        }
+
+
+def bypassed_layers(llm: OllamaClient | ModelRouter, async_llm: AsyncOllamaClient) -> List[str]:
+    """
+    The layers of the sync client that calls made through async_llm would
+    skip. Empty when it is safe to use async_llm in place of llm.
+    """
+    clients = list(llm.clients.values()) if isinstance(llm, ModelRouter) else [llm]
+    layers = []
+    if any(client.response_cache is not None for client in clients):
+        layers.append("response cache")
+    if any(client._in_flight is not None for client in clients):
+        layers.append("request coalescing")
+    if any(client.fallback is not None for client in clients):
+        layers.append("fallback model")
+    if any(client.circuit_breaker is not async_llm.circuit_breaker for client in clients):
+        layers.append("circuit breaker")
+    if any(client.model_name != async_llm.model_name for client in clients):
+        layers.append("model routing")
+    return layers
+
+
+def _build_messages(prompt: str, system_prompt: str | None) -> list[dict[str, str]]:
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return messages
@@ -1,15 +1,33 @@
 """Ollama LLM client wrapper with retry logic and structured output support."""
 
+import copy
 import json
 import logging
-from typing import Any, Type, TypeVar
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Iterator, Tuple, Type, TypeVar
 
 import ollama
 from pydantic import BaseModel
 
+from src.game.config.settings import DEFAULT_KEEP_ALIVE
+from src.game.llm.exceptions import CacheMissError, CircuitOpenError
+from src.game.llm.profiles import DEFAULT_PROFILE, GenerationProfile
+from src.game.llm.resilience import CircuitBreaker, RetryPolicy
+from src.game.llm.response_cache import ResponseCache, request_fingerprint
+from src.game.llm.singleflight import SingleFlight
+from src.game.llm.structured import json_schema, parse_structured_response
+from src.game.utils.deadline import Deadline, DeadlineExceededError, check_deadline, current_deadline
+from src.game.utils.metrics import LATENCY_BUCKETS, THROUGHPUT_BUCKETS, TOKEN_BUCKETS, MetricsRegistry
+from src.game.utils.metrics import metrics as default_metrics
+from src.game.utils.tracing import tracer
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
+R = TypeVar("R")
 
 
 class OllamaClient:
@@ -41,6 +59,14 @@ class OllamaClient:
         model_name: str | None = None,
         base_url: str | None = None,
         timeout: float | None = None,
+        response_cache: ResponseCache | None = None,
+        coalesce_requests: bool = True,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        fallback: "OllamaClient | None" = None,
+        temperature: float | None = None,
+        keep_alive: str | None = None,
+        registry: MetricsRegistry | None = None,
     ):
         """Initialize the Ollama client.
         
@@ -48,10 +74,35 @@ class OllamaClient:
             model_name: The model to use. Defaults to mistral:7b.
             base_url: Ollama server URL. Defaults to http://localhost:11434.
             timeout: Request timeout in seconds. Defaults to 30.
+            response_cache: Optional persistent cache of responses. In replay
+                mode every request must be served from it.
+            coalesce_requests: Share one in-flight request between concurrent
+                callers sending an identical request.
+            retry_policy: Retry count and backoff between attempts.
+                Defaults to MAX_RETRIES attempts with jittered exponential backoff.
+            circuit_breaker: Fails calls fast while the server keeps failing.
+                Defaults to a breaker with stock thresholds.
+            fallback: Client to answer with when this one gives up or its
+                circuit is open, e.g. one for a smaller model.
+            temperature: Sampling temperature for profiles that don't set one.
+                Defaults to the model's own default.
+            keep_alive: How long Ollama keeps the model loaded after a request,
+                for profiles that don't set it. Defaults to 30m.
+            registry: Where token counts and throughput of every call are
+                recorded, labelled by route and model. Defaults to the
+                process-wide registry.
         """
         self.model_name = model_name or self.DEFAULT_MODEL
         self.base_url = base_url or self.DEFAULT_BASE_URL
         self.timeout = timeout or self.DEFAULT_TIMEOUT
+        self.response_cache = response_cache
+        self._in_flight = SingleFlight() if coalesce_requests else None
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=self.MAX_RETRIES)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.fallback = fallback
+        self.temperature = temperature
+        self.keep_alive = keep_alive or DEFAULT_KEEP_ALIVE
+        self.metrics = registry or default_metrics
         
         # Initialize the ollama client with custom host
         self._client = ollama.Client(host=self.base_url, timeout=self.timeout)
@@ -100,6 +151,8 @@ class OllamaClient:
         prompt: str,
         system_prompt: str | None = None,
         response_format: Type[T] | None = None,
+        route: str | None = None,
+        profile: GenerationProfile | None = None,
     ) -> str | T:
         """Generate a response from the LLM.
         
@@ -109,6 +162,9 @@ class OllamaClient:
             response_format: Optional Pydantic model for structured output.
                 If provided, the response will be parsed and validated
                 into an instance of this model.
+            route: Name of the calling site, for logs and metrics.
+            profile: Length cap, sampling and stop settings for this request.
+                Defaults to DEFAULT_PROFILE.
         
         Returns:
             The generated text response as a string, or a Pydantic model
@@ -117,9 +173,13 @@ class OllamaClient:
         Raises:
             ollama.ResponseError: If the LLM request fails after all retries.
             ValueError: If response_format is provided but parsing fails.
+            CircuitOpenError: If the circuit is open and there is no fallback.
+            CacheMissError: If the response cache is in replay mode and has
+                no entry for this request.
         """
         logger.debug(
-            "generate() called - prompt_len=%d, system_prompt=%s, structured=%s",
+            "generate() called - route=%s, prompt_len=%d, system_prompt=%s, structured=%s",
+            route,
             len(prompt),
             "yes" if system_prompt else "no",
             response_format.__name__ if response_format else "no",
@@ -134,74 +194,421 @@ class OllamaClient:
         # Configure format for structured output
         format_spec = None
         if response_format is not None:
-            format_spec = response_format.model_json_schema()
+            format_spec = json_schema(response_format)
+        
+        request = self._request(messages, profile, format=format_spec)
+        fingerprint = request_fingerprint(self.model_name, messages, format_spec, request["options"])
+        cached = self._cache_get(fingerprint)
+        if cached is not None:
+            if response_format is not None:
+                return parse_structured_response(cached, response_format)
+            return cached
         
+        try:
+            return self._coalesced(
+                fingerprint,
+                lambda: self._generate_with_retries(request, response_format, fingerprint, route),
+            )
+        except (CacheMissError, DeadlineExceededError):
+            raise
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            logger.warning("%s gave up (%s); falling back to %s", self.model_name, e, self.fallback.model_name)
+            return self.fallback.generate(prompt, system_prompt, response_format, route=route, profile=profile)
+    
+    def _generate_with_retries(
+        self,
+        request: dict[str, Any],
+        response_format: Type[T] | None,
+        fingerprint: str,
+        route: str | None,
+    ) -> str | T:
         # Attempt generation with retries
         last_error: Exception | None = None
+        max_retries = self.retry_policy.max_retries
         
-        for attempt in range(1, self.MAX_RETRIES + 1):
+        for attempt in range(1, max_retries + 1):
+            if attempt > 1:
+                self.retry_policy.sleep(attempt - 1)
             try:
-                logger.debug("Generation attempt %d/%d", attempt, self.MAX_RETRIES)
+                logger.debug("Generation attempt %d/%d", attempt, max_retries)
                 
-                response = self._client.chat(
-                    model=self.model_name,
-                    messages=messages,
-                    format=format_spec,
-                )
+                response = self._chat(route=route, **request)
                 
                 content = response['message']['content']
                 logger.debug("Response received: %s", content)
                 
                 # Parse structured output if requested
+                result = content
                 if response_format is not None:
-                    return self._parse_structured_response(content, response_format)
+                    result = parse_structured_response(content, response_format)
+                
+                # Only record responses that parsed, so bad output is retried next time
+                self._cache_put(fingerprint, content)
+                return result
                 
-                return content
+            except (CircuitOpenError, DeadlineExceededError):
+                raise
                 
             except ollama.ResponseError as e:
                 last_error = e
                 logger.warning("Attempt %d failed with ResponseError: %s", attempt, e)
-                if attempt == self.MAX_RETRIES:
+                if attempt == max_retries:
                     raise
                     
             except Exception as e:
                 last_error = e
                 logger.warning("Attempt %d failed with error: %s", attempt, e)
-                if attempt == self.MAX_RETRIES:
+                if attempt == max_retries:
                     raise
         
         # Should not reach here, but handle edge case
         raise last_error or RuntimeError("Generation failed after all retries")
     
-    def _parse_structured_response(self, content: str, response_format: Type[T]) -> T:
-        """Parse and validate a JSON response into a Pydantic model.
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        route: str | None = None,
+        profile: GenerationProfile | None = None,
+        response_format: Type[BaseModel] | None = None,
+    ) -> Iterator[str]:
+        """Generate a text response from the LLM, yielding it piece by piece.
+        
+        Uses Ollama's streaming chat so callers can render the first words
+        while the rest is still being generated. Failures are retried only
+        until the first chunk arrives; after that they propagate, since the
+        caller has already shown part of the response.
         
         Args:
-            content: The raw JSON string from the LLM.
-            response_format: The Pydantic model class to parse into.
+            prompt: The user prompt to send.
+            system_prompt: Optional system prompt for context.
+            route: Name of the calling site, for logs and metrics.
+            profile: Length cap, sampling and stop settings for this request.
+            response_format: Optional Pydantic model whose JSON schema the
+                output must follow. The raw JSON text is streamed, not
+                validated; parsing it is up to the caller.
+        
+        Yields:
+            Successive fragments of the response text.
+        
+        Raises:
+            ollama.ResponseError: If the LLM request fails after all retries.
+        """
+        logger.debug(
+            "generate_stream() called - route=%s, prompt_len=%d, system_prompt=%s",
+            route,
+            len(prompt),
+            "yes" if system_prompt else "no",
+        )
+        
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        # A cached response is replayed as a single chunk
+        format_spec = json_schema(response_format) if response_format is not None else None
+        request = self._request(messages, profile, format=format_spec)
+        fingerprint = request_fingerprint(self.model_name, messages, format_spec, request["options"])
+        cached = self._cache_get(fingerprint)
+        if cached is not None:
+            yield cached
+            return
+        
+        max_retries = self.retry_policy.max_retries
+        for attempt in range(1, max_retries + 1):
+            if attempt > 1:
+                self.retry_policy.sleep(attempt - 1)
+            started = False
+            try:
+                logger.debug("Streaming attempt %d/%d", attempt, max_retries)
+                
+                chunks = []
+                for chunk in self._chat(stream=True, route=route, **request):
+                    content = chunk['message']['content']
+                    if content:
+                        started = True
+                        chunks.append(content)
+                        yield content
+                content = "".join(chunks)
+                if response_format is None or self._is_valid(content, response_format):
+                    self._cache_put(fingerprint, content)
+                return
+                
+            except Exception as e:
+                logger.warning("Streaming attempt %d failed: %s", attempt, e)
+                if started or isinstance(e, DeadlineExceededError):
+                    raise
+                if isinstance(e, CircuitOpenError) or attempt == max_retries:
+                    if self.fallback is None:
+                        raise
+                    logger.warning("Streaming from %s gave up; falling back to %s",
+                                   self.model_name, self.fallback.model_name)
+                    yield from self.fallback.generate_stream(
+                        prompt, system_prompt, route=route, profile=profile, response_format=response_format
+                    )
+                    return
+    
+    def warmup(self) -> bool:
+        """Load the model into memory without generating anything.
+        
+        Ollama loads the model for a chat request with no messages and keeps
+        it loaded for keep_alive, so the first real request skips the load.
         
         Returns:
-            An instance of the response_format model.
+            True if the model was loaded, False otherwise.
+        """
+        try:
+            self._chat(route="warmup", messages=[], keep_alive=self.keep_alive)
+        except Exception as e:
+            logger.warning("Warming up %s failed: %s", self.model_name, e)
+            return False
+        logger.info("Loaded %s (keep_alive=%s)", self.model_name, self.keep_alive)
+        return True
+    
+    def prime(
+        self,
+        system_prompt: str,
+        prompt_prefix: str = "",
+        route: str | None = None,
+        profile: GenerationProfile | None = None,
+    ) -> bool:
+        """Load the model and evaluate a prompt prefix ahead of the first real call.
+    
+        Ollama reuses the KV cache for a matching prompt prefix, so later
+        requests starting with the same system prompt and user prompt prefix
+        skip re-evaluating them. The prefix is sent as a user message because
+        some chat templates (Mistral's) only render the system prompt inside
+        the final user turn. Only one token is generated, and nothing is
+        cached or retried.
+    
+        Returns:
+            True if the server accepted the request, False otherwise.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt_prefix},
+        ]
+        request = self._request(messages, profile)
+        request["options"]["num_predict"] = 1
+        try:
+            # Recorded under its own route, like warmup, so a one-token prime
+            # (and its model load) doesn't skew the real route's usage metrics
+            self._chat(route="prime", **request)
+        except Exception as e:
+            logger.warning("Priming %s for route=%s failed: %s", self.model_name, route, e)
+            return False
+        return True
+    
+    def _request(
+        self,
+        messages: list[dict[str, str]],
+        profile: GenerationProfile | None,
+        **extra: Any,
+    ) -> dict[str, Any]:
+        """Keyword arguments for ollama.chat() under a generation profile."""
+        profile = profile or DEFAULT_PROFILE
+        return {
+            "messages": messages,
+            "options": profile.options(self.temperature),
+            "keep_alive": profile.keep_alive or self.keep_alive,
+            **extra,
+        }
+    
+    def _chat(self, stream: bool = False, route: str | None = None, **kwargs: Any) -> Any:
+        """One chat request through the circuit breaker, traced as an "llm" span
+        and recorded in the metrics under route.
         
         Raises:
-            ValueError: If parsing or validation fails.
+            CircuitOpenError: If the circuit is open.
+            DeadlineExceededError: If the turn's deadline has passed.
         """
+        check_deadline(f"{self.model_name} call for route={route}")
+        self.circuit_breaker.before_call()
+        if stream:
+            return self._stream_through_breaker(kwargs, route)
+        started = time.perf_counter()
+        turn_deadline = current_deadline()
         try:
-            parsed = json.loads(content)
-            result = response_format.model_validate(parsed)
-            logger.debug("Successfully parsed response into %s", response_format.__name__)
-            return result
-        except json.JSONDecodeError as e:
-            logger.error("JSON parsing failed: %s", e)
-            raise ValueError(f"Invalid JSON in response: {e}") from e
+            if turn_deadline is None:
+                response = self._chat_through_breaker(kwargs)
+            else:
+                response = self._chat_before(turn_deadline, kwargs, route)
+        except DeadlineExceededError:
+            tracer.record("llm", started, model=self.model_name, abandoned=True)
+            raise
         except Exception as e:
-            logger.error("Validation failed for %s: %s", response_format.__name__, e)
-            raise ValueError(f"Failed to validate as {response_format.__name__}: {e}") from e
+            self._record_error(route)
+            tracer.record("llm", started, model=self.model_name, error=repr(e))
+            raise
+        usage = llm_usage(response, time.perf_counter() - started)
+        record_llm_usage(self.metrics, usage, route, self.model_name)
+        tracer.record("llm", started, model=self.model_name, **usage)
+        return response
+    
+    def _chat_through_breaker(self, kwargs: dict[str, Any]) -> Any:
+        try:
+            response = self._client.chat(model=self.model_name, **kwargs)
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+        return response
+    
+    def _chat_before(self, turn_deadline: Deadline, kwargs: dict[str, Any], route: str | None) -> Any:
+        """
+        The request, given up on when the turn's deadline passes. ollama.Client
+        has no per-request timeout, so the request runs in a daemon thread and
+        is abandoned, finishing (or hitting the client timeout) in the background;
+        the circuit breaker still hears how it went.
+        """
+        future: Future[Any] = Future()
+        
+        def run() -> None:
+            try:
+                future.set_result(self._chat_through_breaker(kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=run, name=f"llm-{route or 'default'}", daemon=True).start()
+        try:
+            return future.result(timeout=turn_deadline.remaining())
+        except TimeoutError:
+            raise DeadlineExceededError(
+                f"Turn deadline passed waiting on {self.model_name} for route={route}"
+            ) from None
+    
+    def _stream_through_breaker(self, kwargs: dict[str, Any], route: str | None) -> Iterator[Any]:
+        # Streamed errors surface while iterating, so the outcome is recorded at the end
+        started = time.perf_counter()
+        first_chunk = None
+        chunk = None
+        turn_deadline = current_deadline()
+        stream: Iterator[Any] = iter(())
+        outcome_recorded = False
+        try:
+            if turn_deadline is None:
+                stream = self._client.chat(model=self.model_name, stream=True, **kwargs)
+            else:
+                stream = self._stream_before(turn_deadline, kwargs, route)
+            for chunk in stream:
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                yield chunk
+        except DeadlineExceededError:
+            tracer.record("llm", started, model=self.model_name, stream=True, cut_short=True)
+            raise
+        except Exception as e:
+            self.circuit_breaker.record_failure()
+            outcome_recorded = True
+            self._record_error(route)
+            tracer.record("llm", started, model=self.model_name, stream=True, error=repr(e))
+            raise
+        else:
+            self.circuit_breaker.record_success()
+            outcome_recorded = True
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+            # Cut short by the deadline or closed early by the caller: if this was
+            # the half-open probe, free the slot so the breaker isn't stuck probing
+            if not outcome_recorded:
+                self.circuit_breaker.release_probe()
+        # The final chunk carries the token counts and timings
+        usage = llm_usage(chunk, time.perf_counter() - started) if chunk is not None else {}
+        if first_chunk is not None:
+            usage["first_chunk_ms"] = round((first_chunk - started) * 1000, 3)
+        record_llm_usage(self.metrics, usage, route, self.model_name)
+        tracer.record("llm", started, model=self.model_name, stream=True, **usage)
+    
+    def _stream_before(self, turn_deadline: Deadline, kwargs: dict[str, Any], route: str | None) -> Iterator[Any]:
+        """
+        The stream's chunks, each waited for no longer than the turn's deadline
+        allows, so a model stalled before its first token (slow prompt
+        evaluation) is bounded too. The stream is read in a daemon thread; once
+        abandoned, the reader drops the connection at its next chunk.
+        
+        Raises:
+            DeadlineExceededError: If the deadline passes before the stream ends.
+        """
+        chunks: queue.Queue[Tuple[Any, BaseException | None]] = queue.Queue()
+        stop = threading.Event()
+        end = object()
+        
+        def read() -> None:
+            try:
+                stream = self._client.chat(model=self.model_name, stream=True, **kwargs)
+                for chunk in stream:
+                    if stop.is_set():
+                        stream.close()
+                        return
+                    chunks.put((chunk, None))
+                chunks.put((end, None))
+            except BaseException as e:
+                chunks.put((None, e))
+        
+        threading.Thread(target=read, name=f"llm-stream-{route or 'default'}", daemon=True).start()
+        try:
+            while True:
+                if turn_deadline.expired:
+                    raise DeadlineExceededError(f"Turn deadline passed while streaming from {self.model_name}")
+                try:
+                    chunk, error = chunks.get(timeout=turn_deadline.remaining())
+                except queue.Empty:
+                    raise DeadlineExceededError(
+                        f"Turn deadline passed waiting on {self.model_name} for route={route}"
+                    ) from None
+                if error is not None:
+                    raise error
+                if chunk is end:
+                    return
+                yield chunk
+        finally:
+            stop.set()
+    
+    def _record_error(self, route: str | None) -> None:
+        self.metrics.counter("llm_errors", route=route or "default", model=self.model_name).inc()
+    
+    def _coalesced(self, fingerprint: str, request: Callable[[], R]) -> R:
+        """Run request, or wait for the identical one already in flight and share its result."""
+        if self._in_flight is None:
+            return request()
+        result, shared = self._in_flight.do(fingerprint, request)
+        if shared:
+            logger.debug("Coalesced with in-flight request (%s)", fingerprint[:12])
+            # Each caller gets its own copy, since callers may mutate what they get back
+            return copy.deepcopy(result)
+        return result
+    
+    def _cache_get(self, fingerprint: str) -> str | None:
+        """Cached response for a request, if any. Raises CacheMissError in replay mode."""
+        if self.response_cache is None:
+            return None
+        cached = self.response_cache.get(fingerprint)
+        if cached is not None:
+            logger.debug("Response cache hit (%s)", fingerprint[:12])
+        return cached
+    
+    def _cache_put(self, fingerprint: str, content: str) -> None:
+        if self.response_cache is not None:
+            self.response_cache.put(fingerprint, self.model_name, content)
+    
+    def _is_valid(self, content: str, response_format: Type[BaseModel]) -> bool:
+        """Whether a streamed structured response parses; only those are cached."""
+        try:
+            parse_structured_response(content, response_format)
+        except ValueError:
+            return False
+        return True
     
     def generate_json(
         self,
         prompt: str,
         system_prompt: str | None = None,
+        route: str | None = None,
+        profile: GenerationProfile | None = None,
     ) -> dict[str, Any]:
         """Generate a JSON response from the LLM with retry logic.
         
@@ -211,6 +618,8 @@ class OllamaClient:
         Args:
             prompt: The user prompt to send.
             system_prompt: Optional system prompt for context.
+            route: Name of the calling site, for logs and metrics.
+            profile: Length cap, sampling and stop settings for this request.
         
         Returns:
             The parsed JSON response as a dictionary.
@@ -218,8 +627,11 @@ class OllamaClient:
         Raises:
             ValueError: If the response cannot be parsed as valid JSON.
             ollama.ResponseError: If the LLM request fails after all retries.
+            CircuitOpenError: If the circuit is open and there is no fallback.
+            CacheMissError: If the response cache is in replay mode and has
+                no entry for this request.
         """
-        logger.debug("generate_json() called - prompt_len=%d", len(prompt))
+        logger.debug("generate_json() called - route=%s, prompt_len=%d", route, len(prompt))
         
         # Ensure prompt asks for JSON if not already specified
         json_prompt = prompt
@@ -232,44 +644,127 @@ class OllamaClient:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": json_prompt})
         
+        request = self._request(messages, profile, format="json")
+        fingerprint = request_fingerprint(self.model_name, messages, "json", request["options"])
+        cached = self._cache_get(fingerprint)
+        if cached is not None:
+            return json.loads(cached)
+        
+        try:
+            return self._coalesced(
+                fingerprint,
+                lambda: self._generate_json_with_retries(request, fingerprint, route),
+            )
+        except (CacheMissError, DeadlineExceededError):
+            raise
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            logger.warning("%s gave up (%s); falling back to %s", self.model_name, e, self.fallback.model_name)
+            return self.fallback.generate_json(prompt, system_prompt, route=route, profile=profile)
+    
+    def _generate_json_with_retries(
+        self,
+        request: dict[str, Any],
+        fingerprint: str,
+        route: str | None,
+    ) -> dict[str, Any]:
         # Attempt generation with retries
         last_error: Exception | None = None
+        max_retries = self.retry_policy.max_retries
         
-        for attempt in range(1, self.MAX_RETRIES + 1):
+        for attempt in range(1, max_retries + 1):
+            if attempt > 1:
+                self.retry_policy.sleep(attempt - 1)
             try:
-                logger.debug("JSON generation attempt %d/%d", attempt, self.MAX_RETRIES)
+                logger.debug("JSON generation attempt %d/%d", attempt, max_retries)
                 
-                response = self._client.chat(
-                    model=self.model_name,
-                    messages=messages,
-                    format="json",
-                )
+                response = self._chat(route=route, **request)
                 
                 content = response['message']['content']
                 logger.debug("JSON response received - length=%d", len(content))
                 
                 result = json.loads(content)
                 logger.debug("Successfully parsed JSON response")
+                self._cache_put(fingerprint, content)
                 return result
                 
             except json.JSONDecodeError as e:
                 last_error = e
                 logger.warning("Attempt %d: JSON parsing failed: %s", attempt, e)
-                if attempt == self.MAX_RETRIES:
+                if attempt == max_retries:
                     raise ValueError(
-                        f"Failed to get valid JSON after {self.MAX_RETRIES} attempts"
+                        f"Failed to get valid JSON after {max_retries} attempts"
                     ) from e
                     
+            except (CircuitOpenError, DeadlineExceededError):
+                raise
+                
             except ollama.ResponseError as e:
                 last_error = e
                 logger.warning("Attempt %d failed with ResponseError: %s", attempt, e)
-                if attempt == self.MAX_RETRIES:
+                if attempt == max_retries:
                     raise
                     
             except Exception as e:
                 last_error = e
                 logger.warning("Attempt %d failed with error: %s", attempt, e)
-                if attempt == self.MAX_RETRIES:
+                if attempt == max_retries:
                     raise
         
-        raise ValueError(f"Failed to get valid JSON after {self.MAX_RETRIES} attempts: {last_error}")
\ No newline at end of file
+        raise ValueError(f"Failed to get valid JSON after {max_retries} attempts: {last_error}")
+
+
+def llm_usage(response: Any, wall_time: float) -> dict[str, Any]:
+    """Token counts and timings Ollama reports with a response (or a stream's final chunk).
+    
+    queue_ms is the part of the wall time Ollama didn't spend on the request
+    itself: waiting in its queue behind other requests, plus the network.
+    """
+    usage: dict[str, Any] = {"wall_ms": round(wall_time * 1000, 3)}
+    for key in ("prompt_eval_count", "eval_count"):
+        if response.get(key) is not None:
+            usage[key] = response.get(key)
+    for key in ("total_duration", "load_duration", "prompt_eval_duration", "eval_duration"):
+        if response.get(key) is not None:
+            usage[f"{key}_ms"] = round(response.get(key) / 1e6, 3)
+    if "total_duration_ms" in usage:
+        usage["queue_ms"] = round(max(usage["wall_ms"] - usage["total_duration_ms"], 0.0), 3)
+    return usage
+
+
+def record_llm_usage(registry: MetricsRegistry, usage: dict[str, Any], route: str | None, model: str) -> None:
+    """Aggregate one call's llm_usage() into per-route token counters and throughput histograms.
+    
+    Counters: llm_requests, llm_prompt_tokens, llm_completion_tokens,
+    llm_load_seconds. Histograms: llm_prompt_size_tokens,
+    llm_prompt_tokens_per_second, llm_generation_tokens_per_second,
+    llm_queue_seconds and, for callers that wait for a free slot,
+    llm_slot_wait_seconds.
+    """
+    labels = {"route": route or "default", "model": model}
+    registry.counter("llm_requests", **labels).inc()
+    
+    prompt_tokens = usage.get("prompt_eval_count")
+    if prompt_tokens is not None:
+        registry.counter("llm_prompt_tokens", **labels).inc(prompt_tokens)
+        registry.histogram("llm_prompt_size_tokens", TOKEN_BUCKETS, **labels).observe(prompt_tokens)
+        if usage.get("prompt_eval_duration_ms"):
+            registry.histogram("llm_prompt_tokens_per_second", THROUGHPUT_BUCKETS, **labels).observe(
+                prompt_tokens / (usage["prompt_eval_duration_ms"] / 1000)
+            )
+    
+    completion_tokens = usage.get("eval_count")
+    if completion_tokens is not None:
+        registry.counter("llm_completion_tokens", **labels).inc(completion_tokens)
+        if usage.get("eval_duration_ms"):
+            registry.histogram("llm_generation_tokens_per_second", THROUGHPUT_BUCKETS, **labels).observe(
+                completion_tokens / (usage["eval_duration_ms"] / 1000)
+            )
+    
+    if usage.get("load_duration_ms") is not None:
+        registry.counter("llm_load_seconds", **labels).inc(usage["load_duration_ms"] / 1000)
+    if usage.get("queue_ms") is not None:
+        registry.histogram("llm_queue_seconds", LATENCY_BUCKETS, **labels).observe(usage["queue_ms"] / 1000)
+    if usage.get("slot_wait_ms") is not None:
+        registry.histogram("llm_slot_wait_seconds", LATENCY_BUCKETS, **labels).observe(usage["slot_wait_ms"] / 1000)
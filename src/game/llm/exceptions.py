@@ -14,4 +14,21 @@ class JSONExtractionError(ActionPlanParseError):
 
 class ValidationFailedError(ActionPlanParseError):
     """JSON was extracted but failed Pydantic validation"""
-    pass
\ No newline at end of file
+    pass
+
+# ============================================================
+# CACHE EXCEPTIONS
+# ============================================================
+
+class CacheMissError(Exception):
+    """Replay mode was asked for a response that was never recorded"""
+    pass
+
+
+# ============================================================
+# AVAILABILITY EXCEPTIONS
+# ============================================================
+
+class CircuitOpenError(Exception):
+    """The LLM backend failed repeatedly and calls are being refused for a cooldown"""
+    pass
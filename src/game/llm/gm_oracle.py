@@ -1,13 +1,19 @@
-from src.game.models import Entity, Action, ActionType, ActionPlan, GameState, RollType, RollSpec, StateChange
+from src.game.models import (
+    Entity, Action, ActionPlan, ActionPlanBatch, EntityIntentBatch, GameState, RollSpec,
+)
 from src.game.llm.prompts import GMPrompts
-from src.game.llm.exceptions import JSONExtractionError, ActionPlanParseError, ValidationFailedError
 from src.game.llm.client import OllamaClient
-import json
-import re
+from src.game.llm.router import ModelRouter
+from src.game.llm.async_client import AsyncOllamaClient, bypassed_layers
+from src.game.llm.plan_cache import ActionPlanCache
+from src.game.llm.resilience import LLM_UNAVAILABLE
+from src.game.llm.plan_stream import ActionPlanStream
+import asyncio
 import logging
-from typing import List
-from pydantic import ValidationError
-from enum import Enum
+from typing import Callable, Dict, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.game.core.rule_interpreter import FastPathMatch, RuleBasedInterpreter
 
 
 logger = logging.getLogger(__name__)
@@ -23,35 +29,179 @@ class GMOracle:
     Handles interpretation of intents into structured ActionPlans.
     """
     
-    def __init__(self, llm_client: OllamaClient):
+    # Rule-based matches at or above this confidence skip the LLM
+    FAST_PATH_THRESHOLD = 0.8
+    # Non-compound matches below the threshold but at or above this go to the small model
+    SIMPLE_ROUTE_FLOOR = 0.6
+    
+    # Static system prompt, and the prompt whose profile it runs under, per route
+    SYSTEM_PROMPTS = {
+        "interpret_action": (GMPrompts.INTERPRET_SYSTEM_PROMPT, GMPrompts.INTERPRET_INTENT),
+        "interpret_simple_action": (GMPrompts.INTERPRET_SYSTEM_PROMPT, GMPrompts.INTERPRET_INTENT),
+        "explain_invalid_action": (GMPrompts.EXPLAIN_INVALID_SYSTEM_PROMPT, GMPrompts.EXPLAIN_INVALID_ACTION),
+        "generate_entity_intent": (GMPrompts.ENTITY_INTENT_SYSTEM_PROMPT, GMPrompts.GENERATE_ENTITY_INTENT),
+        "generate_enemy_intents": (GMPrompts.BATCH_ENTITY_INTENTS_SYSTEM_PROMPT, GMPrompts.GENERATE_BATCH_ENTITY_INTENTS),
+        "plan_enemy_actions": (GMPrompts.BATCH_ENTITY_ACTIONS_SYSTEM_PROMPT, GMPrompts.PLAN_BATCH_ENTITY_ACTIONS),
+    }
+    
+    def __init__(
+        self,
+        llm_client: OllamaClient | ModelRouter,
+        fast_path: "RuleBasedInterpreter | None" = None,
+        fast_path_threshold: float | None = None,
+        plan_cache: ActionPlanCache | None = None,
+        async_llm_client: AsyncOllamaClient | None = None,
+    ):
+        """
+        Raises:
+            ValueError: If async_llm_client would bypass a layer of llm_client
+                (cache, replay, breaker, routing...); see bypassed_layers().
+        """
+        if async_llm_client is not None and (bypassed := bypassed_layers(llm_client, async_llm_client)):
+            raise ValueError(f"async_llm_client would bypass the {', '.join(bypassed)} of llm_client")
         self.llm = llm_client
+        self.async_llm = async_llm_client
+        self.fast_path = fast_path
+        self.fast_path_threshold = self.FAST_PATH_THRESHOLD if fast_path_threshold is None else fast_path_threshold
+        self.plan_cache = plan_cache
 
 
     def interpret_action(
         self, 
         intent_text: str, 
-        context: GameState
+        context: GameState,
+        actor_id: str | None = None,
+        on_roll: Callable[[int, RollSpec], None] | None = None
     ) -> ActionPlan | None:
         """
-        Ask the DM to interpret a player's intent.
+        Ask the DM to interpret a player's (or entity's) intent.
+        Simple intents are answered by the rule-based fast path when it is
+        confident enough; everything else goes to the LLM. If the LLM is
+        unavailable, the fast path's best guess is used at any confidence.
+        With on_roll, the LLM's plan is streamed and on_roll(index, spec) is
+        called for each required roll as soon as it has been generated.
         Returns a structured ActionPlan or None if action is invalid.
         """
-        prompt = GMPrompts.INTERPRET_INTENT.format(context=context, summary=context.summary(), intent=intent_text)
+        plan, match = self._interpret_without_llm(intent_text, context, actor_id)
+        if plan is not None:
+            return plan
         
         # Request structured output from LLM
-        response = self.llm.generate(
-            prompt,
-            response_format=ActionPlan  # Pydantic model for structured output
+        request = dict(
+            prompt=self._interpret_prompt(intent_text, context),
+            system_prompt=GMPrompts.INTERPRET_SYSTEM_PROMPT,
+            response_format=ActionPlan,  # Pydantic model for structured output
+            route=self._interpret_route(match),
+            profile=GMPrompts.INTERPRET_INTENT.profile
         )
+        try:
+            if on_roll is None:
+                plan = self.llm.generate(**request)
+            else:
+                plan = self._stream_plan(request, on_roll)
+        except LLM_UNAVAILABLE as e:
+            return self._rule_based_fallback(match, e)
+        
+        # The client has already validated the response into an ActionPlan
+        self._remember_plan(intent_text, context, plan, actor_id)
+        return plan
+
+
+    def _stream_plan(self, request: dict, on_roll: Callable[[int, RollSpec], None]) -> ActionPlan:
+        """
+        Stream the plan, reporting required rolls as they complete. A plan
+        that doesn't validate is requested again without streaming (and with
+        retries), so on_roll may have seen rolls the final plan doesn't have.
+        """
+        stream = ActionPlanStream()
+        for chunk in self.llm.generate_stream(**request):
+            for index, spec in stream.feed(chunk):
+                on_roll(index, spec)
+        try:
+            return stream.plan()
+        except ValueError as e:
+            logger.warning("Streamed ActionPlan didn't validate (%s); requesting it again", e)
+            return self.llm.generate(**request)
+
+
+    def _interpret_without_llm(
+        self,
+        intent_text: str,
+        context: GameState,
+        actor_id: str | None
+    ) -> Tuple[ActionPlan | None, "FastPathMatch | None"]:
+        """
+        Answer from the rule-based fast path or the plan cache, if either can.
+        Also returns the fast path's match (None without a fast path), which
+        routing and the LLM-unavailable fallback reuse.
+        """
+        match = None
+        if self.fast_path is not None:
+            match = self.fast_path.interpret(intent_text, context, actor_id)
+            if match.plan is not None and match.confidence >= self.fast_path_threshold:
+                logger.debug("Fast path: %s (confidence %.2f)", match.reason, match.confidence)
+                return match.plan, match
+            logger.debug("Fast path declined (%s, confidence %.2f)", match.reason, match.confidence)
         
-        return self._parse_action_plan(response)
+        # Same command against the same situation as before: reuse that plan
+        if self.plan_cache is not None:
+            cached = self.plan_cache.get(intent_text, context, actor_id)
+            if cached is not None:
+                logger.debug("Plan cache hit for '%s'", intent_text)
+                return cached, match
+        
+        return None, match
+
+
+    def _interpret_route(self, match: "FastPathMatch | None") -> str:
+        """
+        Intents the rule-based interpreter could shape, nearly confidently and
+        without hints of a compound action, are simple enough for the small
+        model; anything else is complex.
+        """
+        if (
+            match is not None
+            and match.plan is not None
+            and not match.compound
+            and match.confidence >= self.SIMPLE_ROUTE_FLOOR
+        ):
+            return "interpret_simple_action"
+        return "interpret_action"
+
+
+    def _rule_based_fallback(self, match: "FastPathMatch | None", error: Exception) -> ActionPlan:
+        """The fast path's plan regardless of confidence; re-raises error if there is none."""
+        if match is None or match.plan is None:
+            raise error
+        logger.warning("LLM unavailable (%s); using rule-based plan: %s", error, match.reason)
+        return match.plan
+
+
+    def _interpret_prompt(self, intent_text: str, context: GameState) -> str:
+        return GMPrompts.INTERPRET_INTENT.format(context=context, summary=context.summary(), intent=intent_text)
+
+
+    def _remember_plan(
+        self,
+        intent_text: str,
+        context: GameState,
+        plan: ActionPlan | None,
+        actor_id: str | None
+    ) -> None:
+        if self.plan_cache is not None and plan is not None:
+            self.plan_cache.put(intent_text, context, plan, actor_id)
 
 
     def explain_invalid_action(self, intent: str, context: GameState) -> str:
         """Generate a DM explanation for why an action can't be done"""
         prompt = GMPrompts.EXPLAIN_INVALID_ACTION.format(intent=intent,summary=context.summary())
         
-        return self.llm.generate(prompt)
+        return self.llm.generate(
+            prompt,
+            system_prompt=GMPrompts.EXPLAIN_INVALID_SYSTEM_PROMPT,
+            route="explain_invalid_action",
+            profile=GMPrompts.EXPLAIN_INVALID_ACTION.profile
+        )
 
 
     def describe_reaction(
@@ -62,7 +212,9 @@ class GMOracle:
         """Generate the intent text for an entity's reaction"""
         prompt = GMPrompts.DESCRIBE_REACTION.format(entity=entity,triggering_action=triggering_action)
         
-        return self.llm.generate(prompt)
+        return self.llm.generate(
+            prompt, route="describe_reaction", profile=GMPrompts.DESCRIBE_REACTION.profile
+        )
 
 
     def generate_entity_intent(self, entity: Entity, context: GameState) -> str:
@@ -73,251 +225,154 @@ class GMOracle:
         # Constructing prompt inline (move to GMPrompts in production)
         prompt = GMPrompts.GENERATE_ENTITY_INTENT.format(summary=context.summary(),entity=entity)
         
-        return self.llm.generate(prompt)
+        return self.llm.generate(
+            prompt,
+            system_prompt=GMPrompts.ENTITY_INTENT_SYSTEM_PROMPT,
+            route="generate_entity_intent",
+            profile=GMPrompts.GENERATE_ENTITY_INTENT.profile
+        )
 
 
-    def _extract_json_from_response(self, response: str) -> dict:
+    def generate_enemy_intents(self, enemies: List[Entity], context: GameState) -> Dict[str, str]:
         """
-        Extract JSON from an LLM response that may contain surrounding text.
-        
-        Handles common LLM output patterns:
-        - Pure JSON
-        - JSON wrapped in markdown code blocks
-        - JSON with preamble/postamble text
+        Generate every enemy's intent in one LLM call.
+        The state summary is sent once instead of once per enemy.
+        Returns intents keyed by entity ID; enemies the model skipped are absent.
         """
-        response = response.strip()
-        
-        # Try 1: Direct JSON parse (cleanest case)
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
-        
-        # Try 2: Extract from markdown code blocks
-        # Handles ```json ... ``` or ``` ... ```
-        code_block_pattern = r'```(?:json)?\s*\n?(.*?)\n?```'
-        matches = re.findall(code_block_pattern, response, re.DOTALL)
-        for match in matches:
-            try:
-                return json.loads(match.strip())
-            except json.JSONDecodeError:
-                continue
-        
-        # Try 3: Find JSON object by matching braces
-        # Look for outermost { ... }
-        brace_depth = 0
-        start_idx = None
-        
-        for i, char in enumerate(response):
-            if char == '{':
-                if brace_depth == 0:
-                    start_idx = i
-                brace_depth += 1
-            elif char == '}':
-                brace_depth -= 1
-                if brace_depth == 0 and start_idx is not None:
-                    try:
-                        return json.loads(response[start_idx:i + 1])
-                    except json.JSONDecodeError:
-                        start_idx = None
-                        continue
+        if not enemies:
+            return {}
         
-        raise JSONExtractionError(
-            f"Could not extract valid JSON from response. "
-            f"Response preview: {response[:200]}..."
+        prompt = GMPrompts.GENERATE_BATCH_ENTITY_INTENTS.format(
+            summary=context.summary(),
+            entities=self._format_entities(enemies)
         )
+        batch = self.llm.generate(
+            prompt,
+            system_prompt=GMPrompts.BATCH_ENTITY_INTENTS_SYSTEM_PROMPT,
+            response_format=EntityIntentBatch,
+            route="generate_enemy_intents",
+            profile=GMPrompts.GENERATE_BATCH_ENTITY_INTENTS.profile
+        )
+        
+        wanted = {enemy.id for enemy in enemies}
+        return {
+            entry.entity_id: entry.intent
+            for entry in batch.intents
+            if entry.entity_id in wanted and entry.intent.strip()
+        }
 
 
-    def _normalize_enum_value(self, value: str, enum_class: type[Enum]) -> str:
+    def plan_enemy_actions(self, enemies: List[Entity], context: GameState) -> Dict[str, ActionPlan]:
         """
-        Normalize enum string values to match expected format.
-        Handles case insensitivity and common variations.
+        Plan every enemy's action in one LLM call, skipping intent text entirely.
+        Returns ActionPlans keyed by actor ID; enemies the model skipped are absent.
         """
-        value_lower = value.lower().strip()
+        if not enemies:
+            return {}
         
-        # Check direct match first
-        for member in enum_class:
-            if member.value == value_lower:
-                return member.value
-            if member.name.lower() == value_lower:
-                return member.value
-        
-        # Handle common variations
-        # e.g., "ATTACK_ROLL" -> "attack_roll", "attack" -> "attack_roll" for RollType
-        if enum_class == RollType:
-            roll_type_aliases = {
-                "attack": "attack_roll",
-                "damage": "damage_roll",
-                "save": "save_roll",
-                "saving": "save_roll",
-                "saving_throw": "save_roll",
-                "check": "check_roll",
-                "ability_check": "check_roll",
-                "skill_check": "check_roll",
-            }
-            if value_lower in roll_type_aliases:
-                return roll_type_aliases[value_lower]
+        prompt = GMPrompts.PLAN_BATCH_ENTITY_ACTIONS.format(
+            summary=context.summary(),
+            entities=self._format_entities(enemies)
+        )
+        batch = self.llm.generate(
+            prompt,
+            system_prompt=GMPrompts.BATCH_ENTITY_ACTIONS_SYSTEM_PROMPT,
+            response_format=ActionPlanBatch,
+            route="plan_enemy_actions",
+            profile=GMPrompts.PLAN_BATCH_ENTITY_ACTIONS.profile
+        )
         
-        return value_lower
+        wanted = {enemy.id for enemy in enemies}
+        return {plan.actor_id: plan for plan in batch.plans if plan.actor_id in wanted}
 
 
-    def _parse_state_change(self, data: dict) -> StateChange:
-        """Parse a single StateChange from dict data."""
-        return StateChange(
-            target_id=str(data.get("target_id", "")),
-            attribute=str(data.get("attribute", "")),
-            operation=str(data.get("operation", "set")),
-            value=data.get("value")
-        )
+    def prime_prompt_cache(self, routes: List[str]) -> bool:
+        """
+        Send the system prompt and user prompt prefix of each route to its
+        routed model ahead of play, so the model is loaded and the static
+        prefix is already evaluated on the first turn.
+        Returns False if any route failed to prime.
+        """
+        primed = True
+        for route in routes:
+            system_prompt, prompt = self.SYSTEM_PROMPTS[route]
+            primed = self.llm.prime(
+                system_prompt, prompt.static_prefix, route=route, profile=prompt.profile
+            ) and primed
+        return primed
 
 
-    def _parse_roll_outcomes(self, data: dict) -> dict[str, list[StateChange]]:
-        """Parse roll outcomes dictionary."""
-        outcomes = {}
-        
-        for key in ["SUCCESS", "FAILURE", "success", "failure"]:
-            normalized_key = key.upper()
-            if key in data:
-                changes = data[key]
-                if isinstance(changes, list):
-                    outcomes[normalized_key] = [
-                        self._parse_state_change(sc) if isinstance(sc, dict) else sc
-                        for sc in changes
-                    ]
-                else:
-                    outcomes[normalized_key] = []
+    # ============================================================
+    # ASYNC API
+    # ============================================================
+    # Awaitable versions of the calls above, for overlapping several LLM
+    # requests in one turn or serving many sessions from one event loop.
+    # Without an AsyncOllamaClient they run the sync call in a worker thread.
+
+    async def interpret_action_async(
+        self,
+        intent_text: str,
+        context: GameState,
+        actor_id: str | None = None
+    ) -> ActionPlan | None:
+        if self.async_llm is None:
+            return await asyncio.to_thread(self.interpret_action, intent_text, context, actor_id)
         
-        # Ensure both keys exist
-        if "SUCCESS" not in outcomes:
-            outcomes["SUCCESS"] = []
-        if "FAILURE" not in outcomes:
-            outcomes["FAILURE"] = []
+        plan, match = self._interpret_without_llm(intent_text, context, actor_id)
+        if plan is not None:
+            return plan
         
-        return outcomes
+        try:
+            plan = await self.async_llm.generate(
+                self._interpret_prompt(intent_text, context),
+                system_prompt=GMPrompts.INTERPRET_SYSTEM_PROMPT,
+                response_format=ActionPlan,
+                route=self._interpret_route(match),
+                profile=GMPrompts.INTERPRET_INTENT.profile
+            )
+        except LLM_UNAVAILABLE as e:
+            return self._rule_based_fallback(match, e)
+        # The client has already validated the response into an ActionPlan
+        self._remember_plan(intent_text, context, plan, actor_id)
+        return plan
 
 
-    def _parse_roll_spec(self, data: dict) -> RollSpec:
-        """Parse a single RollSpec from dict data."""
-        roll_type_raw = data.get("type", "check_roll")
-        roll_type_normalized = self._normalize_enum_value(roll_type_raw, RollType)
-        
-        return RollSpec(
-            made_by=str(data.get("made_by", "")),
-            type=RollType(roll_type_normalized),
-            dice=str(data.get("dice", "1d20")),
-            threshold=int(data.get("threshold", 10)),
-            advantage=bool(data.get("advantage", False)),
-            disadvantage=bool(data.get("disadvantage", False)),
-            outcomes=self._parse_roll_outcomes(data.get("outcomes", {})),
-            explanation=str(data.get("explanation", ""))
+    async def explain_invalid_action_async(self, intent: str, context: GameState) -> str:
+        if self.async_llm is None:
+            return await asyncio.to_thread(self.explain_invalid_action, intent, context)
+        prompt = GMPrompts.EXPLAIN_INVALID_ACTION.format(intent=intent,summary=context.summary())
+        return await self.async_llm.generate(
+            prompt,
+            system_prompt=GMPrompts.EXPLAIN_INVALID_SYSTEM_PROMPT,
+            route="explain_invalid_action",
+            profile=GMPrompts.EXPLAIN_INVALID_ACTION.profile
         )
 
 
-    def _parse_conditional_rolls(self, data: dict) -> dict[int, list[RollSpec]]:
-        """
-        Parse conditional rolls dictionary.
-        Handles both string and int keys (JSON only has string keys).
-        """
-        result = {}
-        
-        for key, rolls in data.items():
-            try:
-                int_key = int(key)
-            except (ValueError, TypeError):
-                logger.warning(f"Invalid conditional roll key: {key}, skipping")
-                continue
-            
-            if isinstance(rolls, list):
-                result[int_key] = [
-                    self._parse_roll_spec(r) if isinstance(r, dict) else r
-                    for r in rolls
-                ]
-        
-        return result
+    async def describe_reaction_async(self, triggering_action: Action, entity: Entity) -> str:
+        if self.async_llm is None:
+            return await asyncio.to_thread(self.describe_reaction, triggering_action, entity)
+        prompt = GMPrompts.DESCRIBE_REACTION.format(entity=entity,triggering_action=triggering_action)
+        return await self.async_llm.generate(
+            prompt, route="describe_reaction", profile=GMPrompts.DESCRIBE_REACTION.profile
+        )
 
 
-    def _parse_action_plan(self, llm_response: str) -> ActionPlan:
-        """
-        Parse an LLM response into an ActionPlan object.
-        
-        Args:
-            llm_response: Raw string response from the LLM containing JSON-formatted
-                        action plan data. May include surrounding text or markdown.
-        
-        Returns:
-            ActionPlan: Validated ActionPlan object ready for game engine processing.
-        
-        Raises:
-            JSONExtractionError: If no valid JSON could be extracted from response.
-            ValidationFailedError: If extracted JSON doesn't conform to ActionPlan schema.
-            ActionPlanParseError: For other parsing failures.
-        
-        Example:
-            >>> response = '''
-            ... Here's the action plan:
-            ... ```json
-            ... {
-            ...     "action_type": "attack",
-            ...     "actor_id": "player_1",
-            ...     "target_ids": ["goblin_1"],
-            ...     "required_rolls": [{
-            ...         "made_by": "player_1",
-            ...         "type": "attack_roll",
-            ...         "dice": "1d20+5",
-            ...         "threshold": 13,
-            ...         "advantage": false,
-            ...         "disadvantage": false,
-            ...         "outcomes": {"SUCCESS": [], "FAILURE": []},
-            ...         "explanation": "Melee attack against goblin"
-            ...     }],
-            ...     "narrative_context": "You swing your sword at the goblin."
-            ... }
-            ... ```
-            ... '''
-            >>> plan = parse_action_plan(response)
-            >>> plan.action_type
-            <ActionType.ATTACK: 'attack'>
-        """
-        # Step 1: Extract JSON from response
-        try:
-            data = self._extract_json_from_response(llm_response)
-        except JSONExtractionError:
-            raise
-        except Exception as e:
-            raise JSONExtractionError(f"Unexpected error extracting JSON: {e}")
-        
-        # Step 2: Normalize and parse fields
-        try:
-            # Parse action_type
-            action_type_raw = data.get("action_type", "other")
-            action_type_normalized = self._normalize_enum_value(action_type_raw, ActionType)
-            
-            # Parse required_rolls
-            required_rolls_raw = data.get("required_rolls", [])
-            required_rolls = [
-                self._parse_roll_spec(r) if isinstance(r, dict) else r
-                for r in required_rolls_raw
-            ]
-            
-            # Parse conditional_rolls
-            conditional_rolls = self._parse_conditional_rolls(
-                data.get("conditional_rolls", {})
-            )
-            
-            # Build ActionPlan
-            action_plan = ActionPlan(
-                action_type=ActionType(action_type_normalized),
-                actor_id=str(data.get("actor_id", "")),
-                target_ids=[str(t) for t in data.get("target_ids", [])],
-                required_rolls=required_rolls,
-                conditional_rolls=conditional_rolls,
-                potential_reactions=[str(r) for r in data.get("potential_reactions", [])],
-                narrative_context=str(data.get("narrative_context", ""))
-            )
-            
-            return action_plan
-            
-        except ValidationError as e:
-            raise ValidationFailedError(f"ActionPlan validation failed: {e}")
-        except Exception as e:
-            raise ActionPlanParseError(f"Failed to parse ActionPlan: {e}")
\ No newline at end of file
+    async def generate_entity_intent_async(self, entity: Entity, context: GameState) -> str:
+        if self.async_llm is None:
+            return await asyncio.to_thread(self.generate_entity_intent, entity, context)
+        prompt = GMPrompts.GENERATE_ENTITY_INTENT.format(summary=context.summary(),entity=entity)
+        return await self.async_llm.generate(
+            prompt,
+            system_prompt=GMPrompts.ENTITY_INTENT_SYSTEM_PROMPT,
+            route="generate_entity_intent",
+            profile=GMPrompts.GENERATE_ENTITY_INTENT.profile
+        )
+
+
+    def _format_entities(self, entities: List[Entity]) -> str:
+        """One line per entity, with the ID the model must echo back."""
+        return "\n".join(
+            f"- {e.id}: {e.name} ({e.description}; disposition: {e.disposition}; HP {e.hp}/{e.max_hp})"
+            for e in entities
+        )
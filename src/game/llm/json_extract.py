@@ -0,0 +1,92 @@
+"""Linear-time extraction of a JSON object from free-form LLM output."""
+
+import json
+import re
+from typing import Any, Iterator, Tuple
+
+from src.game.llm.exceptions import JSONExtractionError
+
+# Characters that open or close an object or a string
+_STRUCTURAL = re.compile(r'[{}"]')
+# The rest of a JSON string after its opening quote, escapes included
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+_decoder = json.JSONDecoder()
+
+
+def extract_json(text: str) -> Any:
+    r"""
+    Extract JSON from an LLM response that may contain surrounding text.
+
+    Handles pure JSON, JSON in markdown code blocks and JSON with
+    preamble/postamble text in one pass: the first top-level {...} that
+    decodes wins. Each candidate object is decoded at most once and
+    candidates never overlap, so the cost is linear in the response length.
+    A JSON array is only recognized at the start of the response.
+
+        >>> extract_json('Sure! ```json\n{"intent": "say \\"hi}\\" {loudly}"}\n``` Done.')
+        {'intent': 'say "hi}" {loudly}'}
+        >>> extract_json("It's {not JSON}, but this is: {\"a\": [1, \"}\"]}")
+        {'a': [1, '}']}
+
+    Raises:
+        JSONExtractionError: If no valid JSON object is found.
+    """
+    stripped = text.strip()
+    # Fast path for the usual schema-constrained response: JSON first, maybe prose after
+    if stripped.startswith(("{", "[")):
+        try:
+            return _decoder.raw_decode(stripped)[0]
+        except json.JSONDecodeError:
+            pass
+    skip = text.find(stripped[:1]) if stripped.startswith("{") else -1
+
+    for start, end in iter_object_spans(text):
+        if start == skip:
+            continue                    # Already tried by the fast path
+        try:
+            # Decode a slice: an error's line/column is then found in the
+            # candidate, not by recounting the whole response each time
+            return _decoder.raw_decode(text[start:end])[0]
+        except json.JSONDecodeError:
+            continue
+
+    raise JSONExtractionError(
+        f"Could not extract valid JSON from response. "
+        f"Response preview: {stripped[:200]}..."
+    )
+
+
+def iter_object_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) of each balanced top-level {...} in text, in order.
+
+    Quotes only open a string inside an object, so apostrophes and quotes
+    in the surrounding prose don't confuse the scan; inside a string, braces
+    and escaped quotes are skipped. A stray "}" in prose is ignored.
+    """
+    depth = 0
+    start = 0
+    pos = 0
+    while True:
+        match = _STRUCTURAL.search(text, pos)
+        if match is None:
+            return
+        i = match.start()
+        pos = i + 1
+        char = text[i]
+        if char == '"':
+            if depth:
+                # Jump past the string so braces and \" inside it are skipped
+                tail = _STRING_TAIL.match(text, pos)
+                if tail is None:
+                    return              # Unterminated: nothing after this can balance
+                pos = tail.end()
+        elif char == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif depth:
+            depth -= 1
+            if depth == 0:
+                yield start, pos
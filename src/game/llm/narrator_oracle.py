@@ -1,5 +1,8 @@
-from typing import List
+import asyncio
+from typing import AsyncIterator, Iterator, List
 from src.game.llm.client import OllamaClient
+from src.game.llm.router import ModelRouter
+from src.game.llm.async_client import AsyncOllamaClient, bypassed_layers
 from src.game.llm.prompts import GMPrompts
 
 class NarratorOracle:
@@ -8,8 +11,24 @@ class NarratorOracle:
     Evolves the story through narration, interpreting game state updates into prose and adding it to the ongoing story.
     """
     
-    def __init__(self, llm_client: OllamaClient):
+    def __init__(self, llm_client: OllamaClient | ModelRouter, async_llm_client: AsyncOllamaClient | None = None):
+        """
+        Raises:
+            ValueError: If async_llm_client would bypass a layer of llm_client; see bypassed_layers().
+        """
+        if async_llm_client is not None and (bypassed := bypassed_layers(llm_client, async_llm_client)):
+            raise ValueError(f"async_llm_client would bypass the {', '.join(bypassed)} of llm_client")
         self.llm = llm_client
+        self.async_llm = async_llm_client
+    
+    def prime_prompt_cache(self) -> bool:
+        """Send the narration prompt prefix ahead of play; False if it failed."""
+        return self.llm.prime(
+            GMPrompts.NARRATE_SYSTEM_PROMPT,
+            GMPrompts.NARRATE_STATE_UPDATE.static_prefix,
+            route="narration",
+            profile=GMPrompts.NARRATE_STATE_UPDATE.profile
+        )
     
     def compose_narration(
         self,
@@ -19,12 +38,66 @@ class NarratorOracle:
         """
         Transform mechanical game updates into immersive narrative prose.
         """
+        return self.llm.generate(
+            self._build_prompt(updates, state_summary),
+            system_prompt=GMPrompts.NARRATE_SYSTEM_PROMPT,
+            route="narration",
+            profile=GMPrompts.NARRATE_STATE_UPDATE.profile
+        )
+    
+    def stream_narration(
+        self,
+        updates: List[str],
+        state_summary: str
+    ) -> Iterator[str]:
+        """
+        Same as compose_narration, but yields the prose as the model writes it.
+        """
+        return self.llm.generate_stream(
+            self._build_prompt(updates, state_summary),
+            system_prompt=GMPrompts.NARRATE_SYSTEM_PROMPT,
+            route="narration",
+            profile=GMPrompts.NARRATE_STATE_UPDATE.profile
+        )
+    
+    async def compose_narration_async(
+        self,
+        updates: List[str],
+        state_summary: str
+    ) -> str:
+        """
+        Awaitable compose_narration. Runs the sync call in a worker thread
+        when no AsyncOllamaClient was provided.
+        """
+        if self.async_llm is None:
+            return await asyncio.to_thread(self.compose_narration, updates, state_summary)
+        return await self.async_llm.generate(
+            self._build_prompt(updates, state_summary),
+            system_prompt=GMPrompts.NARRATE_SYSTEM_PROMPT,
+            route="narration",
+            profile=GMPrompts.NARRATE_STATE_UPDATE.profile
+        )
+    
+    async def stream_narration_async(
+        self,
+        updates: List[str],
+        state_summary: str
+    ) -> AsyncIterator[str]:
+        """
+        Awaitable stream_narration. Needs an AsyncOllamaClient.
+        """
+        if self.async_llm is None:
+            raise RuntimeError("stream_narration_async requires an AsyncOllamaClient")
+        async for chunk in self.async_llm.generate_stream(
+            self._build_prompt(updates, state_summary),
+            system_prompt=GMPrompts.NARRATE_SYSTEM_PROMPT,
+            route="narration",
+            profile=GMPrompts.NARRATE_STATE_UPDATE.profile
+        ):
+            yield chunk
+    
+    def _build_prompt(self, updates: List[str], state_summary: str) -> str:
         # Format updates as a bulleted list for clarity
         updates_formatted = "\n".join(f"- {update}" for update in updates)
         
-        prompt = GMPrompts.NARRATE_STATE_UPDATE.format(summary=state_summary,updates_formatted=updates_formatted)
-
-        return self.llm.generate(
-            prompt,
-            system_prompt=GMPrompts.NARRATE_SYSTEM_PROMPT
-        )
\ No newline at end of file
+        return GMPrompts.NARRATE_STATE_UPDATE.format(summary=state_summary,updates_formatted=updates_formatted)
\ No newline at end of file
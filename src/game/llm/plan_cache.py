@@ -0,0 +1,224 @@
+"""Semantic cache of GM ActionPlans, keyed on normalized intent and a state signature."""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict
+
+from src.game.models import ActionPlan, Entity, GameState, PlayerCharacter
+
+logger = logging.getLogger(__name__)
+
+
+PLAN_CACHE_SQL = """
+CREATE TABLE IF NOT EXISTS plan_cache (
+    key TEXT PRIMARY KEY,
+    plan JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Stored plans refer to entities by slot instead of ID, e.g. "@slot:actor"
+SLOT_PREFIX = "@slot:"
+
+
+class ActionPlanCache:
+    """
+    LRU cache of interpreted ActionPlans with an optional SQLite tier. Both
+    tiers keep at most max_entries plans, dropping the least recently used.
+
+    Entries are keyed on the normalized intent text plus a compact signature
+    of the state the plan depends on: the actor's stats, weapons and
+    conditions, and the name/AC of everything it could target. IDs in a stored
+    plan are replaced by slots ("the actor", "occupant #1", "item Rope"), and
+    rebound to the current IDs on a hit, so a plan interpreted in one session
+    can answer the same command against an identical situation in another.
+    """
+
+    def __init__(self, max_entries: int = 1024, db_path: Path | None = None):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+
+        self._db: sqlite3.Connection | None = None
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.executescript(PLAN_CACHE_SQL)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "persistent_hits": self.persistent_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def get(self, intent_text: str, state: GameState, actor_id: str | None = None) -> ActionPlan | None:
+        """Return a cached plan rebound to the current IDs, or None on a miss."""
+        slots = _slot_map(state, actor_id)
+        key = self._key(intent_text, state, actor_id, slots)
+
+        with self._lock:
+            stored = self._entries.get(key)
+            persistent = False
+            if stored is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                stored = self._load(key)
+                if stored is not None:
+                    persistent = True
+                    self._remember(key, stored)
+
+            if stored is None:
+                self.misses += 1
+                return None
+
+        ids_by_slot = {slot: entity_id for entity_id, slot in slots.items()}
+        try:
+            plan = ActionPlan.model_validate(_rebind(stored, ids_by_slot))
+        except Exception as e:
+            logger.warning("Discarding unusable cached plan: %s", e)
+            with self._lock:
+                self.misses += 1
+                self._forget(key)
+            return None
+
+        # Only a plan that is actually returned counts as a hit
+        with self._lock:
+            self.hits += 1
+            if persistent:
+                self.persistent_hits += 1
+        return plan
+
+    def put(self, intent_text: str, state: GameState, plan: ActionPlan, actor_id: str | None = None) -> None:
+        """Store a plan with its IDs replaced by slots."""
+        slots = _slot_map(state, actor_id)
+        key = self._key(intent_text, state, actor_id, slots)
+        stored = _rebind(plan.model_dump(mode="json"), slots)
+
+        with self._lock:
+            self._remember(key, stored)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO plan_cache (key, plan) VALUES (?, ?)",
+                    (key, json.dumps(stored)),
+                )
+                self._db.execute(
+                    "DELETE FROM plan_cache WHERE key IN ("
+                    "SELECT key FROM plan_cache ORDER BY last_used DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM plan_cache")
+                self._db.commit()
+
+    def _remember(self, key: str, stored: Dict[str, Any]) -> None:
+        self._entries[key] = stored
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _forget(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM plan_cache WHERE key = ?", (key,))
+            self._db.commit()
+
+    def _load(self, key: str) -> Dict[str, Any] | None:
+        row = self._db.execute("SELECT plan FROM plan_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE plan_cache SET last_used = CURRENT_TIMESTAMP WHERE key = ?", (key,))
+        self._db.commit()
+        return json.loads(row[0])
+
+    def _key(self, intent_text: str, state: GameState, actor_id: str | None, slots: Dict[str, str]) -> str:
+        signature = json.dumps(
+            [normalize_intent(intent_text), state_signature(state, actor_id, slots)],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(signature.encode()).hexdigest()
+
+
+def normalize_intent(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split())
+
+
+def state_signature(state: GameState, actor_id: str | None, slots: Dict[str, str]) -> list:
+    """The parts of the state an interpreted plan depends on, without IDs."""
+    actor = _find_actor(state, actor_id)
+    occupants = [
+        [slots[e.id], e.name, e.ac, e.hp > 0]
+        for e in state.location.occupants
+    ]
+    return [
+        _combatant_signature(actor) if actor else actor_id,
+        _combatant_signature(state.player) if actor is not state.player else "actor",
+        occupants,
+        sorted(item.name for item in state.location.items),
+    ]
+
+
+def _combatant_signature(combatant: Entity | PlayerCharacter) -> list:
+    return [
+        combatant.name,
+        sorted(combatant.attributes.items()),
+        combatant.ac,
+        [item.name for item in combatant.equipped],
+        sorted(item.name for item in combatant.inventory),
+        sorted(status.name for status in combatant.conditions),
+    ]
+
+
+def _find_actor(state: GameState, actor_id: str | None) -> Entity | PlayerCharacter | None:
+    if actor_id in (None, "player", state.player.id):
+        return state.player
+    return next((e for e in state.location.occupants if e.id == actor_id), None)
+
+
+def _slot_map(state: GameState, actor_id: str | None) -> Dict[str, str]:
+    """Map every ID a plan could mention to a session-independent slot."""
+    actor = _find_actor(state, actor_id)
+    slots = {state.player.id: f"{SLOT_PREFIX}player", state.location.id: f"{SLOT_PREFIX}room"}
+    for index, entity in enumerate(state.location.occupants):
+        slots[entity.id] = f"{SLOT_PREFIX}occupant:{index}"
+    for owner, items in (("room", state.location.items), ("player", state.player.inventory),
+                         ("player", state.player.equipped)):
+        for item in items:
+            slots.setdefault(item.id, f"{SLOT_PREFIX}{owner}-item:{item.name}")
+    if actor is not None:
+        slots[actor.id] = f"{SLOT_PREFIX}actor"
+    return slots
+
+
+def _rebind(value: Any, mapping: Dict[str, str]) -> Any:
+    """Recursively replace every string found in mapping (IDs <-> slots)."""
+    if isinstance(value, str):
+        return mapping.get(value, value)
+    if isinstance(value, list):
+        return [_rebind(v, mapping) for v in value]
+    if isinstance(value, dict):
+        return {k: _rebind(v, mapping) for k, v in value.items()}
+    return value
@@ -0,0 +1,120 @@
+"""Incremental parsing of a streamed ActionPlan, surfacing rolls as they complete."""
+
+from typing import List, Tuple
+
+from src.game.models import ActionPlan, RollSpec
+from src.game.llm.structured import parse_structured_response
+
+
+class ActionPlanStream:
+    r"""
+    Feed it an ActionPlan's JSON as the model writes it; it hands back each
+    entry of required_rolls the moment that entry's closing brace arrives,
+    long before the rest of the plan (conditional rolls, state changes,
+    narrative context) has been generated.
+
+    The scan is incremental: each chunk is scanned once on arrival and kept
+    in a list that plan() joins only at the end, so feeding a response chunk
+    by chunk stays linear in its length.
+
+    Example (run with python -m doctest), fed one character at a time so
+    chunk boundaries fall inside strings and escapes:
+        >>> response = (
+        ...     '{"action_type": "attack", "actor_id": "player", "target_ids": ["goblin_1"], '
+        ...     '"required_rolls": [{"made_by": "player", "type": "attack_roll", "dice": "1d20+5", '
+        ...     '"threshold": 13, "advantage": false, "disadvantage": false, '
+        ...     '"outcomes": {"SUCCESS": [], "FAILURE": []}, '
+        ...     '"explanation": "a \\"}]\\" in a string"}], "narrative_context": "[You swing.]"}'
+        ... )
+        >>> stream = ActionPlanStream()
+        >>> ready = []
+        >>> for i, char in enumerate(response):
+        ...     ready += [(index, spec.dice, i) for index, spec in stream.feed(char)]
+        >>> [(index, dice) for index, dice, _ in ready]
+        [(0, '1d20+5')]
+        >>> ready[0][2] < response.index("narrative_context")
+        True
+        >>> stream.plan().required_rolls[0].explanation
+        'a "}]" in a string'
+    """
+
+    ROLLS_KEY = "required_rolls"
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._depth = 0                 # Nesting of objects and arrays
+        self._in_string = False
+        self._escaped = False
+        self._last_key = ""             # Most recent string closed at the top level
+        self._in_rolls = False          # Inside the top-level required_rolls array
+        self._roll_count = 0
+        # Text of a top-level string or a roll seen in earlier chunks, while it is still open
+        self._key_parts: List[str] | None = None
+        self._roll_parts: List[str] | None = None
+
+    def feed(self, chunk: str) -> List[Tuple[int, RollSpec]]:
+        """
+        Add the next chunk of the response.
+        Returns (index, RollSpec) for every required roll completed by it.
+        """
+        self._chunks.append(chunk)
+        completed = []
+        key_start = roll_start = 0      # Where an open key or roll resumes in this chunk
+
+        for i, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_parts is not None:
+                        self._last_key = "".join(self._key_parts) + chunk[key_start:i]
+                        self._key_parts = None
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._key_parts = []
+                    key_start = i + 1
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._last_key == self.ROLLS_KEY:
+                    self._in_rolls = True
+                elif char == "{" and self._depth == 3 and self._in_rolls:
+                    self._roll_parts = []
+                    roll_start = i
+            elif char in "}]":
+                if char == "}" and self._depth == 3 and self._in_rolls:
+                    text = "".join(self._roll_parts or ()) + chunk[roll_start:i + 1]
+                    self._roll_parts = None
+                    completed.append(self._complete_roll(text))
+                elif char == "]" and self._depth == 2:
+                    self._in_rolls = False
+                self._depth -= 1
+
+        # Carry whatever is still open over to the next chunk
+        if self._key_parts is not None:
+            self._key_parts.append(chunk[key_start:])
+        if self._roll_parts is not None:
+            self._roll_parts.append(chunk[roll_start:])
+
+        return [entry for entry in completed if entry is not None]
+
+    def plan(self) -> ActionPlan:
+        """
+        Validate the whole response once the stream has ended.
+
+        Raises:
+            ValueError: If the response isn't a valid ActionPlan.
+        """
+        return parse_structured_response("".join(self._chunks), ActionPlan)
+
+    def _complete_roll(self, text: str) -> Tuple[int, RollSpec] | None:
+        index = self._roll_count
+        self._roll_count += 1
+        # A roll that doesn't validate here is left for plan() to report
+        try:
+            return index, RollSpec.model_validate_json(text)
+        except ValueError:
+            return None
@@ -0,0 +1,37 @@
+"""Generation settings (length, sampling, stop sequences) per kind of request."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """
+    Ollama options for one kind of request.
+
+    num_predict caps the response length in tokens, so a one-line intent
+    can't ramble for hundreds of tokens. temperature=None and
+    keep_alive=None defer to the client's defaults, which come from
+    settings.llm_temperature and settings.llm_keep_alive.
+    """
+    name: str
+    num_predict: int | None = None
+    temperature: float | None = None
+    stop: Tuple[str, ...] = ()
+    keep_alive: str | None = None
+
+    def options(self, default_temperature: float | None = None) -> Dict[str, Any]:
+        """The `options` payload for ollama.chat()."""
+        options: Dict[str, Any] = {}
+        if self.num_predict is not None:
+            options["num_predict"] = self.num_predict
+        temperature = self.temperature if self.temperature is not None else default_temperature
+        if temperature is not None:
+            options["temperature"] = temperature
+        if self.stop:
+            options["stop"] = list(self.stop)
+        return options
+
+
+# Used when a call site doesn't name a profile
+DEFAULT_PROFILE = GenerationProfile(name="default", num_predict=512)
@@ -1,13 +1,20 @@
 from enum import Enum
 
-class GMPrompts(str, Enum):
-    EXPLAIN_INVALID_ACTION = """The player tried to: "{intent}"
-    But this isn't possible because of the current situation:
-    {summary}
+from src.game.llm.profiles import DEFAULT_PROFILE, GenerationProfile
 
-    Respond in-character as a Dungeon Master explaining why they can't do this.
+class GMPrompts(str, Enum):
+    # Prompts are split into a static system prompt (the *_SYSTEM_PROMPT
+    # entries) and a short user prompt holding only what changes per call,
+    # state first. Ollama reuses its KV cache for a matching prefix, so the
+    # instructions are evaluated once per model load instead of every call.
+    EXPLAIN_INVALID_SYSTEM_PROMPT = """You are the Dungeon Master. The player tried to do something that isn't possible in the current situation.
+    Respond in-character explaining why they can't do this.
     Be helpful and suggest alternatives if appropriate.
     Keep it brief (2-3 sentences)."""
+    EXPLAIN_INVALID_ACTION = """{summary}
+
+    THE PLAYER TRIED TO: "{intent}"
+    """
     DESCRIBE_REACTION = """An entity is reacting to the player's action.
 
     ENTITY: {entity.name} ({entity.type})
@@ -21,73 +28,128 @@ class GMPrompts(str, Enum):
     Example: "The goblin snarls and swings its rusty scimitar at the player"
 
     Respond with just the action description, nothing else."""
-    INTERPRET_INTENT = """You are the Dungeon Master. Interpret the player's intended action
-    and determine what dice rolls are required to resolve it.
-
-    {summary}
-
-    PLAYER'S ACTION: "{intent}"
+    INTERPRET_SYSTEM_PROMPT = """You are the Dungeon Master. Interpret the intended action described
+    after the game state and determine what dice rolls are required to resolve it.
 
     Determine:
-    1. What type of action is this? (ATTACK, CAST, SKILL, INTERACT, MOVE, DIALOGUE, FREE)
+    1. What type of action is this? (attack, cast, skill, interact, move, say, other)
     2. Who/what is the target?
     3. What rolls are needed? For each roll, specify:
-    - Roll type (ATTACK, DAMAGE, SAVE, CHECK)
-    - Dice formula (e.g., "1d20+5")
-    - Target DC or AC
+    - Roll type (attack_roll, damage_roll, save_roll, check_roll)
+    - Dice formula (e.g., "1d20+5", or "1d20+STR" to add an attribute modifier)
+    - Threshold: the target DC or AC
     - Any advantage/disadvantage
     4. Are there conditional rolls? (e.g., "if attack hits, roll damage")
     5. What entities might react to this action?
     6. What state changes occur on success vs failure?
 
-    If this action is impossible or doesn't make sense, respond with INVALID and explain why.
-
     Respond in the following JSON format:
-    {{
-        "valid": true/false,
-        "invalid_reason": "..." (only if invalid),
-        "action_type": "...",
+    {
+        "action_type": "attack",
         "actor_id": "player",
-        "target_ids": [...],
+        "target_ids": ["goblin_1"],
         "required_rolls": [
-            {{
-                "roll_type": "ATTACK",
+            {
+                "made_by": "player",
+                "type": "attack_roll",
                 "dice": "1d20+5",
-                "target_ac": 13,
-                "reason": "Sword attack against Goblin"
-            }}
+                "threshold": 13,
+                "advantage": false,
+                "disadvantage": false,
+                "outcomes": {"SUCCESS": [], "FAILURE": []},
+                "explanation": "Sword attack against Goblin"
+            }
         ],
-        "conditional_rolls": {{
-            "0": [  // If roll at index 0 succeeds
-                {{
-                    "roll_type": "DAMAGE",
+        "conditional_rolls": {
+            "0": [
+                {
+                    "made_by": "player",
+                    "type": "damage_roll",
                     "dice": "1d8+3",
-                    "reason": "Longsword damage"
-                }}
+                    "threshold": 0,
+                    "advantage": false,
+                    "disadvantage": false,
+                    "outcomes": {"SUCCESS": [{"target_id": "goblin_1", "attribute": "hp", "operation": "remove", "value": null}], "FAILURE": []},
+                    "explanation": "Longsword damage"
+                }
             ]
-        }},
-        "potential_reactions": ["goblin_1"],  // Entity IDs
-        "on_success": [
-            {{"target_id": "goblin_1", "attribute": "hp", "operation": "add", "value": -8}}
-        ],
+        },
+        "potential_reactions": ["goblin_1"],
+        "on_success": [],
         "on_failure": [],
         "narrative_context": "Player swings their longsword at the goblin"
-    }}
+    }
+    The "0" key of conditional_rolls means "if the roll at index 0 succeeds".
+    A damage roll's hp change with "value": null removes the amount rolled."""
+    INTERPRET_INTENT = """{summary}
+
+    ACTION: "{intent}"
     """
-    GENERATE_ENTITY_INTENT = """Current game state: {summary}\n
-            Active Entity: {entity.name}\n
-            Entity Description: {entity.description}\n
-            Entity Disposition: {entity.disposition}\n
-            Based on the situation and the entity's nature, describe what this enemy tries to do next.
-            Provide only the narrative intent (e.g., 'The goblin attacks the nearest player with a rusty dagger').
-            Keep the description simple and concise. Do not use flowery language."""
-    NARRATE_STATE_UPDATE = """
-    {summary}
+    ENTITY_INTENT_SYSTEM_PROMPT = """You are the Dungeon Master deciding what an enemy tries to do next,
+    based on the situation and the entity's nature.
+    Provide only the narrative intent (e.g., 'The goblin attacks the nearest player with a rusty dagger').
+    Keep the description simple and concise. Do not use flowery language."""
+    GENERATE_ENTITY_INTENT = """Current game state: {summary}
 
-    EVENTS TO NARRATE:
-    {updates_formatted}
+    Active Entity: {entity.name}
+    Entity Description: {entity.description}
+    Entity Disposition: {entity.disposition}"""
+    BATCH_ENTITY_INTENTS_SYSTEM_PROMPT = """You are the Dungeon Master deciding what each active enemy tries to do next,
+    based on the situation and its nature.
+    Give only the narrative intent (e.g., 'The goblin attacks the nearest player with a rusty dagger').
+    Keep each description simple and concise. Do not use flowery language.
 
-    Write a brief, dramatic narration of these events. Focus on sensory details and emotional impact. Do not mention any numbers, dice, HP, AC, or game terms."""
+    Respond in the following JSON format, with exactly one entry per enemy ID:
+    {
+        "intents": [
+            {"entity_id": "...", "intent": "..."}
+        ]
+    }"""
+    GENERATE_BATCH_ENTITY_INTENTS = """Current game state: {summary}
+
+    ACTIVE ENEMIES:
+    {entities}"""
+    BATCH_ENTITY_ACTIONS_SYSTEM_PROMPT = """You are the Dungeon Master running the enemies' turn.
+
+    For EACH active enemy listed after the game state, decide what it does next and build its ActionPlan:
+    the action type, its target IDs, and the dice rolls needed to resolve it
+    (e.g. an attack roll of "1d20+DEX" against the target's AC, and a damage roll
+    conditional on roll 0 succeeding).
+
+    Respond in JSON as {"plans": [...]} with exactly one ActionPlan per enemy,
+    whose actor_id is that enemy's ID."""
+    PLAN_BATCH_ENTITY_ACTIONS = """{summary}
+
+    ACTIVE ENEMIES:
+    {entities}"""
+    NARRATE_STATE_UPDATE = """{summary}
+
+    EVENTS TO NARRATE:
+    {updates_formatted}"""
     NARRATE_SYSTEM_PROMPT = """You are a dramatic narrator for a fantasy adventure. 
     Transform mechanical events into vivid prose. Never mention dice, HP, AC, damage numbers, or game mechanics.
-    Write in second person ("You..."). Be concise but evocative."""
\ No newline at end of file
+    Write in second person ("You..."). Be concise but evocative.
+    Write a brief, dramatic narration of the events listed after the game state. Focus on sensory details and emotional impact. Do not mention any numbers, dice, HP, AC, or game terms."""
+
+    @property
+    def profile(self) -> GenerationProfile:
+        """Generation settings for requests built from this prompt."""
+        return PROMPT_PROFILES.get(self.name, DEFAULT_PROFILE)
+
+    @property
+    def static_prefix(self) -> str:
+        """The start of a user prompt template, up to its first field; the same in every request."""
+        return self.value.split("{", 1)[0]
+
+
+# Plans and JSON want low temperature and room for the whole object; one-line
+# intents get a tight cap and stop at the first newline.
+PROMPT_PROFILES = {
+    "INTERPRET_INTENT": GenerationProfile("interpret_intent", num_predict=768, temperature=0.2),
+    "PLAN_BATCH_ENTITY_ACTIONS": GenerationProfile("plan_batch_entity_actions", num_predict=1536, temperature=0.2),
+    "GENERATE_BATCH_ENTITY_INTENTS": GenerationProfile("generate_batch_entity_intents", num_predict=384),
+    "GENERATE_ENTITY_INTENT": GenerationProfile("generate_entity_intent", num_predict=48, stop=("\n",)),
+    "DESCRIBE_REACTION": GenerationProfile("describe_reaction", num_predict=48, stop=("\n",)),
+    "EXPLAIN_INVALID_ACTION": GenerationProfile("explain_invalid_action", num_predict=120),
+    "NARRATE_STATE_UPDATE": GenerationProfile("narrate_state_update", num_predict=256),
+}
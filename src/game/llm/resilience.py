@@ -0,0 +1,113 @@
+"""Retry backoff and circuit breaking for LLM calls."""
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Literal
+
+import httpx
+import ollama
+
+from src.game.llm.exceptions import CircuitOpenError
+from src.game.utils.deadline import time_left
+
+logger = logging.getLogger(__name__)
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+# Errors meaning "the model can't answer right now", as opposed to bad output
+LLM_UNAVAILABLE = (CircuitOpenError, ollama.ResponseError, httpx.HTTPError, ConnectionError, TimeoutError)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: before retry n the caller sleeps a
+    uniform random time in [0, min(max_delay, base_delay * multiplier**(n-1))],
+    which spreads retries from many callers out instead of synchronizing them.
+    """
+    max_retries: int = 3
+    base_delay: float = 0.5                 # Seconds
+    max_delay: float = 8.0                  # Seconds
+    multiplier: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        """Sleep before retrying after failed attempt number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def sleep(self, attempt: int) -> None:
+        # Never back off past the turn's deadline; the retry then fails fast on it
+        delay = time_left(self.delay(attempt))
+        logger.debug("Backing off %.2fs before retry %d", delay, attempt + 1)
+        time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the LLM backend looks down.
+
+    After failure_threshold consecutive failures the circuit opens and every
+    call raises CircuitOpenError for cooldown seconds. The first call after
+    the cooldown is let through as a probe (half-open): success closes the
+    circuit, failure opens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            CircuitOpenError: If the circuit is open, or a probe is already in flight.
+        """
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+        raise CircuitOpenError(f"LLM circuit open; retrying in {max(remaining, 0):.1f}s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("LLM circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning("LLM circuit opened after %d consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self) -> None:
+        """A call ended with no outcome (cut short or closed early); let the next call probe."""
+        with self._lock:
+            self._probing = False
+
+    def _state(self, now: float) -> CircuitState:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
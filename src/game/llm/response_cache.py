@@ -0,0 +1,153 @@
+"""Persistent cache of raw LLM responses, keyed on the full request."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Literal
+
+from src.game.llm.exceptions import CacheMissError
+
+logger = logging.getLogger(__name__)
+
+# "off": no caching; "on": read through and record; "replay": serve from cache only
+CacheMode = Literal["off", "on", "replay"]
+
+
+RESPONSE_CACHE_SQL = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used);
+"""
+
+
+def request_fingerprint(
+    model: str,
+    messages: List[Dict[str, str]],
+    format_spec: Any = None,
+    options: Dict[str, Any] | None = None,
+) -> str:
+    """Stable hash of everything that determines a chat response."""
+    request = json.dumps(
+        {"model": model, "messages": messages, "format": format_spec, "options": options},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(request.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of LLM responses with LRU and TTL eviction.
+
+    Keys are request_fingerprint()s: hashes of everything that determines
+    the output (model, messages, format schema and generation options). Entries older than ttl_seconds
+    are treated as misses; beyond max_entries the least recently used
+    entries are dropped.
+
+    In "replay" mode the cache never falls through to the model: a miss
+    raises CacheMissError, so a scripted session either reproduces exactly
+    from recorded responses or fails loudly. Replay is read-only: entries
+    never expire and nothing is written, however old the recording.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        mode: CacheMode = "on",
+        max_entries: int = 10_000,
+        ttl_seconds: float | None = None,
+    ):
+        self.mode = mode
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(RESPONSE_CACHE_SQL)
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def get(self, key: str) -> str | None:
+        """
+        The cached response for key, or None on a miss.
+
+        Raises:
+            CacheMissError: On a miss in replay mode.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            expired = row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds
+            if expired and not self.replay:
+                self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if not self.replay:
+                    self._db.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+
+        if row is None and self.replay:
+            raise CacheMissError(f"No recorded response for request {key[:12]} (replay mode)")
+        return row[0] if row is not None else None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Record a response. A no-op in replay mode, so recordings stay fixed."""
+        if self.replay:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, model, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM llm_responses")
+            self._db.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._db.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._db.execute(
+            "DELETE FROM llm_responses WHERE key IN ("
+            "SELECT key FROM llm_responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
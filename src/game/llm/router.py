@@ -0,0 +1,153 @@
+"""Routes each LLM call site to a model tier and records per-route latency."""
+
+import logging
+from typing import Any, Dict, Iterator, Literal, Type, TypeVar
+
+from pydantic import BaseModel
+
+from src.game.llm.client import OllamaClient
+from src.game.llm.profiles import GenerationProfile
+from src.game.utils.metrics import MetricsRegistry, metrics as default_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+# router: small, fast model for short or classification-like answers
+# answerer: large model for prose and plans that need real reasoning
+ModelTier = Literal["router", "answerer"]
+
+ROUTES: Dict[str, ModelTier] = {
+    "interpret_action": "answerer",             # Intents the rule-based interpreter couldn't shape
+    "interpret_simple_action": "router",        # Intents it recognized, but not confidently
+    "plan_enemy_actions": "answerer",
+    "narration": "answerer",
+    "generate_entity_intent": "router",
+    "generate_enemy_intents": "router",
+    "explain_invalid_action": "router",
+    "describe_reaction": "router",
+}
+
+LATENCY_METRIC = "llm_route_latency_seconds"
+
+
+class ModelRouter:
+    """
+    Drop-in for OllamaClient that sends each call to the client for its
+    route's tier. Callers name their call site with route=...; unknown or
+    missing routes go to the default tier. Every call's wall time is
+    recorded in a histogram labelled with route and model.
+    """
+
+    def __init__(
+        self,
+        clients: Dict[ModelTier, OllamaClient],
+        routes: Dict[str, ModelTier] | None = None,
+        default_tier: ModelTier = "answerer",
+        registry: MetricsRegistry | None = None,
+    ):
+        if default_tier not in clients:
+            raise ValueError(f"No client for default tier '{default_tier}'")
+        self.clients = clients
+        self.routes = routes if routes is not None else ROUTES
+        self.default_tier = default_tier
+        self.metrics = registry or default_metrics
+
+    @property
+    def model_name(self) -> str:
+        return self.clients[self.default_tier].model_name
+
+    def client_for(self, route: str | None) -> OllamaClient:
+        tier = self.routes.get(route, self.default_tier) if route else self.default_tier
+        return self.clients.get(tier) or self.clients[self.default_tier]
+
+    def health_check(self) -> bool:
+        """True only if every tier's model is available."""
+        return all([client.health_check() for client in self.clients.values()])
+
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        response_format: Type[T] | None = None,
+        route: str | None = None,
+        profile: GenerationProfile | None = None,
+    ) -> str | T:
+        client = self.client_for(route)
+        with self._timer(route, client):
+            return client.generate(prompt, system_prompt, response_format, route=route, profile=profile)
+
+    def generate_json(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        route: str | None = None,
+        profile: GenerationProfile | None = None,
+    ) -> dict[str, Any]:
+        client = self.client_for(route)
+        with self._timer(route, client):
+            return client.generate_json(prompt, system_prompt, route=route, profile=profile)
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        route: str | None = None,
+        profile: GenerationProfile | None = None,
+        response_format: Type[BaseModel] | None = None,
+    ) -> Iterator[str]:
+        """Streams from the routed client; latency covers the whole stream."""
+        client = self.client_for(route)
+        with self._timer(route, client):
+            yield from client.generate_stream(
+                prompt, system_prompt, route=route, profile=profile, response_format=response_format
+            )
+
+    def warmup(self) -> bool:
+        """Load every tier's model; True only if all of them loaded."""
+        return all([client.warmup() for client in self.clients.values()])
+
+    def prime(
+        self,
+        system_prompt: str,
+        prompt_prefix: str = "",
+        route: str | None = None,
+        profile: GenerationProfile | None = None,
+    ) -> bool:
+        """Prime the routed client's model with a route's prompt prefix."""
+        return self.client_for(route).prime(system_prompt, prompt_prefix, route=route, profile=profile)
+
+    def latency_report(self) -> Dict[str, Dict[str, float]]:
+        """Latency summary per route, e.g. {"narration (mistral:7b)": {"p50": ..., ...}}"""
+        return {
+            f"{labels['route']} ({labels['model']})": histogram.snapshot()
+            for labels, histogram in self.metrics.histograms(LATENCY_METRIC)
+        }
+
+    def usage_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Token usage and throughput per route, from what Ollama reported, e.g.
+        {"narration (mistral:7b)": {"requests": 12, "prompt_tokens": ..., "tokens_per_second": ..., ...}}
+        """
+        report: Dict[str, Dict[str, float]] = {}
+        
+        def entry(labels: Dict[str, str]) -> Dict[str, float]:
+            return report.setdefault(f"{labels['route']} ({labels['model']})", {})
+        
+        for name, key in (
+            ("llm_requests", "requests"),
+            ("llm_prompt_tokens", "prompt_tokens"),
+            ("llm_completion_tokens", "completion_tokens"),
+        ):
+            for labels, counter in self.metrics.counters(name):
+                entry(labels)[key] = counter.value
+        for labels, histogram in self.metrics.histograms("llm_generation_tokens_per_second"):
+            entry(labels)["tokens_per_second"] = histogram.mean
+        for labels, histogram in self.metrics.histograms("llm_prompt_tokens_per_second"):
+            entry(labels)["prompt_tokens_per_second"] = histogram.mean
+        for labels, histogram in self.metrics.histograms("llm_queue_seconds"):
+            entry(labels)["queue_p95"] = histogram.quantile(0.95)
+        return report
+
+    def _timer(self, route: str | None, client: OllamaClient):
+        return self.metrics.timer(LATENCY_METRIC, route=route or "default", model=client.model_name)
@@ -0,0 +1,73 @@
+"""Coalescing of identical concurrent calls into one in-flight execution."""
+
+import threading
+from concurrent.futures import Future, wait
+from typing import Callable, Dict, Tuple, TypeVar
+
+from src.game.utils.deadline import DeadlineExceededError, time_left
+
+R = TypeVar("R")
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    The first caller for a key executes the function; callers arriving with
+    the same key while it runs wait on the same Future and receive its
+    result (or its exception) instead of repeating the work. Once the call
+    finishes the key is released, so later callers start a fresh one.
+
+    Deadlines stay per caller: a waiting caller gives up at its own turn's
+    deadline, and a call cut short by the leader's deadline isn't shared;
+    the callers waiting on it start a fresh call instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], R]) -> Tuple[R, bool]:
+        """
+        Run fn, or join the identical call already in flight.
+
+        Returns:
+            (result, shared): shared is True when the result came from
+            another caller's execution.
+        """
+        while True:
+            with self._lock:
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = self._in_flight[key] = Future()
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                return self._lead(key, future, fn), False
+
+            done, _ = wait([future], timeout=time_left())
+            if not done:
+                raise DeadlineExceededError("Turn deadline passed waiting on an identical in-flight call")
+            if isinstance(future.exception(), DeadlineExceededError):
+                continue                # The leader ran out of time, not this caller
+            return future.result(), True
+
+    def _lead(self, key: str, future: Future, fn: Callable[[], R]) -> R:
+        # Release the key before publishing, so a caller retrying after the
+        # leader's deadline starts a fresh call instead of rejoining this one
+        try:
+            result = fn()
+        except BaseException as e:
+            self._release(key)
+            future.set_exception(e)
+            raise
+        self._release(key)
+        future.set_result(result)
+        return result
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            del self._in_flight[key]
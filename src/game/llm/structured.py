@@ -0,0 +1,56 @@
+"""Structured output: cached JSON schemas and parsing responses into Pydantic models."""
+
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from src.game.llm.exceptions import JSONExtractionError
+from src.game.llm.json_extract import extract_json
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def json_schema(response_format: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    The model's JSON schema, built once per class. Schema generation walks
+    every nested model, so rebuilding it per request is pure overhead.
+    The dict is shared between callers and must not be mutated.
+    """
+    return response_format.model_json_schema()
+
+
+def parse_structured_response(content: str, response_format: Type[T]) -> T:
+    """
+    Validate a response into response_format.
+
+    Schema-constrained output is plain JSON, which model_validate_json parses
+    and validates in one pass. Only if the text isn't valid JSON (prose or a
+    code fence around the object) is the JSON extracted and validated.
+
+    Raises:
+        ValueError: If no JSON can be found, or it doesn't fit the model.
+    """
+    try:
+        return response_format.model_validate_json(content)
+    except ValidationError as e:
+        if not _is_json_error(e):
+            raise ValueError(f"Failed to validate as {response_format.__name__}: {e}") from e
+
+    logger.debug("Response for %s isn't bare JSON; extracting it", response_format.__name__)
+    try:
+        data = extract_json(content)
+        return response_format.model_validate(data)
+    except JSONExtractionError as e:
+        raise ValueError(f"Invalid JSON in response: {e}") from e
+    except ValidationError as e:
+        raise ValueError(f"Failed to validate as {response_format.__name__}: {e}") from e
+
+
+def _is_json_error(error: ValidationError) -> bool:
+    """True if validation failed because the text wasn't JSON, not because of the data."""
+    return any(detail["type"] == "json_invalid" for detail in error.errors())
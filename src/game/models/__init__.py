@@ -31,6 +31,9 @@ from .actions import (
     RollResult,
     ResolutionStatus,
     ActionPlan,
+    EntityIntent,
+    EntityIntentBatch,
+    ActionPlanBatch,
     Resolution,
     Action,
 )
@@ -67,6 +70,9 @@ __all__ = [
     "RollResult",
     "ResolutionStatus",
     "ActionPlan",
+    "EntityIntent",
+    "EntityIntentBatch",
+    "ActionPlanBatch",
     "Resolution",
     "Action",
 ]
\ No newline at end of file
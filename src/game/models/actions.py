@@ -1,5 +1,5 @@
-from typing import List, TypedDict, Any
-from pydantic import BaseModel
+from typing import Dict, List, TypedDict, Any
+from pydantic import BaseModel, field_validator
 from enum import Enum
 
 # ========================================================================================
@@ -13,7 +13,7 @@ class StateChange(BaseModel):                   # An actual change to state
     target_id: str             # Entity/item being changed
     attribute: str             # What's changing ("hp", "position", "inventory")
     operation: str             # "set", "add", "remove", "append"
-    value: Any                 # The new value or delta
+    value: Any                 # The new value or delta (None on a damage roll = the amount rolled)
 # ============================================================
 # ROLL STRUCTURES
 # ============================================================
@@ -31,6 +31,32 @@ class RollOutcome(Enum):
 class RollOutcomes(TypedDict):
     SUCCESS: List[StateChange]
     FAILURE: List[StateChange]
+
+# Names models commonly use for a roll type instead of its value
+ROLL_TYPE_ALIASES = {
+    "attack": "attack_roll",
+    "damage": "damage_roll",
+    "save": "save_roll",
+    "saving": "save_roll",
+    "saving_throw": "save_roll",
+    "check": "check_roll",
+    "ability_check": "check_roll",
+    "skill_check": "check_roll",
+}
+
+def _lenient_enum_value(value: Any, enum_class: type[Enum], aliases: Dict[str, str] | None = None) -> Any:
+    """
+    Map an LLM's spelling of an enum value to the value itself: any case of
+    the value or member name ("ATTACK", "Attack_Roll"), or a known alias.
+    Anything else is passed through for validation to reject.
+    """
+    if not isinstance(value, str):
+        return value
+    lowered = value.strip().lower()
+    for member in enum_class:
+        if lowered in (member.value, member.name.lower()):
+            return member.value
+    return (aliases or {}).get(lowered, value)
 class RollSpec(BaseModel):
     made_by: str                            # Who is making the roll
     type: RollType                          # What type of roll is being made
@@ -40,12 +66,33 @@ class RollSpec(BaseModel):
     disadvantage: bool                      # Disadvantage?
     outcomes: RollOutcomes
     explanation: str                        # Why the roll is being made (for LLM)
+    context: Dict[str, int] = {}            # Attribute modifiers for formulas like 1d20+STR
+
+    @field_validator("type", mode="before")
+    @classmethod
+    def _lenient_type(cls, value: Any) -> Any:
+        return _lenient_enum_value(value, RollType, ROLL_TYPE_ALIASES)
+
+    @field_validator("outcomes", mode="before")
+    @classmethod
+    def _lenient_outcomes(cls, value: Any) -> Any:
+        """Accept "success"/"failure" keys, and a missing side as no changes."""
+        if not isinstance(value, dict):
+            return value
+        outcomes = {str(key).upper(): changes for key, changes in value.items()}
+        outcomes.setdefault("SUCCESS", [])
+        outcomes.setdefault("FAILURE", [])
+        return outcomes
 class RollResult(BaseModel):
     """Result of rolling a RollSpec"""
     spec: RollSpec                          # Spec which generated this result
     roll: int
     outcome: RollOutcome
     state_changes: List[StateChange]
+
+    @property
+    def success(self) -> bool:
+        return self.outcome == RollOutcome.SUCCESS
 # ============================================================
 # ACTION & RESOLUTION
 # ============================================================
@@ -83,9 +130,29 @@ class ActionPlan(BaseModel):
     # Potential reactions this might trigger
     potential_reactions: List[str] = []     # Entity IDs that might react
     
+    # State changes applied once the action resolves, on top of roll outcomes
+    on_success: List[StateChange] = []
+    on_failure: List[StateChange] = []
+    
     # DM's notes for narration context
     narrative_context: str = ""
 
+    @field_validator("action_type", mode="before")
+    @classmethod
+    def _lenient_action_type(cls, value: Any) -> Any:
+        return _lenient_enum_value(value, ActionType)
+
+# ============================================================
+# BATCHED ENEMY PLANNING (one LLM call for every enemy)
+# ============================================================
+class EntityIntent(BaseModel):
+    entity_id: str
+    intent: str                             # e.g. "The goblin slashes at the player"
+class EntityIntentBatch(BaseModel):
+    intents: List[EntityIntent] = []
+class ActionPlanBatch(BaseModel):
+    plans: List[ActionPlan] = []            # One plan per entity, keyed by actor_id
+
 class Resolution(BaseModel):
     """
     The evolving state of resolving a single action.
@@ -0,0 +1,13 @@
+from src.game.simulation.combat_simulator import (
+    CombatSimulator,
+    EncounterOutcome,
+    SimulationReport,
+    run_simulation,
+)
+
+__all__ = [
+    'CombatSimulator',
+    'EncounterOutcome',
+    'SimulationReport',
+    'run_simulation',
+]
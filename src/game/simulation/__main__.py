@@ -0,0 +1,26 @@
+"""Run the headless combat simulator: python -m src.game.simulation --encounters 10000"""
+
+import argparse
+
+from src.game.simulation import run_simulation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate the test encounter without the LLM.")
+    parser.add_argument("--encounters", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    report = run_simulation(
+        encounters=args.encounters,
+        workers=args.workers,
+        seed=args.seed,
+        max_rounds=args.max_rounds,
+    )
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Headless combat simulator.
+
+Plays encounters to completion with pre-built ActionPlans driven straight
+through the ResolutionEngine and StateManager — no LLM calls — and fans
+batches of encounters out across a process pool to size encounters.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from src.game.core.plan_builder import build_attack_plan
+from src.game.core.resolution_engine import ResolutionEngine
+from src.game.core.rules_engine import RulesEngine
+from src.game.core.state_manager import StateManager
+from src.game.models import ActionPlan, GameState, Resolution
+from src.game.scenarios import create_test_encounter
+
+logger = logging.getLogger(__name__)
+
+ScenarioFactory = Callable[[], GameState]
+
+
+@dataclass
+class EncounterOutcome:
+    """Result of playing a single encounter to completion."""
+    player_won: bool
+    rounds: int
+    player_hp: int
+    kill_rounds: Dict[str, int]             # enemy id -> round it dropped
+
+
+@dataclass
+class SimulationReport:
+    """Aggregated results over many simulated encounters."""
+    encounters: int
+    wins: int
+    timeouts: int                           # Encounters that hit max_rounds
+    rounds: np.ndarray                      # Rounds per encounter
+    player_hp: np.ndarray                   # Player HP at the end of each encounter
+    kill_rounds: Dict[str, List[int]] = field(default_factory=dict)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.encounters if self.encounters else 0.0
+
+    @property
+    def mean_rounds(self) -> float:
+        return float(self.rounds.mean()) if self.encounters else 0.0
+
+    def rounds_to_kill(self) -> Dict[str, float]:
+        """Mean round each enemy dropped in, over the encounters where it did."""
+        return {enemy_id: float(np.mean(rounds)) for enemy_id, rounds in self.kill_rounds.items() if rounds}
+
+    def hp_distribution(self) -> Dict[int, float]:
+        """Fraction of encounters ending at each player HP value (0 = downed)."""
+        values, counts = np.unique(np.maximum(self.player_hp, 0), return_counts=True)
+        return {int(v): c / self.encounters for v, c in zip(values, counts)}
+
+    def summary(self) -> str:
+        if not self.encounters:
+            return "Encounters: 0 (nothing to summarize)"
+        lines = [
+            f"Encounters: {self.encounters}",
+            f"Win rate: {self.win_rate:.1%} ({self.timeouts} timed out)",
+            f"Rounds: mean {self.mean_rounds:.2f}, p50 {np.percentile(self.rounds, 50):.0f}, "
+            f"p95 {np.percentile(self.rounds, 95):.0f}",
+            f"Player HP at end: mean {self.player_hp.mean():.1f}",
+            "Rounds to kill:",
+        ]
+        lines += [f"  - {enemy_id}: {mean:.2f}" for enemy_id, mean in sorted(self.rounds_to_kill().items())]
+        return "\n".join(lines)
+
+
+class CombatSimulator:
+    """
+    Plays encounters on one RulesEngine. The player attacks the weakest
+    living enemy each round, then every living enemy attacks the player.
+    """
+
+    def __init__(self, rules_engine: RulesEngine, max_rounds: int = 50):
+        self.rules = rules_engine
+        self.max_rounds = max_rounds
+
+    def run_encounter(self, initial_state: GameState) -> EncounterOutcome:
+        state = StateManager(initial_state=initial_state)
+        engine = ResolutionEngine(rules_engine=self.rules, state_manager=state)
+        player = state.get_player_character()
+
+        # Plans only depend on stats that don't change mid-fight, so build each once
+        plans: Dict[Tuple[str, str], ActionPlan] = {}
+        kill_rounds: Dict[str, int] = {}
+
+        def attack(attacker, target) -> None:
+            key = (attacker.id, target.id)
+            if key not in plans:
+                plans[key] = build_attack_plan(attacker, target)
+            resolution = engine.execute_plan(Resolution(action_plan=plans[key]))
+            for change in resolution.pending_state_changes:
+                state.apply_change(change)
+
+        for round_number in range(1, self.max_rounds + 1):
+            enemies = state.get_alive_enemies_in_room()
+            attack(player, min(enemies, key=lambda e: e.hp))
+
+            for enemy in enemies:
+                if enemy.hp <= 0 and enemy.id not in kill_rounds:
+                    kill_rounds[enemy.id] = round_number
+
+            enemies = state.get_alive_enemies_in_room()
+            if not enemies:
+                return EncounterOutcome(True, round_number, player.hp, kill_rounds)
+
+            for enemy in enemies:
+                attack(enemy, player)
+                if player.hp <= 0:
+                    return EncounterOutcome(False, round_number, player.hp, kill_rounds)
+
+        return EncounterOutcome(False, self.max_rounds, player.hp, kill_rounds)
+
+
+def _simulate_batch(
+    scenario_factory: ScenarioFactory,
+    encounters: int,
+    seed: np.random.SeedSequence,
+    max_rounds: int,
+) -> List[EncounterOutcome]:
+    """Worker entry point: play a batch of encounters on its own seeded engine."""
+    simulator = CombatSimulator(RulesEngine(seed=seed, record=False), max_rounds)
+    return [simulator.run_encounter(scenario_factory()) for _ in range(encounters)]
+
+
+def run_simulation(
+    encounters: int = 1000,
+    scenario_factory: ScenarioFactory = create_test_encounter,
+    workers: int | None = None,
+    seed: int | None = None,
+    max_rounds: int = 50,
+) -> SimulationReport:
+    """
+    Simulate many encounters in parallel and aggregate the results.
+
+    Args:
+        encounters: Number of encounters to play.
+        scenario_factory: Picklable, module-level callable returning a fresh GameState.
+        workers: Worker processes. Defaults to the CPU count; 1 runs in-process.
+        seed: Root seed. Each worker gets an independent child stream of it,
+              so a given (seed, workers) pair always produces the same report.
+        max_rounds: Encounters still running after this many rounds count as losses.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, encounters))
+
+    # Split the encounters as evenly as possible, one batch per worker
+    batch_sizes = [encounters // workers + (1 if i < encounters % workers else 0) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+
+    if workers == 1:
+        outcomes = _simulate_batch(scenario_factory, encounters, seeds[0], max_rounds)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_simulate_batch, scenario_factory, size, child_seed, max_rounds)
+                for size, child_seed in zip(batch_sizes, seeds)
+            ]
+            outcomes = [outcome for future in futures for outcome in future.result()]
+
+    logger.info("Simulated %d encounters across %d worker(s)", len(outcomes), workers)
+    return aggregate(outcomes, max_rounds)
+
+
+def aggregate(outcomes: List[EncounterOutcome], max_rounds: int) -> SimulationReport:
+    """Fold individual encounter outcomes into a SimulationReport."""
+    kill_rounds: Dict[str, List[int]] = {}
+    for outcome in outcomes:
+        for enemy_id, round_number in outcome.kill_rounds.items():
+            kill_rounds.setdefault(enemy_id, []).append(round_number)
+
+    return SimulationReport(
+        encounters=len(outcomes),
+        wins=sum(outcome.player_won for outcome in outcomes),
+        timeouts=sum(
+            not outcome.player_won and outcome.player_hp > 0 and outcome.rounds >= max_rounds
+            for outcome in outcomes
+        ),
+        rounds=np.array([outcome.rounds for outcome in outcomes]),
+        player_hp=np.array([outcome.player_hp for outcome in outcomes]),
+        kill_rounds=kill_rounds,
+    )
@@ -0,0 +1,106 @@
+"""Per-turn deadlines, propagated to every call made on the turn's behalf through a contextvar."""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+class DeadlineExceededError(TimeoutError):
+    """The turn ran out of time (or was cancelled) before this call could start or finish"""
+    pass
+
+
+class Deadline:
+    """
+    A point in time a turn must finish by, plus a cancellation flag.
+
+    Work started for the turn reads it through current_deadline() instead of
+    taking a timeout argument, so LLM calls several layers down cap their
+    own timeouts to what is left. Cancelling it (done when the turn ends)
+    tells work the turn abandoned, e.g. a late worker thread, to stop early.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self._clock = clock
+        self.expires_at = clock() + seconds
+        self._cancelled = False
+
+    def remaining(self) -> float:
+        """Seconds left; 0 once expired or cancelled."""
+        if self._cancelled:
+            return 0.0
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def timeout(self, default: float | None = None) -> float:
+        """default capped to the time left, for passing on as a call's timeout."""
+        remaining = self.remaining()
+        return remaining if default is None else min(default, remaining)
+
+    def check(self, what: str = "call") -> None:
+        """
+        Raises:
+            DeadlineExceededError: If there is no time left for what.
+        """
+        if self._cancelled:
+            raise DeadlineExceededError(f"Turn cancelled before {what}")
+        if self.expired:
+            raise DeadlineExceededError(f"Turn deadline of {self.seconds:.1f}s passed before {what}")
+
+
+_current: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar("turn_deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _current.get()
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Iterator[Deadline | None]:
+    """
+    Run the with block under a deadline `seconds` from now; None adds none.
+    Nested deadlines can only tighten the enclosing one. The deadline is
+    cancelled when the block exits, so anything still running for it stops
+    at its next check.
+    """
+    enclosing = _current.get()
+    if seconds is None:
+        yield enclosing
+        return
+    if enclosing is not None:
+        seconds = min(seconds, enclosing.remaining())
+    new = Deadline(seconds)
+    token = _current.set(new)
+    try:
+        yield new
+    finally:
+        new.cancel()
+        _current.reset(token)
+
+
+def check_deadline(what: str = "call") -> None:
+    """
+    Raises:
+        DeadlineExceededError: If the current deadline has passed or was cancelled.
+    """
+    current = _current.get()
+    if current is not None:
+        current.check(what)
+
+
+def time_left(default: float | None = None) -> float | None:
+    """default capped to the current deadline; default itself when there is none."""
+    current = _current.get()
+    return default if current is None else current.timeout(default)
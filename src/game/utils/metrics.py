@@ -0,0 +1,229 @@
+"""In-process metrics: labelled counters and histograms, exportable as OpenMetrics text."""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; sized for LLM calls, from a cache hit to a long generation
+LATENCY_BUCKETS: Tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Upper bounds in tokens; from a one-line prompt to a full context window
+TOKEN_BUCKETS: Tuple[float, ...] = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+# Upper bounds in tokens per second; from a CPU-bound large model to prompt evaluation on a GPU
+THROUGHPUT_BUCKETS: Tuple[float, ...] = (1, 2.5, 5, 10, 20, 40, 80, 160, 320, 640, 1280, 2560, 5120)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+Labels = FrozenSet[Tuple[str, str]]
+SortedLabels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Counts are per bucket (not cumulative), plus an
+    overflow bucket for observations above the last bound.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (inf if it overflowed)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.mean,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Counter:
+    """Monotonic total, e.g. tokens evaluated since start-up."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class MetricsRegistry:
+    """Named, labelled counters and histograms, created on first use."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], Counter] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        key = (name, frozenset(labels.items()))
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, Counter())
+        return counter
+
+    def histogram(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS, **labels: str) -> Histogram:
+        key = (name, frozenset(labels.items()))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(buckets))
+        return histogram
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the wall time of the with block, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name, **labels).observe(time.perf_counter() - started)
+
+    def histograms(self, name: str) -> List[Tuple[Dict[str, str], Histogram]]:
+        """Every histogram with this name, with its labels."""
+        return [(dict(labels), histogram) for (n, labels), histogram in self._histograms.items() if n == name]
+
+    def counters(self, name: str) -> List[Tuple[Dict[str, str], Counter]]:
+        """Every counter with this name, with its labels."""
+        return [(dict(labels), counter) for (n, labels), counter in self._counters.items() if n == name]
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Every metric as plain data: {name: [{"labels": {...}, "value": ...} or histogram stats]}."""
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for (name, labels), counter in list(self._counters.items()):
+            result.setdefault(name, []).append({"labels": dict(labels), "value": counter.value})
+        for (name, labels), histogram in list(self._histograms.items()):
+            result.setdefault(name, []).append({"labels": dict(labels), **histogram.snapshot()})
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    # ============================================================
+    # OPENMETRICS EXPORT
+    # ============================================================
+
+    def to_openmetrics(self) -> str:
+        """Every metric in the OpenMetrics text format, as scraped by Prometheus."""
+        lines: List[str] = []
+        for name, samples in _families(self._counters):
+            lines.append(f"# TYPE {name} counter")
+            for labels, counter in samples:
+                lines.append(f"{name}_total{_format_labels(labels)} {_format_value(counter.value)}")
+        for name, samples in _families(self._histograms):
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in samples:
+                # OpenMetrics buckets are cumulative
+                with histogram._lock:
+                    counts, count, total = list(histogram.counts), histogram.count, histogram.sum
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    bucket_labels = labels + (("le", _format_value(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, path: Path) -> None:
+        """Replace path with the current metrics, atomically, e.g. for node_exporter's textfile collector."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp.write_text(self.to_openmetrics())
+        os.replace(temp, path)
+
+    def serve_openmetrics(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve the metrics at http://host:port/metrics from a daemon thread.
+        Call shutdown() on the returned server to stop it.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_openmetrics().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("metrics: " + format, *args)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info("Serving metrics at http://%s:%d/metrics", host, server.server_port)
+        return server
+
+
+def _families(metrics: Dict[Tuple[str, Labels], Any]) -> List[Tuple[str, List[Tuple[SortedLabels, Any]]]]:
+    """Metrics grouped by name, each family and its label sets sorted for a stable output."""
+    families: Dict[str, List[Tuple[SortedLabels, Any]]] = {}
+    for (name, labels), metric in list(metrics.items()):
+        families.setdefault(name, []).append((tuple(sorted(labels)), metric))
+    return [(name, sorted(samples, key=lambda sample: sample[0])) for name, samples in sorted(families.items())]
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -0,0 +1,207 @@
+"""Per-turn span tracing, exportable as JSONL or Chrome trace events."""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Literal, TypeVar
+
+T = TypeVar("T")
+
+TraceFormat = Literal["jsonl", "chrome"]
+
+_span_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    """One timed phase of a turn; children are the phases nested inside it."""
+    name: str
+    start: float                            # time.perf_counter() seconds
+    end: float | None = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    children: List["Span"] = field(default_factory=list)
+    parent: "Span | None" = field(default=None, repr=False)
+    span_id: int = field(default_factory=lambda: next(_span_ids))
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+    thread_id: int = field(default_factory=threading.get_ident)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def walk(self) -> Iterator["Span"]:
+        """This span, then every descendant depth first."""
+        yield self
+        for child in list(self.children):
+            yield from child.walk()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The span and its subtree as nested dicts; times in milliseconds from the root."""
+        return self._to_dict(self.start)
+
+    def _to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "thread": self.thread,
+            "attributes": self.attributes,
+            "children": [child._to_dict(origin) for child in list(self.children)],
+        }
+
+
+class Tracer:
+    """
+    Records a tree of spans per turn.
+
+    tracer.span(name) opens a child of the current span (a contextvar, so
+    concurrent sessions each get their own tree); a span opened with no
+    current span is the root of a new trace. Finished traces are kept in
+    a bounded buffer and, if a path is set, appended to it as they end.
+    Work handed to other threads joins the trace through wrap().
+
+    Spans are no-ops while the tracer is disabled.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        path: Path | None = None,
+        format: TraceFormat = "jsonl",
+        max_traces: int = 100,
+    ):
+        self.enabled = enabled
+        self.path = path
+        self.format = format
+        self.traces: Deque[Span] = deque(maxlen=max_traces)
+        self._current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool = True, path: Path | None = None, format: TraceFormat = "jsonl") -> None:
+        self.enabled = enabled
+        self.path = path
+        self.format = format
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """Time the with block as a span; yields it (None while disabled) for attributes."""
+        if not self.enabled:
+            yield None
+            return
+        parent = self._current.get()
+        span = Span(name=name, start=time.perf_counter(), attributes=attributes, parent=parent)
+        if parent is not None:
+            parent.children.append(span)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=repr(e))
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self._current.reset(token)
+            if parent is None:
+                self._finish(span)
+
+    def record(self, name: str, start: float, end: float | None = None, **attributes: Any) -> None:
+        """
+        Add an already-timed span under the current one, for work that can't
+        sit inside a with block (e.g. a stream consumed by the caller).
+        """
+        parent = self._current.get()
+        if not self.enabled or parent is None:
+            return
+        span = Span(name=name, start=start, attributes=attributes, parent=parent)
+        span.end = end if end is not None else time.perf_counter()
+        parent.children.append(span)
+
+    def current_span(self) -> Span | None:
+        return self._current.get() if self.enabled else None
+
+    def wrap(self, fn: Callable[..., T]) -> Callable[..., T]:
+        """
+        fn bound to the caller's context, so spans it opens in a worker thread
+        nest here. Bound even while disabled, since other contextvars (the
+        turn deadline) must reach the worker too.
+        """
+        context = contextvars.copy_context()
+        return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+    # ============================================================
+    # EXPORT
+    # ============================================================
+
+    def export(self, path: Path, format: TraceFormat = "jsonl") -> None:
+        """Write every buffered trace to path, replacing it."""
+        with open(path, "w") as f:
+            if format == "chrome":
+                f.write("[\n")
+            for trace in list(self.traces):
+                f.write(self._serialize(trace, format))
+
+    def _finish(self, root: Span) -> None:
+        self.traces.append(root)
+        if self.path is None:
+            return
+        with self._lock:
+            new_file = not self.path.exists() or self.path.stat().st_size == 0
+            with open(self.path, "a") as f:
+                if new_file and self.format == "chrome":
+                    f.write("[\n")
+                f.write(self._serialize(root, self.format))
+
+    def _serialize(self, root: Span, format: TraceFormat) -> str:
+        if format == "chrome":
+            # Chrome's JSON array format tolerates a trailing comma and a missing "]",
+            # so traces can be appended as they finish
+            return "".join(json.dumps(event, default=str) + ",\n" for event in chrome_events(root))
+        return "".join(json.dumps(record, default=str) + "\n" for record in jsonl_records(root))
+
+
+def jsonl_records(root: Span) -> Iterator[Dict[str, Any]]:
+    """One flat record per span, linked by parent_id; times in ms from the root's start."""
+    for span in root.walk():
+        yield {
+            "trace_id": root.span_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent.span_id if span.parent is not None else None,
+            "name": span.name,
+            "start_ms": round((span.start - root.start) * 1000, 3),
+            "duration_ms": round(span.duration * 1000, 3),
+            "thread": span.thread,
+            **span.attributes,
+        }
+
+
+def chrome_events(root: Span) -> Iterator[Dict[str, Any]]:
+    """Complete ("X") events for chrome://tracing or Perfetto, one named track per thread."""
+    pid = os.getpid()
+    threads: Dict[int, str] = {}
+    for span in root.walk():
+        threads.setdefault(span.thread_id, span.thread)
+        yield {
+            "name": span.name,
+            "ph": "X",
+            "ts": round(span.start * 1e6, 1),
+            "dur": round(span.duration * 1e6, 1),
+            "pid": pid,
+            "tid": span.thread_id,
+            "args": span.attributes,
+        }
+    for thread_id, name in threads.items():
+        yield {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": name}}
+
+
+# Process-wide tracer, off until configured
+tracer = Tracer()